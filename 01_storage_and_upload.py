@@ -2,7 +2,9 @@ import os
 from pathlib import Path
 from azure.identity import DefaultAzureCredential
 from azure.mgmt.storage import StorageManagementClient
-from azure.storage.blob import BlobServiceClient
+
+from blob_sync import SKIPPED, create_blob_service_client as create_client, sync_files, upload_file
+from http_transport import azure_client_options
 
 # --- 1. 설정 정보 ---
 SUBSCRIPTION_ID = "dc6618c1-53d2-4bc8-ab82-68140c3fbde1"
@@ -11,6 +13,9 @@ LOCATION = "francecentral"
 CONTAINER_NAME = "tibero-docs"
 STORAGE_ACCOUNT_NAME = "prokyhstorage24q19"
 
+# 연결 문자열을 지정하면 계정 키 조회 없이 접속 (Azurite: "UseDevelopmentStorage=true")
+STORAGE_CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
+
 # 업로드할 PDF 파일의 경로
 # 단일 파일 또는 폴더 지정 가능
 PDF_FILE_PATH = "./data/Tibero_7_JDBC-Development-Guide.pdf"
@@ -21,7 +26,7 @@ PDF_FILE_PATH = "./data/Tibero_7_JDBC-Development-Guide.pdf"
 def get_storage_account_key(credential, subscription_id, resource_group, storage_account):
     """Storage Account Key 가져오기"""
     try:
-        storage_client = StorageManagementClient(credential, subscription_id)
+        storage_client = StorageManagementClient(credential, subscription_id, **azure_client_options("management"))
         storage_keys = storage_client.storage_accounts.list_keys(
             resource_group, 
             storage_account
@@ -34,7 +39,7 @@ def get_storage_account_key(credential, subscription_id, resource_group, storage
 def create_blob_service_client(storage_account, storage_key):
     """Blob Service Client 생성"""
     blob_service_url = f"https://{storage_account}.blob.core.windows.net"
-    return BlobServiceClient(account_url=blob_service_url, credential=storage_key)
+    return create_client(account_url=blob_service_url, credential=storage_key)
 
 
 def ensure_container_exists(blob_service_client, container_name):
@@ -52,7 +57,7 @@ def ensure_container_exists(blob_service_client, container_name):
 
 
 def upload_single_file(container_client, file_path, blob_name=None):
-    """단일 파일 업로드"""
+    """단일 파일 업로드 (Blob의 MD5가 같으면 건너뜀)"""
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
     
@@ -62,17 +67,17 @@ def upload_single_file(container_client, file_path, blob_name=None):
     file_size_mb = os.path.getsize(file_path) / (1024 * 1024)
     print(f"\n업로드 중: {blob_name} ({file_size_mb:.2f} MB)")
     
-    blob_client = container_client.get_blob_client(blob_name)
-    
-    with open(file_path, "rb") as data:
-        blob_client.upload_blob(data, overwrite=True)
+    status = upload_file(container_client, file_path, blob_name)
     
-    print(f"  ✓ 업로드 완료!")
+    if status == SKIPPED:
+        print(f"  ✓ 변경 없음 (스킵)")
+    else:
+        print(f"  ✓ 업로드 완료!")
     return blob_name
 
 
 def upload_folder(container_client, folder_path, pattern="*.pdf"):
-    """폴더의 모든 파일 업로드"""
+    """폴더의 모든 파일 업로드 (병렬, 변경된 파일만)"""
     folder = Path(folder_path)
     
     if not folder.exists():
@@ -86,16 +91,18 @@ def upload_folder(container_client, folder_path, pattern="*.pdf"):
     
     print(f"\n총 {len(files)}개 파일 발견")
     
-    uploaded_files = []
-    for i, file_path in enumerate(files, 1):
-        try:
-            print(f"\n[{i}/{len(files)}] {file_path.name}")
-            blob_name = upload_single_file(container_client, str(file_path))
-            uploaded_files.append(blob_name)
-        except Exception as e:
-            print(f"  ❌ 업로드 실패: {e}")
+    def show_result(file_path, status, error):
+        file_size_mb = file_path.stat().st_size / (1024 * 1024)
+        if error is not None:
+            print(f"  ❌ {file_path.name}: 업로드 실패: {error}")
+        elif status == SKIPPED:
+            print(f"  - {file_path.name} ({file_size_mb:.2f} MB): 변경 없음 (스킵)")
+        else:
+            print(f"  ✓ {file_path.name} ({file_size_mb:.2f} MB): 업로드 완료")
+    
+    results = sync_files(container_client, files, on_result=show_result)
     
-    return uploaded_files
+    return [path.name for path, status in results.items() if status != "failed"]
 
 
 def list_blobs(container_client):
@@ -134,29 +141,36 @@ def main():
     print(f"Region: {LOCATION}\n")
     
     try:
-        # 1. Azure 인증
-        print("[1/5] Azure 자격 증명 설정...")
-        credential = DefaultAzureCredential()
-        print("  ✓ 자격 증명 설정 완료")
-        
-        # 2. Storage Account Key 가져오기
-        print("\n[2/5] Storage Account Key 가져오기...")
-        storage_key = get_storage_account_key(
-            credential, 
-            SUBSCRIPTION_ID, 
-            RESOURCE_GROUP_NAME, 
-            STORAGE_ACCOUNT_NAME
-        )
-        print("  ✓ Storage Key 획득 완료")
-        
-        # 3. Blob Service Client 생성
-        print("\n[3/5] Blob Service Client 생성...")
-        blob_service_client = create_blob_service_client(
-            STORAGE_ACCOUNT_NAME, 
-            storage_key
-        )
-        blob_service_url = f"https://{STORAGE_ACCOUNT_NAME}.blob.core.windows.net"
-        print(f"  ✓ 클라이언트 생성 완료: {blob_service_url}")
+        if STORAGE_CONNECTION_STRING:
+            # 1~3. 연결 문자열로 접속 (Azurite 등)
+            print("[1-3/5] 연결 문자열로 Blob Service Client 생성...")
+            blob_service_client = create_client(connection_string=STORAGE_CONNECTION_STRING)
+            blob_service_url = blob_service_client.url.rstrip("/")
+            print(f"  ✓ 클라이언트 생성 완료: {blob_service_url}")
+        else:
+            # 1. Azure 인증
+            print("[1/5] Azure 자격 증명 설정...")
+            credential = DefaultAzureCredential()
+            print("  ✓ 자격 증명 설정 완료")
+            
+            # 2. Storage Account Key 가져오기
+            print("\n[2/5] Storage Account Key 가져오기...")
+            storage_key = get_storage_account_key(
+                credential, 
+                SUBSCRIPTION_ID, 
+                RESOURCE_GROUP_NAME, 
+                STORAGE_ACCOUNT_NAME
+            )
+            print("  ✓ Storage Key 획득 완료")
+            
+            # 3. Blob Service Client 생성
+            print("\n[3/5] Blob Service Client 생성...")
+            blob_service_client = create_blob_service_client(
+                STORAGE_ACCOUNT_NAME, 
+                storage_key
+            )
+            blob_service_url = f"https://{STORAGE_ACCOUNT_NAME}.blob.core.windows.net"
+            print(f"  ✓ 클라이언트 생성 완료: {blob_service_url}")
         
         # 4. 컨테이너 확인/생성
         print(f"\n[4/5] 컨테이너 확인...")
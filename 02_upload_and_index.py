@@ -4,13 +4,16 @@ Azure OpenAI RAG - PDF 업로드 및 인덱싱 스크립트
 """
 
 import os
-import json
+import time
+import argparse
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 from azure.identity import DefaultAzureCredential
 from azure.mgmt.storage import StorageManagementClient
-from azure.storage.blob import BlobServiceClient
 from azure.core.credentials import AzureKeyCredential
 from azure.search.documents import SearchClient
 from azure.search.documents.indexes import SearchIndexClient
@@ -22,13 +25,46 @@ from azure.search.documents.indexes.models import (
     VectorSearch,
     HnswAlgorithmConfiguration,
     VectorSearchProfile,
+    BinaryQuantizationCompression,
+    RescoringOptions,
+    ScalarQuantizationCompression,
+    ScalarQuantizationParameters,
+    VectorSearchCompressionRescoreStorageMethod,
+    VectorSearchCompressionTarget,
     SemanticConfiguration,
     SemanticField,
     SemanticPrioritizedFields,
     SemanticSearch,
 )
 from openai import AzureOpenAI
-import PyPDF2
+
+from blob_sync import SKIPPED, create_blob_service_client, sync_files
+from chunker import Chunk, iter_chunks
+from embedding_cache import EmbeddingCache, make_cache_key
+from http_transport import azure_client_options, get_openai_http_client, openai_timeout
+from index_uploader import IndexUploader
+from local_vector_store import LocalVectorStoreWriter
+from index_manifest import IndexManifest, file_sha256, settings_fingerprint
+from error_codes import ERROR_CODE_INDEX_PATH, ErrorCodeIndex, parse_error_pages
+from search_filters import detect_doc_type, odata_quote
+from telemetry import (
+    TELEMETRY_PROMETHEUS_PORT,
+    Stopwatch,
+    current_span,
+    get_telemetry,
+    record_span,
+    span,
+    timed_iter,
+)
+from pdf_extract import extract_pages, get_page_count, iter_pages
+from rate_limit import (
+    AdaptiveRateLimiter,
+    backoff_delay,
+    get_retry_after,
+    get_status_code,
+    is_retryable_error,
+)
+from token_utils import count_tokens, truncate_to_tokens
 
 # 환경 변수 로드
 load_dotenv()
@@ -38,6 +74,8 @@ SUBSCRIPTION_ID = os.getenv("AZURE_SUBSCRIPTION_ID")
 RESOURCE_GROUP = os.getenv("AZURE_RESOURCE_GROUP")
 STORAGE_ACCOUNT = os.getenv("AZURE_STORAGE_ACCOUNT")
 CONTAINER_NAME = os.getenv("AZURE_STORAGE_CONTAINER")
+# 연결 문자열을 지정하면 계정 키 조회 없이 접속 (Azurite: "UseDevelopmentStorage=true")
+STORAGE_CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
 SEARCH_ENDPOINT = os.getenv("AZURE_SEARCH_ENDPOINT")
 SEARCH_KEY = os.getenv("AZURE_SEARCH_API_KEY")  # 변경: AZURE_SEARCH_API_KEY
 INDEX_NAME = os.getenv("AZURE_SEARCH_INDEX")
@@ -47,6 +85,74 @@ OPENAI_DEPLOYMENT = os.getenv("AZURE_DEPLOYMENT_MODEL")  # 추가: GPT 모델명
 EMBEDDING_DEPLOYMENT = os.getenv("AZURE_DEPLOYMENT_EMBEDDING_NAME")  # 변경
 OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
 
+# 임베딩 차원 수 (text-embedding-3 계열만 지정 가능, 비워 두면 모델 기본 차원)
+# 인덱스 스키마, 임베딩 요청, 캐시 키, 챗봇의 질의 임베딩이 모두 이 값을 따름
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS") or 0) or None
+VECTOR_DIMENSIONS = EMBEDDING_DIMENSIONS or 1536
+
+# 임베딩 배치 설정 (Azure OpenAI 제한: 요청당 최대 2048개 입력, 입력당 8191 토큰)
+EMBEDDING_INPUT_MAX_TOKENS = 8191
+EMBEDDING_BATCH_MAX_ITEMS = int(os.getenv("EMBEDDING_BATCH_MAX_ITEMS", "256"))
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "100000"))
+
+# 임베딩 동시 요청 및 재시도 설정
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "8"))
+EMBEDDING_RETRY_BASE_DELAY = float(os.getenv("EMBEDDING_RETRY_BASE_DELAY", "1.0"))
+EMBEDDING_RETRY_MAX_DELAY = float(os.getenv("EMBEDDING_RETRY_MAX_DELAY", "60"))
+
+# 임베딩 디스크 캐시 설정 (경로를 빈 값으로 두면 캐시 사용 안 함)
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+EMBEDDING_CACHE_MAX_MB = int(os.getenv("EMBEDDING_CACHE_MAX_MB", "1024"))
+
+# PDF 텍스트 추출 병렬 처리 설정 (기본: CPU 코어 수)
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "25"))
+
+# 스트리밍 파이프라인 단계 사이 큐 크기 (가득 차면 앞 단계가 대기 → 메모리 상한)
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "256"))
+
+# 청크 분할 설정 (토큰 기준)
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "800"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "80"))
+
+# 벡터 압축 저장 방식
+#   none: float32 그대로 / half: float16 필드 (Collection(Edm.Half))
+#   scalar: int8 스칼라 양자화 / binary: 1비트 이진 양자화
+# 양자화는 후보를 oversampling 배수만큼 더 뽑은 뒤 원본 벡터로 재채점(rescoring)
+VECTOR_COMPRESSION = os.getenv("VECTOR_COMPRESSION", "none").lower()
+VECTOR_OVERSAMPLING = float(
+    os.getenv("VECTOR_OVERSAMPLING", "10" if VECTOR_COMPRESSION == "binary" else "4")
+)
+# false이면 원본 벡터를 저장하지 않음 (검색 결과로 벡터를 돌려받을 수 없음)
+VECTOR_STORE_ORIGINALS = os.getenv("VECTOR_STORE_ORIGINALS", "true").lower() == "true"
+VECTOR_COMPRESSION_TYPES = ("none", "half", "scalar", "binary")
+if VECTOR_COMPRESSION not in VECTOR_COMPRESSION_TYPES:
+    raise ValueError(
+        f"VECTOR_COMPRESSION은 {', '.join(VECTOR_COMPRESSION_TYPES)} 중 하나여야 합니다: {VECTOR_COMPRESSION}"
+    )
+
+# 로컬 벡터 저장소 (챗봇 RETRIEVAL_BACKEND=local 용): true이면 인덱싱하면서 함께 기록
+LOCAL_VECTOR_STORE = os.getenv("LOCAL_VECTOR_STORE", "false").lower() == "true"
+LOCAL_VECTOR_STORE_PATH = os.getenv("LOCAL_VECTOR_STORE_PATH", ".cache/vector_store")
+
+# 증분 인덱싱 매니페스트 경로
+INDEX_MANIFEST_PATH = os.getenv("INDEX_MANIFEST_PATH", ".cache/index_manifest.json")
+
+# 인덱싱 결과에 영향을 주는 설정 (바뀌면 매니페스트가 무효화되어 전체 재인덱싱)
+INDEX_SETTINGS = {
+    "chunker": "token-structure-v2",
+    "schema": "page-section-doctype-v1",
+    "chunk_max_tokens": CHUNK_MAX_TOKENS,
+    "chunk_overlap_tokens": CHUNK_OVERLAP_TOKENS,
+    "embedding_deployment": EMBEDDING_DEPLOYMENT,
+    "embedding_dimensions": VECTOR_DIMENSIONS,
+    "vector_compression": VECTOR_COMPRESSION,
+    "vector_store_originals": VECTOR_STORE_ORIGINALS,
+    # 켜는 순간 전체를 다시 처리해야 로컬 저장소에 모든 청크가 들어감
+    "local_vector_store": LOCAL_VECTOR_STORE,
+}
+
 # OpenAI 클라이언트 초기화
 openai_client = None
 
@@ -57,68 +163,263 @@ def init_openai_client():
         openai_client = AzureOpenAI(
             azure_endpoint=OPENAI_ENDPOINT,
             api_key=OPENAI_KEY,
-            api_version=OPENAI_API_VERSION
+            api_version=OPENAI_API_VERSION,
+            max_retries=0,  # 재시도는 embed_batch_with_retry에서 직접 처리
+            http_client=get_openai_http_client(),  # 임베딩 작업자들이 연결 풀 공유
         )
     return openai_client
 
 
-def extract_text_from_pdf(pdf_path: str) -> str:
-    """PDF 파일에서 텍스트 추출"""
-    text = ""
-    try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            total_pages = len(pdf_reader.pages)
-            print(f"    총 {total_pages}페이지 읽는 중...", end=" ")
-            
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-                
-                # 진행 상황 표시
-                if page_num % 10 == 0 or page_num == total_pages:
-                    print(f"{page_num}/{total_pages}", end=" ")
-            
-            print("완료!")
-    except Exception as e:
-        print(f"\n    ❌ PDF 읽기 오류: {e}")
-    return text
+# 임베딩 캐시 초기화
+embedding_cache = None
 
+def init_embedding_cache():
+    """임베딩 캐시 초기화 (비활성화 시 None)"""
+    global embedding_cache
+    if embedding_cache is None and EMBEDDING_CACHE_PATH:
+        embedding_cache = EmbeddingCache(
+            EMBEDDING_CACHE_PATH,
+            max_bytes=EMBEDDING_CACHE_MAX_MB * 1024 * 1024,
+        )
+    return embedding_cache
 
-def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 200) -> List[str]:
-    """텍스트를 청크로 분할"""
-    chunks = []
-    start = 0
-    text_length = len(text)
-    
-    while start < text_length:
-        end = start + chunk_size
-        chunk = text[start:end]
-        
-        # 빈 청크 제외
-        if chunk.strip():
-            chunks.append(chunk)
-        
-        start = end - overlap
-    
-    return chunks
 
+def extract_pages_from_pdf(pdf_path: str) -> List[Tuple[int, str]]:
+    """PDF 파일에서 페이지별 텍스트 추출 (프로세스 풀 병렬 처리)"""
+    def show_progress(done, total):
+        print(f"{done}/{total}", end=" ", flush=True)
 
-def get_embedding(text: str) -> List[float]:
-    """텍스트의 임베딩 벡터 생성"""
     try:
-        client = init_openai_client()
-        response = client.embeddings.create(
-            model=EMBEDDING_DEPLOYMENT,
-            input=text[:8000]  # 토큰 제한을 위해 텍스트 자르기
+        total_pages = get_page_count(pdf_path)
+        workers = min(PDF_EXTRACT_WORKERS, max(1, total_pages // PDF_PAGES_PER_TASK))
+        print(f"    총 {total_pages}페이지 읽는 중 (프로세스 {workers}개)...", end=" ")
+        pages = extract_pages(
+            pdf_path,
+            workers=workers,
+            pages_per_task=PDF_PAGES_PER_TASK,
+            on_progress=show_progress,
+            total_pages=total_pages,
         )
-        return response.data[0].embedding
+        print("완료!")
+        return pages
     except Exception as e:
-        print(f"\n    ⚠️  임베딩 생성 오류: {e}")
+        print(f"\n    ❌ PDF 읽기 오류: {e}")
         return []
 
 
+def get_embeddings_batch(texts: List[str]) -> List[List[float]]:
+    """여러 텍스트의 임베딩을 한 번의 API 호출로 생성 (입력 순서 유지)"""
+    client = init_openai_client()
+    options = {"dimensions": EMBEDDING_DIMENSIONS} if EMBEDDING_DIMENSIONS else {}
+    response = client.embeddings.create(
+        model=EMBEDDING_DEPLOYMENT,
+        input=[truncate_to_tokens(t, EMBEDDING_INPUT_MAX_TOKENS) for t in texts],
+        timeout=openai_timeout("embedding"),
+        **options
+    )
+    # 응답 순서가 보장되지 않으므로 index 기준으로 정렬
+    return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+
+def iter_embedding_batches(
+    items: Iterable[Tuple[str, str]],
+    max_items: int = EMBEDDING_BATCH_MAX_ITEMS,
+    max_tokens: int = EMBEDDING_BATCH_MAX_TOKENS,
+) -> Iterator[List[Tuple[str, str]]]:
+    """(청크 ID, 텍스트) 목록을 항목 수/토큰 수 제한 이내의 배치로 묶기"""
+    batch = []
+    batch_tokens = 0
+    for chunk_id, text in items:
+        tokens = min(count_tokens(text), EMBEDDING_INPUT_MAX_TOKENS)
+        if batch and (len(batch) >= max_items or batch_tokens + tokens > max_tokens):
+            yield batch
+            batch = []
+            batch_tokens = 0
+        batch.append((chunk_id, text))
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+def embed_batch_with_retry(
+    texts: List[str],
+    limiter: AdaptiveRateLimiter,
+    max_retries: int = EMBEDDING_MAX_RETRIES,
+) -> List[List[float]]:
+    """배치 임베딩 생성 (429/Retry-After 반영, 일시적 오류는 지수 백오프로 재시도)"""
+    attempt = 0
+    while True:
+        try:
+            with limiter:
+                vectors = get_embeddings_batch(texts)
+            limiter.on_success()
+            return vectors
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable_error(e):
+                raise
+            delay = get_retry_after(e)
+            if delay is None:
+                delay = backoff_delay(
+                    attempt, EMBEDDING_RETRY_BASE_DELAY, EMBEDDING_RETRY_MAX_DELAY
+                )
+            if get_status_code(e) == 429:
+                limiter.on_throttle(delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+            current_span().add("retries")
+
+
+def embed_batch_cached(
+    batch: List[Tuple[str, str]], limiter: AdaptiveRateLimiter, parent=None
+) -> Dict[str, List[float]]:
+    """배치 임베딩 (캐시에 있는 청크는 API를 호출하지 않음)
+
+    Args:
+        parent: "embed" 스팬의 부모 (작업자 스레드에서 호출할 때 지정)
+
+    Returns:
+        dict: {청크 ID: 벡터}
+    """
+    with span("embed", parent, items=len(batch)) as embed_span:
+        return _embed_batch_cached(batch, limiter, embed_span)
+
+
+def _embed_batch_cached(batch, limiter, embed_span) -> Dict[str, List[float]]:
+    cache = init_embedding_cache()
+    embeddings = {}
+    cache_keys = {
+        chunk_id: make_cache_key(text, EMBEDDING_DEPLOYMENT, EMBEDDING_DIMENSIONS) for chunk_id, text in batch
+    }
+    if cache is not None:
+        cached = cache.get_many(cache_keys.values())
+        for chunk_id, key in cache_keys.items():
+            if key in cached:
+                embeddings[chunk_id] = cached[key]
+
+    misses = [(chunk_id, text) for chunk_id, text in batch if chunk_id not in embeddings]
+    embed_span.set(cached=len(batch) - len(misses))
+    if misses:
+        embed_span.set(tokens=sum(min(count_tokens(text), EMBEDDING_INPUT_MAX_TOKENS) for _, text in misses))
+        vectors = embed_batch_with_retry([text for _, text in misses], limiter)
+        for (chunk_id, _), vector in zip(misses, vectors):
+            embeddings[chunk_id] = vector
+        if cache is not None:
+            cache.put_many(
+                (cache_keys[chunk_id], vector)
+                for (chunk_id, _), vector in zip(misses, vectors)
+            )
+    return embeddings
+
+
+def iter_embedded_batches(
+    items: Iterable[Tuple[str, str]],
+    concurrency: int = EMBEDDING_CONCURRENCY,
+) -> Iterator[Tuple[List[Tuple[str, str]], Optional[Dict[str, List[float]]], Optional[Exception]]]:
+    """(청크 ID, 텍스트) 스트림을 배치로 묶어 동시에 임베딩하고 완료 순서대로 생성
+
+    진행 중인 배치 수를 동시 요청 수의 2배로 제한하므로, 입력이 아무리 커도
+    메모리에 올라가는 청크 수가 일정하게 유지된다.
+
+    Yields:
+        tuple: (배치, {청크 ID: 벡터} 또는 None, 실패 시 예외 또는 None)
+    """
+    limiter = AdaptiveRateLimiter(concurrency)
+    max_pending = max(1, concurrency) * 2
+    parent = current_span()
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        pending = {}
+
+        def drain(return_when):
+            done, _ = wait(pending, return_when=return_when)
+            for future in done:
+                batch = pending.pop(future)
+                try:
+                    yield batch, future.result(), None
+                except Exception as e:
+                    yield batch, None, e
+
+        for batch in iter_embedding_batches(items):
+            pending[executor.submit(embed_batch_cached, batch, limiter, parent)] = batch
+            if len(pending) >= max_pending:
+                yield from drain(FIRST_COMPLETED)
+        while pending:
+            yield from drain(FIRST_COMPLETED)
+
+    if limiter.throttle_count:
+        print(f"\n    (429 스로틀링 {limiter.throttle_count}회, 동시 요청 {limiter.limit}개로 조정)", end=" ")
+
+
+def build_vector_search(compression: str = VECTOR_COMPRESSION) -> VectorSearch:
+    """벡터 검색 설정 (압축 방식에 따라 양자화 설정 추가)"""
+    compressions = []
+    profile_compression = None
+    if compression in ("scalar", "binary"):
+        # 원본을 버리면 이진 양자화만 압축 벡터로 재채점 가능
+        rescoring = RescoringOptions(
+            enable_rescoring=VECTOR_STORE_ORIGINALS or compression == "binary",
+            default_oversampling=VECTOR_OVERSAMPLING,
+            rescore_storage_method=(
+                VectorSearchCompressionRescoreStorageMethod.PRESERVE_ORIGINALS
+                if VECTOR_STORE_ORIGINALS
+                else VectorSearchCompressionRescoreStorageMethod.DISCARD_ORIGINALS
+            ),
+        )
+        profile_compression = f"{compression}-compression"
+        if compression == "scalar":
+            compressions.append(ScalarQuantizationCompression(
+                compression_name=profile_compression,
+                parameters=ScalarQuantizationParameters(
+                    quantized_data_type=VectorSearchCompressionTarget.INT8
+                ),
+                rescoring_options=rescoring,
+            ))
+        else:
+            compressions.append(BinaryQuantizationCompression(
+                compression_name=profile_compression,
+                rescoring_options=rescoring,
+            ))
+
+    return VectorSearch(
+        algorithms=[
+            HnswAlgorithmConfiguration(name="hnsw-config")
+        ],
+        profiles=[
+            VectorSearchProfile(
+                name="vector-profile",
+                algorithm_configuration_name="hnsw-config",
+                compression_name=profile_compression,
+            )
+        ],
+        compressions=compressions or None,
+    )
+
+
+def build_vector_field(compression: str = VECTOR_COMPRESSION) -> SearchField:
+    """벡터 필드 정의 (half는 float16 타입, 원본 미저장 시 stored=False)"""
+    storage_options = {} if VECTOR_STORE_ORIGINALS else {"retrievable": False, "stored": False}
+    return SearchField(
+        name="content_vector",
+        type="Collection(Edm.Half)" if compression == "half" else "Collection(Edm.Single)",
+        searchable=True,
+        vector_search_dimensions=VECTOR_DIMENSIONS,
+        vector_search_profile_name="vector-profile",
+        **storage_options
+    )
+
+
+def prepare_vector(embedding: List[float], compression: str = VECTOR_COMPRESSION) -> List[float]:
+    """인덱스 필드 타입에 맞게 벡터 변환
+
+    half 필드는 서비스에서 float16으로 저장되므로 유효 자릿수(약 3~4자리)만 보내
+    업로드 요청 크기를 줄인다. 양자화는 서비스가 수행하므로 원본 그대로 보낸다.
+    """
+    if compression == "half":
+        return [float(f"{value:.4g}") for value in embedding]
+    return embedding
+
+
 def create_search_index():
     """Azure Cognitive Search 인덱스 생성"""
     print("\n[1/3] 검색 인덱스 생성")
@@ -127,21 +428,12 @@ def create_search_index():
     try:
         index_client = SearchIndexClient(
             endpoint=SEARCH_ENDPOINT,
-            credential=AzureKeyCredential(SEARCH_KEY)
+            credential=AzureKeyCredential(SEARCH_KEY),
+            **azure_client_options("search")
         )
         
-        # 벡터 검색 설정
-        vector_search = VectorSearch(
-            algorithms=[
-                HnswAlgorithmConfiguration(name="hnsw-config")
-            ],
-            profiles=[
-                VectorSearchProfile(
-                    name="vector-profile",
-                    algorithm_configuration_name="hnsw-config"
-                )
-            ]
-        )
+        # 벡터 검색 설정 (VECTOR_COMPRESSION에 따라 압축)
+        vector_search = build_vector_search()
         
         # 시맨틱 검색 설정
         semantic_config = SemanticConfiguration(
@@ -163,13 +455,12 @@ def create_search_index():
             SearchableField(name="content", type="Edm.String"),
             SimpleField(name="source", type="Edm.String", filterable=True),
             SimpleField(name="chunk_id", type="Edm.Int32"),
-            SearchField(
-                name="content_vector",
-                type="Collection(Edm.Single)",
-                searchable=True,
-                vector_search_dimensions=1536,
-                vector_search_profile_name="vector-profile"
-            ),
+            # 페이지/절/문서 종류 메타데이터 (검색 범위를 좁히는 필터용)
+            SimpleField(name="page_start", type="Edm.Int32", filterable=True, sortable=True),
+            SimpleField(name="page_end", type="Edm.Int32", filterable=True, sortable=True),
+            SearchableField(name="section", type="Edm.String", filterable=True),
+            SimpleField(name="doc_type", type="Edm.String", filterable=True, facetable=True),
+            build_vector_field(),
         ]
         
         # 인덱스 생성
@@ -182,22 +473,30 @@ def create_search_index():
         
         result = index_client.create_or_update_index(index)
         print(f"✓ 인덱스 '{INDEX_NAME}' 생성 완료!")
-        print(f"  - 벡터 차원: 1536")
+        print(f"  - 벡터 차원: {VECTOR_DIMENSIONS}")
+        print(f"  - 벡터 압축: {VECTOR_COMPRESSION}"
+              + (f" (oversampling {VECTOR_OVERSAMPLING:g})" if VECTOR_COMPRESSION in ("scalar", "binary") else "")
+              + ("" if VECTOR_STORE_ORIGINALS else ", 원본 벡터 미저장"))
         print(f"  - 시맨틱 검색: 활성화")
+        print(f"  - 필터 필드: source, doc_type, page_start, page_end, section")
         
     except Exception as e:
         print(f"❌ 인덱스 생성 오류: {e}")
+        print("   (기존 인덱스의 벡터 필드 타입/압축 방식은 바꿀 수 없으므로, 변경 시 인덱스를 삭제 후 다시 생성하세요)")
         raise
 
 
 def get_blob_service_client():
-    """Blob Service Client 생성 (Storage Account Key 사용)"""
+    """Blob Service Client 생성 (연결 문자열 또는 Storage Account Key 사용)"""
     try:
+        if STORAGE_CONNECTION_STRING:
+            return create_blob_service_client(connection_string=STORAGE_CONNECTION_STRING)
+        
         # DefaultAzureCredential로 인증
         credential = DefaultAzureCredential()
         
         # Storage Management Client 생성
-        storage_client = StorageManagementClient(credential, SUBSCRIPTION_ID)
+        storage_client = StorageManagementClient(credential, SUBSCRIPTION_ID, **azure_client_options("management"))
         
         # Storage Account Key 가져오기
         storage_keys = storage_client.storage_accounts.list_keys(
@@ -208,7 +507,7 @@ def get_blob_service_client():
         
         # Blob Service Client 생성 (Account Key 사용)
         blob_service_url = f"https://{STORAGE_ACCOUNT}.blob.core.windows.net"
-        blob_service_client = BlobServiceClient(
+        blob_service_client = create_blob_service_client(
             account_url=blob_service_url,
             credential=storage_key
         )
@@ -220,8 +519,42 @@ def get_blob_service_client():
         raise
 
 
-def upload_pdfs_to_blob(data_folder: str = "./data"):
-    """로컬 PDF 파일을 Azure Blob Storage에 업로드"""
+def load_manifest() -> IndexManifest:
+    """증분 인덱싱 매니페스트 로드"""
+    return IndexManifest(
+        INDEX_MANIFEST_PATH, INDEX_NAME, settings_fingerprint(INDEX_SETTINGS)
+    )
+
+
+def get_indexed_ids(search_client, source: str) -> List[str]:
+    """인덱스에서 특정 원본 파일(source)의 문서 ID 목록 조회"""
+    results = search_client.search(
+        search_text="*",
+        filter=f"source eq {odata_quote(source)}",
+        select=["id"],
+    )
+    return [result["id"] for result in results]
+
+
+def delete_documents_by_id(search_client, doc_ids: List[str], batch_size: int = 1000) -> int:
+    """문서 ID 목록을 인덱스에서 삭제"""
+    deleted = 0
+    for start in range(0, len(doc_ids), batch_size):
+        batch = [{"id": doc_id} for doc_id in doc_ids[start:start + batch_size]]
+        search_client.delete_documents(documents=batch)
+        deleted += len(batch)
+    return deleted
+
+
+def delete_stale_documents(search_client, source: str, keep_ids: List[str]) -> int:
+    """원본 파일의 문서 중 이번 실행에서 생성되지 않은 청크(오래된 청크) 삭제"""
+    keep = set(keep_ids)
+    stale_ids = [doc_id for doc_id in get_indexed_ids(search_client, source) if doc_id not in keep]
+    return delete_documents_by_id(search_client, stale_ids)
+
+
+def upload_pdfs_to_blob(data_folder: str = "./data", full: bool = False):
+    """로컬 PDF 파일을 Azure Blob Storage에 업로드 (변경된 파일만)"""
     print("\n[2/3] PDF 파일 업로드")
     print("-" * 60)
     
@@ -243,29 +576,33 @@ def upload_pdfs_to_blob(data_folder: str = "./data"):
             print(f"⚠️  '{data_folder}' 폴더에 PDF 파일이 없습니다.")
             return []
         
+        # 매니페스트 기준으로 변경되지 않은 파일 제외
+        manifest = load_manifest()
+        total_files = len(pdf_files)
+        if not full:
+            pdf_files = [f for f in pdf_files if not manifest.is_uploaded(f)]
+            if len(pdf_files) < total_files:
+                print(f"\n변경 없음 (스킵): {total_files - len(pdf_files)}개")
+
         print(f"\n업로드할 파일: {len(pdf_files)}개")
         
         uploaded_files = []
-        for i, pdf_file in enumerate(pdf_files, 1):
-            blob_name = pdf_file.name
+        
+        def show_result(pdf_file, status, error):
             file_size_mb = pdf_file.stat().st_size / (1024 * 1024)
-            
-            print(f"\n  [{i}/{len(pdf_files)}] {blob_name} ({file_size_mb:.2f} MB)")
-            
-            try:
-                blob_client = blob_service_client.get_blob_client(
-                    container=CONTAINER_NAME,
-                    blob=blob_name
-                )
-                
-                with open(pdf_file, "rb") as data:
-                    blob_client.upload_blob(data, overwrite=True)
-                
-                print(f"    ✓ 업로드 완료")
-                uploaded_files.append(str(pdf_file))
-                
-            except Exception as e:
-                print(f"    ❌ 업로드 실패: {e}")
+            if error is not None:
+                print(f"  ❌ {pdf_file.name}: 업로드 실패: {error}")
+                return
+            if status == SKIPPED:
+                print(f"  - {pdf_file.name} ({file_size_mb:.2f} MB): Blob과 동일 (스킵)")
+            else:
+                print(f"  ✓ {pdf_file.name} ({file_size_mb:.2f} MB): 업로드 완료")
+            uploaded_files.append(str(pdf_file))
+            manifest.mark_uploaded(pdf_file)
+        
+        # 여러 파일을 동시에 올리고, Blob의 Content-MD5가 같으면 건너뜀
+        sync_files(container_client, pdf_files, skip_unchanged=not full, on_result=show_result)
+        manifest.save()
         
         print(f"\n✓ {len(uploaded_files)}/{len(pdf_files)}개 파일 업로드 완료!")
         return uploaded_files
@@ -275,8 +612,251 @@ def upload_pdfs_to_blob(data_folder: str = "./data"):
         raise
 
 
-def index_documents(data_folder: str = "./data"):
-    """PDF 문서를 읽고 Azure Cognitive Search에 인덱싱"""
+_END = object()  # 파이프라인 큐 종료 표시
+
+
+def iter_queue(q: queue.Queue) -> Iterator:
+    """종료 표시가 나올 때까지 큐 항목 생성"""
+    while True:
+        item = q.get()
+        if item is _END:
+            return
+        yield item
+
+
+def build_document(pdf_file: Path, chunk_id: str, chunk_number: int, chunk: Chunk,
+                   embedding: List[float]) -> Dict:
+    """검색 인덱스 문서 생성"""
+    return {
+        "id": chunk_id,
+        "title": pdf_file.stem,
+        "content": chunk.text,
+        "source": pdf_file.name,
+        "chunk_id": chunk_number,
+        "page_start": chunk.page_start,
+        "page_end": chunk.page_end,
+        "section": chunk.section,
+        "doc_type": detect_doc_type(pdf_file.name),
+        "content_vector": prepare_vector(embedding),
+    }
+
+
+def index_pdf_file(pdf_file: Path, uploader: IndexUploader,
+                   local_store: Optional[LocalVectorStoreWriter] = None,
+                   collect_pages: bool = False) -> Dict:
+    """PDF 한 개를 스트리밍 파이프라인으로 인덱싱
+
+    페이지 추출 → 청크 분할 (생산자 스레드)
+      → chunk_queue → 임베딩 작업자 (현재 스레드, 동시 요청)
+      → doc_queue → 인덱스 업로드 (업로드 스레드, 배치 동시 전송)
+
+    각 단계 사이의 큐는 크기가 제한되어 있어 뒤 단계가 느리면 앞 단계가 기다리므로,
+    PDF 크기와 관계없이 메모리 사용량이 일정하게 유지된다.
+
+    Args:
+        collect_pages: True이면 추출한 (페이지 번호, 텍스트)를 result["pages_text"]에 모음
+            (에러 참조 안내서를 에러 코드 색인용으로 다시 추출하지 않도록)
+
+    Returns:
+        dict: 페이지/글자/청크/문서 수, 청크 ID 목록, 실패 정보
+    """
+    result = {
+        "pages": 0,
+        "total_pages": 0,
+        "chars": 0,
+        "chunks": 0,
+        "embedded": 0,
+        "documents": 0,
+        "chunk_ids": [],
+        "failed_ids": [],
+        "upload_failed_ids": [],
+        "extract_failed": False,
+        "pages_text": [] if collect_pages else None,
+    }
+    chunk_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    doc_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    pending_chunks = {}  # 처리 중인 청크의 ID → (순번, 청크) (임베딩이 끝나면 제거)
+    cancelled = threading.Event()  # 임베딩 단계 오류 시 생산자 중단
+    # 생산자/업로드 스레드의 스팬도 파일 스팬 아래에 기록
+    file_span = current_span()
+
+    def show_progress():
+        print(
+            f"\r    진행: 페이지 {result['pages']}/{result['total_pages']} · "
+            f"청크 {result['chunks']} · 임베딩 {result['embedded']} · "
+            f"업로드 {result['documents']}",
+            end="",
+            flush=True,
+        )
+
+    def produce_chunks():
+        """페이지 추출 및 청크 분할 단계
+
+        두 단계가 지연 생성으로 맞물려 있으므로 페이지를 꺼내는 시간을 추출,
+        나머지 청크 생성 시간을 청크 분할로 나누어 기록한다 (큐 대기 시간 제외).
+        """
+        extract_watch = Stopwatch()
+        chunk_watch = Stopwatch()
+        try:
+            total_pages = get_page_count(str(pdf_file))
+            result["total_pages"] = total_pages
+            workers = min(PDF_EXTRACT_WORKERS, max(1, total_pages // PDF_PAGES_PER_TASK))
+
+            def count_pages(pages):
+                for page_number, page_text in pages:
+                    result["pages"] += 1
+                    result["chars"] += len(page_text)
+                    if collect_pages:
+                        result["pages_text"].append((page_number, page_text))
+                    yield page_number, page_text
+
+            pages = iter_pages(
+                str(pdf_file), workers=workers, pages_per_task=PDF_PAGES_PER_TASK,
+                total_pages=total_pages,
+            )
+            chunks = iter_chunks(
+                count_pages(timed_iter(pages, extract_watch)), CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS
+            )
+            chunks = timed_iter(chunks, chunk_watch)
+            for i, chunk in enumerate(chunks):
+                if cancelled.is_set():
+                    break
+                chunk_id = f"{pdf_file.stem}_{i}"
+                pending_chunks[chunk_id] = (i, chunk)
+                result["chunk_ids"].append(chunk_id)
+                result["chunks"] += 1
+                chunk_queue.put((chunk_id, chunk.text))
+        except Exception as e:
+            # 파일 중간에서 실패하면 일부 청크만 만들어졌으므로 호출자가 기존 문서를 지우지 않도록 표시
+            print(f"\n    ❌ PDF 읽기 오류: {e}")
+            result["extract_failed"] = True
+        finally:
+            record_span(
+                "extract", extract_watch.seconds, file_span,
+                pages=result["pages"], chars=result["chars"], bytes=pdf_file.stat().st_size,
+            )
+            record_span(
+                "chunk", max(0.0, chunk_watch.seconds - extract_watch.seconds), file_span,
+                chunks=result["chunks"],
+            )
+            chunk_queue.put(_END)
+
+    def upload_documents():
+        """인덱스 업로드 단계 (재시도 후에도 실패한 문서의 ID를 기록)"""
+
+        def on_batch(succeeded, failed):
+            result["documents"] += succeeded
+            result["upload_failed_ids"].extend(failed)
+            for key, message in list(failed.items())[:3]:
+                print(f"\n    ⚠️  인덱싱 실패: {key} ({message})")
+
+        try:
+            uploader.upload(iter_queue(doc_queue), on_batch, parent=file_span)
+        except Exception as e:
+            print(f"\n    ⚠️  인덱싱 오류: {e}")
+            result["upload_failed_ids"].append("*")
+            # 임베딩 단계가 막히지 않도록 남은 문서를 비움
+            for _ in iter_queue(doc_queue):
+                pass
+
+    producer = threading.Thread(target=produce_chunks, daemon=True)
+    upload_thread = threading.Thread(target=upload_documents, daemon=True)
+    producer.start()
+    upload_thread.start()
+
+    # 임베딩 단계: 완료된 배치부터 바로 문서로 만들어 업로드 큐로 전달
+    try:
+        for batch, vectors, error in iter_embedded_batches(iter_queue(chunk_queue)):
+            if error is not None:
+                print(f"\n    ⚠️  임베딩 생성 실패 ({len(batch)}개 청크): {error}")
+                result["failed_ids"].extend(chunk_id for chunk_id, _ in batch)
+            else:
+                for chunk_id, _ in batch:
+                    chunk_number, chunk = pending_chunks[chunk_id]
+                    document = build_document(
+                        pdf_file, chunk_id, chunk_number, chunk, vectors[chunk_id]
+                    )
+                    if local_store is not None:
+                        local_store.add(document)
+                    doc_queue.put(document)
+                result["embedded"] += len(batch)
+            for chunk_id, _ in batch:
+                pending_chunks.pop(chunk_id, None)
+            show_progress()
+    except BaseException:
+        # 생산자가 가득 찬 chunk_queue에서 막히지 않도록 중단 신호를 보내고 남은 청크를 비움
+        cancelled.set()
+        while producer.is_alive():
+            try:
+                chunk_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        raise
+    finally:
+        doc_queue.put(_END)
+        producer.join()
+        upload_thread.join()
+
+    show_progress()
+    print()
+    return result
+
+
+def needs_error_code_update(pdf_file: Path, full: bool = False) -> bool:
+    """에러 코드 색인을 다시 만들어야 하는 에러 참조 안내서인지"""
+    if detect_doc_type(pdf_file.name) != "error_reference":
+        return False
+    index = ErrorCodeIndex.load(ERROR_CODE_INDEX_PATH)
+    return full or not index.is_current(pdf_file.name, file_sha256(str(pdf_file)))
+
+
+def update_error_code_index(pdf_files: List[Path], full: bool = False,
+                            extracted: Optional[Dict[str, List[Tuple[int, str]]]] = None) -> Optional[Dict]:
+    """에러 참조 안내서 PDF를 에러 코드 색인으로 파싱 (내용이 바뀐 파일만)
+
+    Args:
+        extracted: 인덱싱 중에 이미 추출한 {파일 이름: (페이지 번호, 텍스트) 목록}
+            (없는 파일만 PDF를 다시 읽음)
+
+    Returns:
+        dict: 전체 에러 코드 수, 다시 파싱한 파일 수 (에러 참조 안내서가 없으면 None)
+    """
+    error_files = [f for f in pdf_files if detect_doc_type(f.name) == "error_reference"]
+    index = ErrorCodeIndex.load(ERROR_CODE_INDEX_PATH)
+    if not error_files and not index.sources:
+        return None
+
+    changed = 0
+    current_names = {f.name for f in error_files}
+    for name in [name for name in index.sources if name not in current_names]:
+        index.remove_source(name)
+        changed += 1
+
+    for pdf_file in error_files:
+        sha256 = file_sha256(str(pdf_file))
+        if not full and index.is_current(pdf_file.name, sha256):
+            continue
+        print(f"📕 에러 코드 색인: {pdf_file.name}")
+        pages = (extracted or {}).get(pdf_file.name)
+        if pages is None:
+            pages = extract_pages_from_pdf(str(pdf_file))
+        entries = parse_error_pages(pages, pdf_file.name)
+        index.replace_source(pdf_file.name, sha256, entries)
+        changed += 1
+        print(f"    ✓ 에러 코드 {len(entries)}개")
+
+    if changed:
+        index.save(ERROR_CODE_INDEX_PATH)
+    return {"codes": len(index), "changed": changed}
+
+
+def index_documents(data_folder: str = "./data", full: bool = False):
+    """PDF 문서를 읽고 Azure Cognitive Search에 인덱싱 (변경된 파일만)
+
+    Args:
+        data_folder: PDF 폴더 경로
+        full: True이면 매니페스트를 무시하고 모든 파일을 다시 인덱싱
+    """
     print("\n[3/3] PDF 문서 인덱싱")
     print("-" * 60)
     
@@ -284,92 +864,148 @@ def index_documents(data_folder: str = "./data"):
         search_client = SearchClient(
             endpoint=SEARCH_ENDPOINT,
             index_name=INDEX_NAME,
-            credential=AzureKeyCredential(SEARCH_KEY)
+            credential=AzureKeyCredential(SEARCH_KEY),
+            **azure_client_options("search")
         )
         
         pdf_files = list(Path(data_folder).glob("*.pdf"))
+        manifest = load_manifest()
+        local_store = (
+            LocalVectorStoreWriter(LOCAL_VECTOR_STORE_PATH, VECTOR_DIMENSIONS)
+            if LOCAL_VECTOR_STORE else None
+        )
+
+        # 폴더에서 삭제된 PDF의 문서 정리
+        current_names = {f.name for f in pdf_files}
+        for removed_name in [name for name in manifest.files if name not in current_names]:
+            deleted = delete_documents_by_id(
+                search_client, get_indexed_ids(search_client, removed_name)
+            )
+            manifest.forget_indexed(removed_name)
+            manifest.save()
+            if local_store is not None:
+                local_store.remove_source(removed_name)
+            print(f"🗑️  삭제된 파일 정리: {removed_name} (문서 {deleted}개 삭제)")
         
         if not pdf_files:
             print(f"⚠️  '{data_folder}' 폴더에 PDF 파일이 없습니다.")
+            if local_store is not None:
+                local_store.commit()
             return
         
+        # 변경되지 않은 파일 제외
+        total_files = len(pdf_files)
+        if not full:
+            pdf_files = [f for f in pdf_files if not manifest.is_indexed(f)]
+            manifest.save()
+            if len(pdf_files) < total_files:
+                print(f"\n변경 없음 (스킵): {total_files - len(pdf_files)}개")
+        
         print(f"\n인덱싱할 파일: {len(pdf_files)}개\n")
         
+        # 파일 간에 공유하여 스로틀링 상태 유지
+        # (INDEX_UPLOAD_BATCH_MAX_DOCS/MB, INDEX_UPLOAD_CONCURRENCY, INDEX_UPLOAD_MAX_RETRIES)
+        uploader = IndexUploader(search_client)
         total_documents = 0
         total_chunks = 0
+        total_failed = 0
+        total_upload_failed = 0
+        # 에러 참조 안내서는 인덱싱하며 추출한 페이지로 에러 코드 색인도 갱신 (PDF를 한 번만 읽음)
+        error_pages = {}
         
         for file_idx, pdf_file in enumerate(pdf_files, 1):
             print(f"[{file_idx}/{len(pdf_files)}] 처리 중: {pdf_file.name}")
             
-            # 1. PDF 텍스트 추출
-            text = extract_text_from_pdf(str(pdf_file))
-            if not text.strip():
+            # 1~4. 추출 → 청크 분할 → 임베딩 → 업로드 (스트리밍 파이프라인)
+            if local_store is not None:
+                local_store.remove_source(pdf_file.name)
+            with span("index_file", source=pdf_file.name, bytes=pdf_file.stat().st_size) as file_span:
+                result = index_pdf_file(
+                    pdf_file, uploader, local_store,
+                    collect_pages=needs_error_code_update(pdf_file, full),
+                )
+                file_span.set(
+                    pages=result["pages"], chunks=result["chunks"], documents=result["documents"],
+                    failed=len(result["failed_ids"]) + len(result["upload_failed_ids"]),
+                )
+            if result["pages_text"] is not None and not result["extract_failed"]:
+                error_pages[pdf_file.name] = result.pop("pages_text")
+            if not result["chunks"] and not result["extract_failed"]:
                 print(f"    ⚠️  텍스트를 추출할 수 없습니다. 스킵합니다.")
                 continue
             
-            print(f"    추출된 텍스트: {len(text):,}자")
-            
-            # 2. 텍스트 청크 분할
-            chunks = chunk_text(text)
-            total_chunks += len(chunks)
-            print(f"    생성된 청크: {len(chunks)}개")
-            
-            # 3. 임베딩 생성 및 인덱싱
-            documents = []
-            print(f"    임베딩 생성 중...", end=" ")
-            
-            for i, chunk in enumerate(chunks):
-                if not chunk.strip():
-                    continue
-                
-                # 임베딩 생성
-                embedding = get_embedding(chunk)
-                if not embedding:
-                    continue
-                
-                doc_id = f"{pdf_file.stem}_{i}"
-                document = {
-                    "id": doc_id,
-                    "title": pdf_file.stem,
-                    "content": chunk,
-                    "source": pdf_file.name,
-                    "chunk_id": i,
-                    "content_vector": embedding
-                }
-                
-                documents.append(document)
-                
-                # 진행 상황 표시
-                if (i + 1) % 10 == 0 or (i + 1) == len(chunks):
-                    print(f"{i + 1}/{len(chunks)}", end=" ")
-                
-                # 배치로 업로드 (50개씩)
-                if len(documents) >= 50:
-                    try:
-                        search_client.upload_documents(documents=documents)
-                        total_documents += len(documents)
-                        documents = []
-                    except Exception as e:
-                        print(f"\n    ⚠️  인덱싱 오류: {e}")
+            total_chunks += result["chunks"]
+            total_documents += result["documents"]
+            failed_ids = result["failed_ids"]
+            upload_failed_ids = result["upload_failed_ids"]
+            file_failed = bool(failed_ids) or bool(upload_failed_ids) or result["extract_failed"]
+            if result["extract_failed"]:
+                print(f"    ❌ PDF 읽기 실패: 기존 문서를 유지하고 다음 실행 때 다시 처리합니다.")
+            if failed_ids:
+                total_failed += len(failed_ids)
+                print(f"    ❌ 임베딩 실패 청크: {len(failed_ids)}개 ({', '.join(failed_ids[:5])}...)")
+            if upload_failed_ids:
+                total_upload_failed += len(upload_failed_ids)
+                print(f"    ❌ 인덱싱 실패 문서: {len(upload_failed_ids)}개 ({', '.join(upload_failed_ids[:5])}...)")
+            print(
+                f"    ✓ 페이지 {result['pages']}개, {result['chars']:,}자 → "
+                f"청크 {result['chunks']}개, 인덱싱 {result['documents']}개"
+            )
             
-            # 남은 문서 업로드
-            if documents:
-                try:
-                    search_client.upload_documents(documents=documents)
-                    total_documents += len(documents)
-                    print("\n    ✓ 인덱싱 완료")
-                except Exception as e:
-                    print(f"\n    ⚠️  인덱싱 오류: {e}")
+            # 5. 오래된 청크 삭제 및 매니페스트 갱신
+            #    (실패한 청크가 있거나 PDF를 끝까지 읽지 못했으면 삭제/기록하지 않아 다음 실행 때 다시 처리)
+            chunk_ids = result["chunk_ids"]
+            if not file_failed:
+                stale = delete_stale_documents(search_client, pdf_file.name, chunk_ids)
+                if stale:
+                    print(f"    🗑️  오래된 청크 {stale}개 삭제")
+                manifest.mark_indexed(pdf_file, chunk_ids)
             else:
-                print("완료")
+                manifest.forget_indexed(pdf_file.name)
+            manifest.save()
             
             print()
         
+        if local_store is not None:
+            store_stats = local_store.commit()
+        
+        # 에러 참조 안내서 → 에러 코드 색인 (챗봇의 코드 조회용)
+        error_stats = update_error_code_index(
+            list(Path(data_folder).glob("*.pdf")), full=full, extracted=error_pages
+        )
+        
         print("-" * 60)
         print(f"✓ 인덱싱 완료!")
-        print(f"  - 처리된 파일: {len(pdf_files)}개")
+        print(f"  - 처리된 파일: {len(pdf_files)}개 (전체 {total_files}개)")
         print(f"  - 생성된 청크: {total_chunks}개")
         print(f"  - 인덱싱된 문서: {total_documents}개")
+        if total_failed:
+            print(f"  - 임베딩 실패 청크: {total_failed}개")
+        if total_upload_failed:
+            print(f"  - 인덱싱 실패 문서: {total_upload_failed}개")
+        if uploader.retried or uploader.limiter.throttle_count:
+            print(
+                f"  - 인덱스 업로드 재시도: 문서 {uploader.retried}개 "
+                f"(스로틀링 {uploader.limiter.throttle_count}회, 동시 요청 {uploader.limiter.limit}개로 조정)"
+            )
+        if local_store is not None:
+            print(
+                f"  - 로컬 벡터 저장소: {store_stats['count']}개 청크 "
+                f"(추가 {store_stats['added']}개, ANN {'사용' if store_stats['ann'] else '미사용'}) → {LOCAL_VECTOR_STORE_PATH}"
+            )
+        if error_stats is not None:
+            print(f"  - 에러 코드 색인: {error_stats['codes']}개 → {ERROR_CODE_INDEX_PATH}")
+        stage_lines = get_telemetry().format_summary(["extract", "chunk", "embed", "upload", "index_file"])
+        if stage_lines:
+            print("  - 단계별 실행 시간:")
+            for line in stage_lines:
+                print(f"      {line}")
+        if embedding_cache is not None:
+            stats = embedding_cache.stats()
+            print(
+                f"  - 임베딩 캐시: 적중 {stats['hits']}개 / 미스 {stats['misses']}개 "
+                f"(적중률 {stats['hit_rate']:.0%}, {stats['entries']}개 항목, {stats['size_mb']:.1f} MB)"
+            )
         
     except Exception as e:
         print(f"❌ 인덱싱 중 오류 발생: {e}")
@@ -412,8 +1048,22 @@ def verify_environment():
     return True
 
 
+def parse_args():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="PDF 업로드 및 인덱싱")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="매니페스트를 무시하고 모든 파일을 다시 업로드/인덱싱",
+    )
+    parser.add_argument("--data-folder", default="./data", help="PDF 폴더 경로")
+    return parser.parse_args()
+
+
 def main():
     """메인 실행 함수"""
+    args = parse_args()
+
     print("\n" + "=" * 60)
     print("Azure OpenAI RAG - PDF 업로드 및 인덱싱")
     print("=" * 60)
@@ -421,16 +1071,20 @@ def main():
     # 환경 변수 확인
     if not verify_environment():
         return
+
+    # 인덱싱 중 단계별 메트릭 노출 (TELEMETRY_PROMETHEUS_PORT가 설정된 경우)
+    if get_telemetry().start_metrics_server():
+        print(f"📈 메트릭: http://localhost:{TELEMETRY_PROMETHEUS_PORT}/metrics")
     
     try:
         # 1. 검색 인덱스 생성
         create_search_index()
         
         # 2. PDF 파일을 Blob Storage에 업로드
-        upload_pdfs_to_blob()
+        upload_pdfs_to_blob(args.data_folder, full=args.full)
         
         # 3. PDF 문서 인덱싱
-        index_documents()
+        index_documents(args.data_folder, full=args.full)
         
         # 완료 메시지
         print("\n" + "=" * 60)
@@ -6,8 +6,29 @@ Tibero 문서 검색 및 질의응답 시스템
 """
 
 import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import uuid
 from dotenv import load_dotenv
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI, AzureOpenAI
+
+from conversation_history import compact_messages, make_summarizer, split_system_content
+from error_codes import (
+    ERROR_CODE_INDEX_PATH,
+    ErrorCodeIndex,
+    create_pinned_message,
+    format_answer,
+    is_code_lookup,
+    to_citations,
+)
+from http_transport import create_async_openai_http_client, get_openai_http_client
+from rate_limit import backoff_delay, get_retry_after, is_retryable_error
+from search_filters import DOC_TYPE_LABELS, build_search_filter, infer_doc_types
+from telemetry import TELEMETRY_PROMETHEUS_PORT, get_telemetry, span
+from usage_log import empty_usage, format_tokens, get_usage_log, measure_usage, stream_usage_options
 
 # 환경 변수 로드
 load_dotenv()
@@ -21,14 +42,39 @@ AZURE_SEARCH_API_KEY = os.getenv("AZURE_SEARCH_API_KEY")
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 INDEX_NAME = os.getenv("AZURE_SEARCH_INDEX")
 API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION")
+# 임베딩 차원 수 (인덱싱 때와 같은 값이어야 함, 비워 두면 모델 기본 차원)
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS") or 0) or None
+# 검색 방식: vector / simple(키워드) / semantic / vector_simple_hybrid / vector_semantic_hybrid
+# (하이브리드는 키워드와 벡터 결과를 RRF로 결합 - 에러 코드 등 정확한 용어 질의에 유리)
+SEARCH_QUERY_TYPE = os.getenv("SEARCH_QUERY_TYPE", "vector")
+SEMANTIC_CONFIGURATION = "semantic-config"
+# 에러 코드 색인 (02_upload_and_index.py가 에러 참조 안내서로 생성)
+ERROR_CODE_LOOKUP = os.getenv("ERROR_CODE_LOOKUP", "true").lower() == "true"
+# 배치 모드: 동시 요청 수, 일시적 오류(429 등) 재시도 횟수
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_MAX_RETRIES = int(os.getenv("BATCH_MAX_RETRIES", "6"))
+# 사용량 로그에서 이 실행의 답변을 묶기 위한 ID
+SESSION_ID = f"cli-{uuid.uuid4().hex[:8]}"
 
 
 def create_chat_client():
-    """Azure OpenAI 클라이언트 생성"""
+    """Azure OpenAI 클라이언트 생성 (공유 연결 풀 사용)"""
     return AzureOpenAI(
         api_key=AZURE_OPENAI_API_KEY,
         azure_endpoint=AZURE_OPENAI_ENDPOINT,
         api_version=API_VERSION,
+        http_client=get_openai_http_client(),
+    )
+
+
+def create_async_chat_client():
+    """비동기 Azure OpenAI 클라이언트 생성 (배치 모드, 재시도는 직접 처리, 연결 풀은 클라이언트와 함께 닫힘)"""
+    return AsyncAzureOpenAI(
+        api_key=AZURE_OPENAI_API_KEY,
+        azure_endpoint=AZURE_OPENAI_ENDPOINT,
+        api_version=API_VERSION,
+        max_retries=0,
+        http_client=create_async_openai_http_client(),
     )
 
 
@@ -48,9 +94,24 @@ def create_system_message():
     }
 
 
-def create_rag_parameters():
-    """RAG 파라미터 생성"""
-    return {
+def create_embedding_dependency():
+    """질의 임베딩 설정 (인덱스와 같은 차원으로 임베딩)"""
+    dependency = {
+        "type": "deployment_name",
+        "deployment_name": AZURE_DEPLOYMENT_EMBEDDING_NAME,
+    }
+    if EMBEDDING_DIMENSIONS:
+        dependency["dimensions"] = EMBEDDING_DIMENSIONS
+    return dependency
+
+
+def create_rag_parameters(search_filter=None):
+    """RAG 파라미터 생성
+
+    Args:
+        search_filter: OData 필터 (예: "doc_type eq 'jdbc'"), None이면 전체 검색
+    """
+    rag_params = {
         "data_sources": [
             {
                 "type": "azure_search",
@@ -61,68 +122,138 @@ def create_rag_parameters():
                         "type": "api_key",
                         "key": AZURE_SEARCH_API_KEY,
                     },
-                    "query_type": "vector",
-                    "embedding_dependency": {
-                        "type": "deployment_name",
-                        "deployment_name": AZURE_DEPLOYMENT_EMBEDDING_NAME,
-                    },
+                    "query_type": SEARCH_QUERY_TYPE,
+                    "embedding_dependency": create_embedding_dependency(),
                     "top_n_documents": 5,  # 검색할 문서 수
                     "strictness": 3,  # 관련성 엄격도 (1-5, 높을수록 엄격)
                 },
             }
         ],
     }
+    if "semantic" in SEARCH_QUERY_TYPE:
+        rag_params["data_sources"][0]["parameters"]["semantic_configuration"] = SEMANTIC_CONFIGURATION
+    if search_filter:
+        rag_params["data_sources"][0]["parameters"]["filter"] = search_filter
+    return rag_params
 
 
-def get_answer(chat_client, messages, question):
-    """질문에 대한 답변을 생성합니다.
+def get_answer(chat_client, messages, question, search_filter=None, error_index=None):
+    """질문에 대한 답변을 생성하며 도착하는 토큰을 바로 출력합니다.
     
     Args:
         chat_client: Azure OpenAI 클라이언트
         messages: 대화 히스토리
         question: 사용자 질문
+        search_filter: 검색 범위 OData 필터 (None이면 전체 검색)
+        error_index: 에러 코드 색인 (코드만 묻는 질문은 표로 바로 답변)
         
     Returns:
-        tuple: (답변 텍스트, 인용 정보)
+        tuple: (답변 텍스트, 인용 정보, 응답 정보 {"ttft": 첫 토큰까지 초, "elapsed": 전체 초,
+            "usage": 토큰 사용량 (GPT를 호출한 경우)}) - 오류 시 응답 정보는 None
     """
-    # 사용자 메시지 추가
-    messages.append({"role": "user", "content": question})
+    with span("answer", backend="azure_search", query_type=SEARCH_QUERY_TYPE) as answer_span:
+        # 사용자 메시지 추가
+        user_message = {"role": "user", "content": question}
+        messages.append(user_message)
+        started = time.perf_counter()
 
-    # RAG 파라미터
-    rag_params = create_rag_parameters()
+        # 에러 코드 색인 조회 (코드만 묻는 질문은 검색/GPT 호출 없이 표로 답변)
+        error_entries = error_index.find(question) if error_index is not None else []
+        if error_entries and is_code_lookup(question):
+            answer = format_answer(error_entries)
+            messages.append({"role": "assistant", "content": answer})
+            print("\n" + "=" * 70)
+            print("답변 (에러 코드 색인):")
+            print("=" * 70)
+            print(answer)
+            answer_span.set(source="error_code")
+            elapsed = time.perf_counter() - started
+            return answer, to_citations(error_entries), {"ttft": elapsed, "elapsed": elapsed}
+        # 질문에 나온 에러 항목은 검색 결과와 별도로 근거에 고정
+        pinned = [create_pinned_message(error_entries)] if error_entries else []
 
-    try:
-        print("\n답변 생성 중...", end=" ", flush=True)
-        
-        response = chat_client.chat.completions.create(
-            model=AZURE_DEPLOYMENT_MODEL,
-            messages=messages,
-            temperature=0.7,  # 창의성 조절 (0-1)
-            max_tokens=1000,  # 최대 토큰 수
-            extra_body=rag_params,
-        )
+        # RAG 파라미터
+        rag_params = create_rag_parameters(search_filter)
 
-        # 답변 추출
-        answer = response.choices[0].message.content
-        
-        # 어시스턴트 메시지 저장
-        messages.append({"role": "assistant", "content": answer})
-        
-        # 인용 정보 추출 (있는 경우)
-        citations = []
-        if hasattr(response.choices[0].message, 'context'):
-            context = response.choices[0].message.context
-            if context and 'citations' in context:
-                citations = context['citations']
+        try:
+            print("\n답변 생성 중...", end=" ", flush=True)
+
+            # On Your Data는 검색이 생성 요청 안에서 이루어지므로 generate 스팬에 포함
+            parts = []
+            citations = []
+            ttft = None
+            usage = None
+            request_messages = messages[:-1] + pinned + [user_message]
+            with span("generate", model=AZURE_DEPLOYMENT_MODEL) as generate_span:
+                response = chat_client.chat.completions.create(
+                    model=AZURE_DEPLOYMENT_MODEL,
+                    messages=request_messages,
+                    temperature=0.7,  # 창의성 조절 (0-1)
+                    max_tokens=1000,  # 최대 토큰 수
+                    extra_body=rag_params,
+                    stream=True,
+                    **stream_usage_options(),
+                )
+
+                for chunk in response:
+                    # 사용량은 마지막 청크(choices가 빈 청크)에 담겨 옴
+                    usage = getattr(chunk, "usage", None) or usage
+                    if not chunk.choices:  # 사용량/콘텐츠 필터 결과 등 choices가 빈 청크
+                        continue
+                    delta = chunk.choices[0].delta
+
+                    # 인용 정보 추출 (보통 첫 델타의 context에 담겨 옴)
+                    context = getattr(delta, "context", None)
+                    if context and 'citations' in context:
+                        citations = context['citations']
+
+                    if delta.content:
+                        if ttft is None:
+                            ttft = time.perf_counter() - started
+                            generate_span.set(ttft_ms=round(generate_span.duration * 1000, 1))
+                            print("\n" + "=" * 70)
+                            print("답변:")
+                            print("=" * 70)
+                        parts.append(delta.content)
+                        print(delta.content, end="", flush=True)
+
+                # 스트림에 사용량이 없으면 토크나이저로 추정 (검색 문서는 인용 내용으로)
+                token_usage = measure_usage(
+                    request_messages, "".join(parts),
+                    history_messages=messages[1:-1], citations=citations, usage=usage,
+                )
+                generate_span.set(
+                    prompt_tokens=token_usage["prompt_tokens"],
+                    completion_tokens=token_usage["completion_tokens"],
+                    citations=len(citations),
+                )
+
+            # 답변
+            answer = "".join(parts)
+            print()
+            # 고정한 에러 항목도 참고 문서로 표시 ([docN] 번호가 바뀌지 않도록 뒤에 추가)
+            citations = citations + to_citations(error_entries)
         
-        print("완료!")
+            # 어시스턴트 메시지 저장
+            messages.append({"role": "assistant", "content": answer})
         
-        return answer, citations
+            answer_span.set(source="generate", citations=len(citations))
+            timing = {"ttft": ttft, "elapsed": time.perf_counter() - started, "usage": token_usage}
+            usage_log = get_usage_log()
+            if usage_log is not None:
+                usage_log.append({
+                    "session": SESSION_ID, "source": "generate", "model": AZURE_DEPLOYMENT_MODEL,
+                    "backend": "azure_search", "query_type": SEARCH_QUERY_TYPE,
+                    **token_usage, "citations": len(citations),
+                    "ttft": round(ttft, 3) if ttft is not None else None,
+                    "elapsed": round(timing["elapsed"], 3),
+                })
+            return answer, citations, timing
 
-    except Exception as e:
-        error_msg = f"오류 발생: {str(e)}"
-        print(f"\n❌ {error_msg}")
-        return error_msg, []
+        except Exception as e:
+            error_msg = f"오류 발생: {str(e)}"
+            print(f"\n❌ {error_msg}")
+            return error_msg, [], None
 
 
 
@@ -151,13 +282,8 @@ def remove_duplicate_citations(citations):
     return unique_citations
 
 
-def display_answer(answer, citations=None):
-    """답변과 인용 정보를 표시합니다."""
-    print("\n" + "=" * 70)
-    print("답변:")
-    print("=" * 70)
-    print(answer)
-    
+def display_citations(citations, timing=None):
+    """인용 정보와 응답 시간을 표시합니다."""
     # 인용 정보가 있는 경우 표시 (중복 제거)
     if citations:
         unique_citations = remove_duplicate_citations(citations)
@@ -171,14 +297,35 @@ def display_answer(answer, citations=None):
             if url:
                 print(f"   URL: {url}")
     
+    if timing and timing.get("ttft") is not None:
+        print(f"\n⚡ 첫 토큰 {timing['ttft']:.2f}초 / 전체 {timing['elapsed']:.2f}초")
+    if timing and timing.get("usage"):
+        print(f"🧮 {format_tokens(timing['usage'])}")
+    
     print("=" * 70 + "\n")
 
+
+def display_answer(answer, citations=None):
+    """답변과 인용 정보를 표시합니다."""
+    print("\n" + "=" * 70)
+    print("답변:")
+    print("=" * 70)
+    print(answer)
+    display_citations(citations)
+
 def display_conversation_history(messages):
     """대화 히스토리 표시"""
     print("\n" + "=" * 70)
     print("대화 히스토리:")
     print("=" * 70)
     
+    # 요약으로 접힌 이전 대화
+    summary = split_system_content(messages[0]["content"])[1] if messages else ""
+    if summary:
+        print("[이전 대화 요약]")
+        print(summary)
+        print("-" * 70)
+    
     for i, msg in enumerate(messages[1:], 1):  # 시스템 메시지 제외
         role = "사용자" if msg["role"] == "user" else "어시스턴트"
         content = msg["content"][:100] + "..." if len(msg["content"]) > 100 else msg["content"]
@@ -203,11 +350,13 @@ def show_help():
     print("  history      - 대화 히스토리 표시")
     print("  reset        - 대화 초기화")
     print("  settings     - 현재 설정 표시")
+    print("  filter <종류> - 검색 문서 종류 지정 (" + ", ".join(DOC_TYPE_LABELS) + ")")
+    print("  filter off   - 문서 종류 지정 해제 (질문으로 자동 선택)")
     print("  quit / exit  - 프로그램 종료")
     print("=" * 70 + "\n")
 
 
-def show_settings():
+def show_settings(doc_types=None):
     """현재 설정 표시"""
     print("\n" + "=" * 70)
     print("현재 설정:")
@@ -218,11 +367,288 @@ def show_settings():
     print(f"GPT Model:        {AZURE_DEPLOYMENT_MODEL}")
     print(f"Embedding Model:  {AZURE_DEPLOYMENT_EMBEDDING_NAME}")
     print(f"API Version:      {API_VERSION}")
+    print(f"검색 방식:        {SEARCH_QUERY_TYPE}")
+    print(f"문서 종류 필터:   {', '.join(doc_types) if doc_types else '자동'}")
     print("=" * 70 + "\n")
 
 
+def read_batch_questions(stream):
+    """JSONL 입력에서 질문 읽기
+
+    한 줄에 {"id": ..., "question": ..., "doc_types": [...]} 객체 하나
+    (id가 없으면 줄 번호, doc_types가 없으면 질문으로 추론). 일반 텍스트 줄은 질문 그대로 사용.
+    """
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError:
+            item = line
+        if not isinstance(item, dict):
+            item = {"question": item if isinstance(item, str) else line}
+        item.setdefault("id", line_number)
+        yield item
+
+
+def summarize_citations(citations):
+    """출력용 인용 정보 (본문 제외)"""
+    return [
+        {key: citation.get(key) for key in ("title", "url", "filepath", "chunk_id")}
+        for citation in remove_duplicate_citations(citations)
+    ]
+
+
+async def answer_batch_question(client, item, error_index=None, temperature=0.7,
+                                max_retries=BATCH_MAX_RETRIES):
+    """배치 질문 하나에 답변 (대화 히스토리 없이, 일시적 오류는 백오프 후 재시도)
+
+    Returns:
+        dict: id, question, answer, citations, usage, latency_ms, attempts, source, error
+    """
+    question = str(item.get("question") or "").strip()
+    record = {
+        "id": item["id"],
+        "question": question,
+        "answer": None,
+        "citations": [],
+        "usage": None,
+        "latency_ms": None,
+        "attempts": 0,
+        "source": "rag",
+        "error": None,
+    }
+    token_usage = None  # GPT를 호출하지 않았거나 실패하면 0으로 기록
+    try:
+        with span("answer", backend="azure_search", query_type=SEARCH_QUERY_TYPE, batch=True) as answer_span:
+            started = time.perf_counter()
+            if not question:
+                record["error"] = "질문이 비어 있습니다"
+                return record
+
+            # 에러 코드 색인 (코드만 묻는 질문은 GPT 호출 없이 표로 답변)
+            error_entries = error_index.find(question) if error_index is not None else []
+            if error_entries and is_code_lookup(question):
+                record.update(
+                    answer=format_answer(error_entries),
+                    citations=summarize_citations(to_citations(error_entries)),
+                    source="error_code",
+                    latency_ms=round((time.perf_counter() - started) * 1000, 1),
+                )
+                answer_span.set(source="error_code")
+                return record
+
+            pinned = [create_pinned_message(error_entries)] if error_entries else []
+            messages = [create_system_message()] + pinned + [{"role": "user", "content": question}]
+            doc_types = item.get("doc_types") or infer_doc_types(question)
+            rag_params = create_rag_parameters(build_search_filter(doc_types=doc_types))
+
+            attempt = 0
+            with span("generate", model=AZURE_DEPLOYMENT_MODEL) as generate_span:
+                while True:
+                    record["attempts"] = attempt + 1
+                    try:
+                        response = await client.chat.completions.create(
+                            model=AZURE_DEPLOYMENT_MODEL,
+                            messages=messages,
+                            temperature=temperature,
+                            max_tokens=1000,
+                            extra_body=rag_params,
+                        )
+                        break
+                    except Exception as e:
+                        if attempt >= max_retries or not is_retryable_error(e):
+                            record["error"] = str(e)
+                            record["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                            generate_span.set(failed=1)
+                            return record
+                        delay = get_retry_after(e)
+                        await asyncio.sleep(delay if delay is not None else backoff_delay(attempt))
+                        attempt += 1
+                        generate_span.add("retries")
+                if response.usage:
+                    generate_span.set(prompt_tokens=response.usage.prompt_tokens,
+                                      completion_tokens=response.usage.completion_tokens)
+
+            message = response.choices[0].message
+            citations = []
+            context = getattr(message, "context", None)
+            if context and "citations" in context:
+                citations = context["citations"]
+            usage = response.usage
+            token_usage = measure_usage(messages, message.content or "", citations=citations, usage=usage)
+            record.update(
+                answer=message.content,
+                citations=summarize_citations(citations + to_citations(error_entries)),
+                usage={
+                    "prompt_tokens": usage.prompt_tokens,
+                    "completion_tokens": usage.completion_tokens,
+                    "total_tokens": usage.total_tokens,
+                } if usage else None,
+                latency_ms=round((time.perf_counter() - started) * 1000, 1),
+            )
+            answer_span.set(source="rag", citations=len(citations))
+            return record
+    finally:
+        log_batch_usage(record, token_usage)
+
+
+def log_batch_usage(record, token_usage=None):
+    """배치 질문 하나의 사용량을 공유 사용량 로그에 기록 (source="batch")"""
+    usage_log = get_usage_log()
+    if usage_log is None:
+        return
+    usage_log.append({
+        "session": SESSION_ID, "source": "batch", "answer_source": record["source"],
+        "model": AZURE_DEPLOYMENT_MODEL, "backend": "azure_search", "query_type": SEARCH_QUERY_TYPE,
+        "id": record["id"], **(token_usage or empty_usage()),
+        "citations": len(record["citations"]), "attempts": record["attempts"],
+        "elapsed": round(record["latency_ms"] / 1000, 3) if record["latency_ms"] is not None else None,
+        "error": bool(record["error"]),
+    })
+
+
+async def run_batch(input_stream, output_stream, concurrency=BATCH_CONCURRENCY,
+                    max_retries=BATCH_MAX_RETRIES, temperature=0.7, error_index=None):
+    """JSONL 질문을 동시에 답변하여 완료된 순서대로 JSONL로 기록
+
+    작업자 concurrency개가 크기가 제한된 큐에서 질문을 가져가므로,
+    질문이 수천 개여도 메모리에는 진행 중인 질문만 올라간다.
+
+    Returns:
+        dict: 질문/실패/표 답변 수, 토큰 사용량, 지연 시간 목록, 전체 소요 시간
+    """
+    client = create_async_chat_client()
+    work_queue = asyncio.Queue(maxsize=concurrency * 2)
+    stats = {"questions": 0, "failed": 0, "direct": 0, "prompt_tokens": 0,
+             "completion_tokens": 0, "latencies_ms": [], "elapsed": 0.0}
+    started = time.perf_counter()
+
+    async def worker():
+        while True:
+            item = await work_queue.get()
+            if item is None:
+                return
+            record = await answer_batch_question(
+                client, item, error_index, temperature, max_retries
+            )
+            output_stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output_stream.flush()
+
+            stats["questions"] += 1
+            if record["error"]:
+                stats["failed"] += 1
+            else:
+                stats["latencies_ms"].append(record["latency_ms"])
+            if record["source"] == "error_code":
+                stats["direct"] += 1
+            if record["usage"]:
+                stats["prompt_tokens"] += record["usage"]["prompt_tokens"]
+                stats["completion_tokens"] += record["usage"]["completion_tokens"]
+            print(
+                f"\r진행: {stats['questions']}개 완료 (실패 {stats['failed']}개)",
+                end="", file=sys.stderr, flush=True,
+            )
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    try:
+        # 입력 읽기는 스레드에서 (stdin 파이프가 느려도 진행 중인 요청이 멈추지 않도록)
+        questions = read_batch_questions(input_stream)
+        while True:
+            item = await asyncio.to_thread(next, questions, None)
+            if item is None:
+                break
+            await work_queue.put(item)
+        for _ in workers:
+            await work_queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+        await client.close()
+
+    stats["elapsed"] = time.perf_counter() - started
+    print(file=sys.stderr)
+    return stats
+
+
+def percentile(values, ratio):
+    """정렬된 값 목록의 백분위수 (값이 없으면 0)"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+def run_batch_mode(args):
+    """배치 모드 실행 (진행 상황과 요약은 stderr, 답변은 --output으로)"""
+    log = sys.stderr
+    error_index = ErrorCodeIndex.load(ERROR_CODE_INDEX_PATH) if ERROR_CODE_LOOKUP else None
+    if error_index:
+        print(f"✓ 에러 코드 색인 로드 완료 ({len(error_index):,}개)", file=log)
+
+    input_stream = sys.stdin if args.batch == "-" else open(args.batch, "r", encoding="utf-8")
+    output_stream = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    print(f"배치 답변 시작: 동시 요청 {args.concurrency}개", file=log)
+    try:
+        stats = asyncio.run(run_batch(
+            input_stream, output_stream, args.concurrency, args.max_retries,
+            args.temperature, error_index,
+        ))
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    latencies = sorted(stats["latencies_ms"])
+    elapsed = stats["elapsed"]
+    print("=" * 70, file=log)
+    print(f"✓ 배치 완료: 질문 {stats['questions']}개, 실패 {stats['failed']}개, "
+          f"색인 답변 {stats['direct']}개", file=log)
+    print(f"  - 소요 시간: {elapsed:.1f}초 ({stats['questions'] / max(elapsed, 1e-9):.2f}개/초)", file=log)
+    print(f"  - 지연 시간: p50 {percentile(latencies, 0.5):.0f}ms / "
+          f"p95 {percentile(latencies, 0.95):.0f}ms", file=log)
+    print(f"  - 토큰: 입력 {stats['prompt_tokens']:,} / 출력 {stats['completion_tokens']:,}", file=log)
+    for line in get_telemetry().format_summary(["generate", "answer"]):
+        print(f"  - 단계 {line}", file=log)
+    if args.output != "-":
+        print(f"  - 결과: {args.output}", file=log)
+    print("=" * 70, file=log)
+
+
+def parse_args():
+    """명령행 인자 파싱 (인자가 없으면 대화 모드)"""
+    parser = argparse.ArgumentParser(description="Tibero 문서 RAG 챗봇 (대화 / 배치 모드)")
+    parser.add_argument(
+        "--batch",
+        metavar="INPUT",
+        help="질문 JSONL 파일 (-이면 stdin), 지정하면 배치 모드로 동시에 답변",
+    )
+    parser.add_argument("--output", default="-", help="답변 JSONL 파일 (기본 -: stdout)")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY,
+                        help=f"동시 요청 수 (기본 {BATCH_CONCURRENCY})")
+    parser.add_argument("--max-retries", type=int, default=BATCH_MAX_RETRIES,
+                        help=f"429 등 일시적 오류 재시도 횟수 (기본 {BATCH_MAX_RETRIES})")
+    parser.add_argument("--temperature", type=float, default=0.7,
+                        help="답변 온도 (회귀 테스트는 0 권장)")
+    return parser.parse_args()
+
+
 def main():
     """메인 실행 함수"""
+    args = parse_args()
+    # 단계별 메트릭 노출 (TELEMETRY_PROMETHEUS_PORT가 설정된 경우)
+    if get_telemetry().start_metrics_server():
+        print(f"📈 메트릭: http://localhost:{TELEMETRY_PROMETHEUS_PORT}/metrics", file=sys.stderr)
+    if args.batch:
+        if not all([AZURE_OPENAI_API_KEY, AZURE_SEARCH_API_KEY,
+                    AZURE_OPENAI_ENDPOINT, AZURE_SEARCH_ENDPOINT]):
+            print("❌ 오류: 필수 환경 변수가 설정되지 않았습니다.", file=sys.stderr)
+            return
+        run_batch_mode(args)
+        return
+
     print("\n" + "=" * 70)
     print("Azure OpenAI RAG Chatbot - Tibero 문서 검색")
     print("=" * 70)
@@ -245,8 +671,14 @@ def main():
         print(f"❌ 클라이언트 생성 실패: {e}")
         return
     
+    # 에러 코드 색인 로드 (없으면 일반 검색만 사용)
+    error_index = ErrorCodeIndex.load(ERROR_CODE_INDEX_PATH) if ERROR_CODE_LOOKUP else None
+    if error_index:
+        print(f"✓ 에러 코드 색인 로드 완료 ({len(error_index):,}개)")
+    
     # 메시지 히스토리 초기화
     messages = [create_system_message()]
+    doc_types = []  # 검색 문서 종류 (비어 있으면 질문으로 자동 선택)
     
     print("\n사용 가능한 명령어를 보려면 'help'를 입력하세요.")
     print("질문을 시작하세요!\n")
@@ -280,12 +712,39 @@ def main():
                 continue
             
             if question.lower() == "settings":
-                show_settings()
+                show_settings(doc_types)
+                continue
+            
+            if question.lower().startswith("filter"):
+                names = question.split()[1:]
+                if not names or names[0].lower() == "off":
+                    doc_types = []
+                    print("✓ 문서 종류 필터 해제 (자동 선택)\n")
+                else:
+                    unknown = [a for a in names if a not in DOC_TYPE_LABELS]
+                    if unknown:
+                        print(f"⚠️  알 수 없는 문서 종류: {', '.join(unknown)}\n")
+                        continue
+                    doc_types = names
+                    print(f"✓ 문서 종류 필터: {', '.join(doc_types)}\n")
                 continue
             
-            # 답변 생성 및 표시
-            answer, citations = get_answer(chat_client, messages, question)
-            display_answer(answer, citations)
+            # 검색 범위 필터 (지정하지 않았으면 질문으로 추론)
+            search_filter = build_search_filter(
+                doc_types=doc_types or infer_doc_types(question)
+            )
+            
+            # 답변 생성 (토큰을 받는 대로 출력) 후 참고 문서 표시
+            answer, citations, timing = get_answer(
+                chat_client, messages, question, search_filter, error_index
+            )
+            if timing is None:
+                display_answer(answer, citations)
+            else:
+                display_citations(citations, timing)
+            
+            # 오래된 턴은 요약으로 접어 다음 요청의 히스토리 토큰을 일정하게 유지
+            compact_messages(messages, make_summarizer(chat_client, AZURE_DEPLOYMENT_MODEL))
             
         except KeyboardInterrupt:
             print("\n\n프로그램을 종료합니다.")
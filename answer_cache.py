@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+의미 기반 답변 캐시 (세션 간 공유)
+정규화한 질문이 같거나, 질문 임베딩의 코사인 유사도가 임계값 이상이면
+저장된 답변과 인용을 그대로 돌려주어 검색과 GPT 호출을 생략합니다.
+검색/생성 파라미터가 다르면 다른 파티션에 저장하고, TTL과 LRU로 항목을 정리합니다.
+"""
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_THRESHOLD = 0.95
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 1000
+
+
+def normalize_question(question: str) -> str:
+    """질문 정규화 (대소문자, 공백, 끝 문장부호 차이 무시)"""
+    text = " ".join(question.lower().split())
+    return re.sub(r"[\s?!.。？！]+$", "", text)
+
+
+def make_partition_key(**params) -> str:
+    """검색/생성 파라미터로 파티션 키 생성 (값이 하나라도 다르면 다른 파티션)"""
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class SemanticAnswerCache:
+    """TTL + LRU 의미 기반 답변 캐시 (스레드 안전)"""
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, Dict]" = OrderedDict()  # LRU 순서 (끝이 최근)
+        self._exact: Dict[Tuple[str, str], int] = {}  # (파티션, 정규화 질문) → 항목 번호
+        self._matrices: Dict[str, Tuple[List[int], np.ndarray]] = {}  # 파티션별 벡터 행렬
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _expired(self, entry: Dict, now: float) -> bool:
+        return now - entry["created_at"] > self.ttl_seconds
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        self._exact.pop((entry["partition"], entry["normalized"]), None)
+        self._matrices.pop(entry["partition"], None)
+
+    def _partition_matrix(self, partition: str) -> Tuple[List[int], Optional[np.ndarray]]:
+        """파티션의 (항목 번호 목록, 정규화 벡터 행렬) - 변경될 때까지 재사용"""
+        if partition not in self._matrices:
+            ids = [
+                entry_id for entry_id, entry in self._entries.items()
+                if entry["partition"] == partition and entry["vector"] is not None
+            ]
+            matrix = np.stack([self._entries[i]["vector"] for i in ids]) if ids else None
+            self._matrices[partition] = (ids, matrix)
+        return self._matrices[partition]
+
+    def _hit(self, entry_id: int) -> Dict:
+        self._entries.move_to_end(entry_id)
+        self.hits += 1
+        entry = self._entries[entry_id]
+        return {"answer": entry["answer"], "citations": entry["citations"],
+                "question": entry["question"]}
+
+    def lookup_exact(self, question: str, partition: str) -> Optional[Dict]:
+        """정규화한 질문이 같은 항목 조회 (임베딩 없이, 없으면 None - 미스로 세지 않음)"""
+        key = (partition, normalize_question(question))
+        with self._lock:
+            entry_id = self._exact.get(key)
+            if entry_id is None:
+                return None
+            if self._expired(self._entries[entry_id], time.time()):
+                self._remove(entry_id)
+                return None
+            return self._hit(entry_id)
+
+    def lookup(self, vector: List[float], partition: str) -> Optional[Dict]:
+        """질문 임베딩과 가장 비슷한 항목 조회 (유사도가 임계값 미만이면 None)
+
+        Returns:
+            dict: answer, citations, question(캐시된 원래 질문), similarity
+        """
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        with self._lock:
+            ids, matrix = self._partition_matrix(partition)
+            if matrix is not None and matrix.shape[1] == query.shape[0]:
+                similarities = matrix @ query
+                now = time.time()
+                for index in np.argsort(-similarities):
+                    if similarities[index] < self.threshold:
+                        break
+                    entry_id = ids[index]
+                    if self._expired(self._entries[entry_id], now):
+                        continue
+                    self.semantic_hits += 1
+                    return dict(self._hit(entry_id), similarity=float(similarities[index]))
+            self.misses += 1
+            return None
+
+    def store(self, question: str, vector: Optional[List[float]], partition: str,
+              answer: str, citations: List[Dict]):
+        """답변 저장 (오래된 항목과 만료된 항목 정리)"""
+        normalized = normalize_question(question)
+        if vector is not None:
+            vector = np.asarray(vector, dtype=np.float32)
+            vector = vector / max(float(np.linalg.norm(vector)), 1e-12)
+        with self._lock:
+            existing = self._exact.get((partition, normalized))
+            if existing is not None:
+                self._remove(existing)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = {
+                "partition": partition,
+                "question": question,
+                "normalized": normalized,
+                "vector": vector,
+                "answer": answer,
+                "citations": citations,
+                "created_at": time.time(),
+            }
+            self._exact[(partition, normalized)] = entry_id
+            self._matrices.pop(partition, None)
+            self._evict()
+
+    def _evict(self):
+        now = time.time()
+        for entry_id in [i for i, e in self._entries.items() if self._expired(e, now)]:
+            self._remove(entry_id)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        """모든 항목과 통계 초기화"""
+        with self._lock:
+            self._entries.clear()
+            self._exact.clear()
+            self._matrices.clear()
+            self.hits = self.semantic_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """캐시 통계 (적중/미스 수, 적중률, 항목 수)"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streamlit 앱 시작 최적화
+Streamlit은 상호작용마다 앱 스크립트를 다시 실행하므로, 한 번만 만들면 되는 것들을 이 모듈에 둡니다.
+
+- 설정: 환경 변수를 프로세스당 한 번 읽어 변경 불가능한 AppConfig로 보관
+- RAG 파라미터: (검색 문서 수, 엄격도, 필터) 조합별로 한 번만 생성
+- 자원: OpenAI 클라이언트, 에러 코드 색인, 답변 캐시, 로컬 벡터 저장소를 처음 사용할 때 생성
+  (openai/numpy 등 무거운 모듈도 이때 import)
+- 워밍업: 백그라운드 스레드에서 자원을 미리 만들고 공유 연결 풀(http_transport)을 열어 첫 질문의 지연 제거
+- 시작 시간 보고: 단계별 소요 시간을 로그와 사이드바에 표시
+
+실행: `python app_startup.py --server.port 8000` (서버가 뜨는 동안 워밍업을 진행한 뒤 Streamlit 실행)
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+APP_SCRIPT = "mvp_ktds_kyh_001.py"
+# streamlit.sh가 기록한 셸 시작 시각 (없으면 이 모듈을 처음 import한 시각)
+PROCESS_STARTED = float(os.getenv("APP_START_TIME") or time.time())
+SEMANTIC_CONFIGURATION = "semantic-config"
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    """앱 설정 (프로세스당 한 번 환경 변수에서 읽음)"""
+
+    search_endpoint: Optional[str]
+    search_api_key: Optional[str]
+    index_name: Optional[str]
+    openai_endpoint: Optional[str]
+    openai_api_key: Optional[str]
+    api_version: Optional[str]
+    deployment_model: Optional[str]
+    embedding_deployment: Optional[str]
+    # 임베딩 차원 수 (인덱싱 때와 같은 값이어야 함, None이면 모델 기본 차원)
+    embedding_dimensions: Optional[int]
+    # 검색 방식: vector / simple(키워드) / semantic / vector_simple_hybrid / vector_semantic_hybrid
+    search_query_type: str
+    # 검색 백엔드: azure_search (On Your Data) 또는 local (로컬 벡터 저장소)
+    retrieval_backend: str
+    local_vector_store_path: str
+    answer_cache_enabled: bool
+    answer_cache_threshold: float
+    answer_cache_ttl_seconds: int
+    answer_cache_max_entries: int
+    error_code_lookup: bool
+    error_code_index_path: str
+    warmup: bool
+
+
+@lru_cache(maxsize=1)
+def get_config() -> AppConfig:
+    """.env와 환경 변수로 설정 생성 (처음 한 번만)"""
+    from dotenv import load_dotenv
+
+    started = time.perf_counter()
+    load_dotenv()
+    config = AppConfig(
+        search_endpoint=os.getenv("AZURE_SEARCH_ENDPOINT"),
+        search_api_key=os.getenv("AZURE_SEARCH_API_KEY"),
+        index_name=os.getenv("AZURE_SEARCH_INDEX"),
+        openai_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+        openai_api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+        api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+        deployment_model=os.getenv("AZURE_DEPLOYMENT_MODEL"),
+        embedding_deployment=os.getenv("AZURE_DEPLOYMENT_EMBEDDING_NAME"),
+        embedding_dimensions=int(os.getenv("EMBEDDING_DIMENSIONS") or 0) or None,
+        search_query_type=os.getenv("SEARCH_QUERY_TYPE", "vector"),
+        retrieval_backend=os.getenv("RETRIEVAL_BACKEND", "azure_search"),
+        local_vector_store_path=os.getenv("LOCAL_VECTOR_STORE_PATH", ".cache/vector_store"),
+        answer_cache_enabled=os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true",
+        answer_cache_threshold=float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95")),
+        answer_cache_ttl_seconds=int(os.getenv("ANSWER_CACHE_TTL_SECONDS", str(24 * 60 * 60))),
+        answer_cache_max_entries=int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000")),
+        error_code_lookup=os.getenv("ERROR_CODE_LOOKUP", "true").lower() == "true",
+        error_code_index_path=os.getenv("ERROR_CODE_INDEX_PATH", ".cache/error_codes.json"),
+        warmup=os.getenv("STARTUP_WARMUP", "true").lower() == "true",
+    )
+    startup_timer.record("config", time.perf_counter() - started)
+    return config
+
+
+# ----- 시작 시간 보고 -----
+class StartupTimer:
+    """시작 단계별 소요 시간 (스레드 안전, 같은 단계는 처음 한 번만 기록)"""
+
+    def __init__(self):
+        self.steps: Dict[str, float] = {}
+        self.ready_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self.steps.setdefault(name, seconds)
+
+    @contextmanager
+    def measure(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def mark_ready(self):
+        """워밍업 완료 시각 기록 (프로세스 시작부터 준비까지 걸린 시간)"""
+        with self._lock:
+            if self.ready_at is None:
+                self.ready_at = time.time()
+
+    def report(self) -> List[str]:
+        """보고용 문자열 (기록 순서대로)"""
+        with self._lock:
+            steps = list(self.steps.items())
+            ready_at = self.ready_at
+        lines = [f"{name}: {seconds * 1000:,.0f}ms" for name, seconds in steps]
+        if ready_at is not None:
+            lines.append(f"준비 완료: 시작 후 {ready_at - PROCESS_STARTED:.1f}초")
+        return lines
+
+
+startup_timer = StartupTimer()
+
+
+# ----- 프로세스 공용 자원 -----
+def process_resource(name: str) -> Callable:
+    """프로세스당 한 번 만드는 자원 (스레드 안전, 생성 시간을 시작 시간 보고에 기록)"""
+
+    def decorator(factory: Callable) -> Callable:
+        lock = threading.Lock()
+        created = []
+
+        @wraps(factory)
+        def get():
+            if not created:
+                with lock:
+                    if not created:
+                        with startup_timer.measure(name):
+                            created.append(factory())
+            return created[0]
+
+        return get
+
+    return decorator
+
+
+@process_resource("chat client")
+def get_chat_client():
+    """Azure OpenAI 클라이언트 (openai 모듈은 처음 사용할 때 import, 모든 세션이 연결 풀 공유)"""
+    from openai import AzureOpenAI
+
+    from http_transport import get_openai_http_client
+
+    config = get_config()
+    return AzureOpenAI(
+        api_key=config.openai_api_key,
+        azure_endpoint=config.openai_endpoint,
+        api_version=config.api_version,
+        http_client=get_openai_http_client(),
+    )
+
+
+@process_resource("error code index")
+def get_error_code_index():
+    """에러 코드 색인 (파일이 없으면 빈 색인)"""
+    from error_codes import ErrorCodeIndex
+
+    return ErrorCodeIndex.load(get_config().error_code_index_path)
+
+
+@process_resource("answer cache")
+def get_answer_cache():
+    """답변 캐시 (모든 세션이 공유, numpy는 처음 사용할 때 import)"""
+    from answer_cache import SemanticAnswerCache
+
+    config = get_config()
+    return SemanticAnswerCache(
+        threshold=config.answer_cache_threshold,
+        ttl_seconds=config.answer_cache_ttl_seconds,
+        max_entries=config.answer_cache_max_entries,
+    )
+
+
+@process_resource("local vector store")
+def get_local_store():
+    """로컬 벡터 저장소 (벡터 파일은 메모리 맵)"""
+    from local_vector_store import LocalVectorStore
+
+    return LocalVectorStore(get_config().local_vector_store_path)
+
+
+@lru_cache(maxsize=256)
+def get_rag_parameters(top_n: int = 5, strictness: int = 3, search_filter: Optional[str] = None) -> Dict:
+    """On Your Data 파라미터 (조합별로 한 번만 생성 - 여러 요청이 공유하므로 수정하지 말 것)"""
+    config = get_config()
+    embedding_dependency = {
+        "type": "deployment_name",
+        "deployment_name": config.embedding_deployment,
+    }
+    if config.embedding_dimensions:
+        embedding_dependency["dimensions"] = config.embedding_dimensions
+    parameters = {
+        "endpoint": config.search_endpoint,
+        "index_name": config.index_name,
+        "authentication": {
+            "type": "api_key",
+            "key": config.search_api_key,
+        },
+        "query_type": config.search_query_type,
+        "embedding_dependency": embedding_dependency,
+        "top_n_documents": top_n,
+        "strictness": strictness,
+    }
+    if "semantic" in config.search_query_type:
+        parameters["semantic_configuration"] = SEMANTIC_CONFIGURATION
+    if search_filter:
+        parameters["filter"] = search_filter
+    return {"data_sources": [{"type": "azure_search", "parameters": parameters}]}
+
+
+# ----- 워밍업 -----
+def open_connection_pool():
+    """가벼운 요청으로 OpenAI 엔드포인트와 TLS 연결을 미리 맺어 연결 풀에 유지"""
+    try:
+        get_chat_client().models.list()
+    except Exception as e:
+        # 권한/경로 오류여도 연결은 이미 열렸으므로 기록만 함
+        print(f"⚠️  워밍업 요청 실패 (무시): {e.__class__.__name__}: {e}", flush=True)
+
+
+def warm_up():
+    """첫 사용자가 오기 전에 자원 생성 (오류가 있어도 앱은 처음 사용할 때 다시 시도)"""
+    config = get_config()
+    tasks: List[Tuple[str, Callable]] = [("chat client", get_chat_client)]
+    if config.openai_endpoint:
+        tasks.append(("connection pool", open_connection_pool))
+    if config.error_code_lookup:
+        tasks.append(("error code index", get_error_code_index))
+    if config.answer_cache_enabled:
+        tasks.append(("answer cache", get_answer_cache))
+    if config.retrieval_backend == "local":
+        tasks.append(("local vector store", get_local_store))
+    tasks.append(("tokenizer", _load_tokenizer))
+    tasks.append(("metrics server", _start_metrics_server))
+
+    for name, task in tasks:
+        try:
+            with startup_timer.measure(name):
+                task()
+        except Exception as e:
+            print(f"⚠️  워밍업 실패 ({name}): {e}", flush=True)
+    startup_timer.mark_ready()
+    print("🚀 시작 시간 보고\n" + "\n".join(f"  - {line}" for line in startup_timer.report()), flush=True)
+
+
+def _load_tokenizer():
+    from token_utils import count_tokens
+
+    count_tokens("warm up")
+
+
+def _start_metrics_server():
+    from telemetry import get_telemetry
+
+    get_telemetry().start_metrics_server()
+
+
+_warmup_thread: Optional[threading.Thread] = None
+_warmup_lock = threading.Lock()
+
+
+def start_warmup() -> Optional[threading.Thread]:
+    """백그라운드 워밍업 시작 (프로세스당 한 번, STARTUP_WARMUP=false면 생략)"""
+    global _warmup_thread
+    if not get_config().warmup:
+        startup_timer.mark_ready()
+        return None
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+            _warmup_thread.start()
+    return _warmup_thread
+
+
+def main():
+    """워밍업을 시작하고 같은 프로세스에서 Streamlit 서버 실행 (인자는 streamlit run에 전달)"""
+    with startup_timer.measure("import streamlit"):
+        from streamlit.web import cli as streamlit_cli
+    start_warmup()
+    sys.argv = ["streamlit", "run", APP_SCRIPT, *sys.argv[1:]]
+    sys.exit(streamlit_cli.main())
+
+
+if __name__ == "__main__":
+    # 앱 스크립트가 import하는 app_startup 모듈과 같은 인스턴스를 쓰도록 모듈 이름으로 실행
+    import app_startup
+
+    app_startup.main()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+오프라인 성능 벤치마크
+실제 Azure 리소스 없이 로컬 대역 서버(stub_servers.py)와 Azurite를 대상으로
+PDF 추출, 청크 분할, 전체 인덱싱, 답변 생성(get_answer) 성능을 측정해 JSON으로 저장합니다.
+커밋마다 결과 파일을 남기고 --compare로 비교하면 성능 저하를 찾을 수 있습니다.
+
+측정 항목:
+    extract   PDF 텍스트 추출 (페이지/초)
+    chunk     청크 분할 (청크/초, 글자/초)
+    index     02_upload_and_index.py 전체 인덱싱 - 임베딩 + 업로드 (문서/초)
+    blob      Blob 업로드 (MB/초, Azurite 필요: --azurite)
+    answer    03_chat_001.get_answer 지연 시간 (첫 토큰/전체 p50/p95/p99)
+
+사용 예:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --only extract chunk --output base.json
+    python benchmarks/run_benchmarks.py --compare base.json          # 10% 이상 나빠지면 종료 코드 1
+    python benchmarks/run_benchmarks.py --error-rate 0.05 --chat-latency-ms 800
+
+    # Blob 업로드까지 측정 (Azurite 실행 후)
+    docker run -p 10000:10000 mcr.microsoft.com/azure-storage/azurite azurite-blob --blobHost 0.0.0.0
+    python benchmarks/run_benchmarks.py --azurite
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCHMARK_DIR.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(BENCHMARK_DIR))
+
+from stub_servers import StubServer, add_stub_arguments, config_from_args, config_to_dict  # noqa: E402
+
+BENCHMARKS = ("extract", "chunk", "index", "blob", "answer")
+DEFAULT_RESULTS_DIR = REPO_ROOT / ".cache" / "benchmarks"
+# Azurite 기본 연결 문자열 (잘 알려진 개발용 계정)
+AZURITE_CONNECTION_STRING = "UseDevelopmentStorage=true"
+
+BENCHMARK_QUESTIONS = [
+    "Tibero에서 소켓 연결이 끊기는 원인은?",
+    "JDBC 드라이버로 대용량 데이터를 조회하는 방법",
+    "General syntax error가 발생하면 어떻게 해야 하나요?",
+    "아카이브 로그 모드를 설정하는 방법을 알려주세요",
+    "전환 유틸리티로 Oracle 스키마를 옮길 때 주의할 점",
+    "tbdsn.tbr 파일의 역할은?",
+]
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/평균 (ms)"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(ratio):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+    return {
+        "p50_ms": round(pick(0.50), 1),
+        "p95_ms": round(pick(0.95), 1),
+        "p99_ms": round(pick(0.99), 1),
+        "mean_ms": round(statistics.fmean(ordered), 1),
+    }
+
+
+def git_commit() -> Dict:
+    """현재 커밋과 작업 트리 변경 여부"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip())
+        return {"commit": commit, "dirty": dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+
+
+def configure_stub_environment(server: StubServer, work_dir: Path):
+    """인덱서/챗봇이 대역 서버와 임시 캐시를 쓰도록 환경 변수 설정 (모듈 import 전에 호출)"""
+    os.environ.update({
+        "AZURE_OPENAI_ENDPOINT": server.endpoint,
+        "AZURE_OPENAI_API_KEY": "stub",
+        "AZURE_OPENAI_API_VERSION": "2024-02-15-preview",
+        "AZURE_DEPLOYMENT_MODEL": "stub-gpt",
+        "AZURE_DEPLOYMENT_EMBEDDING_NAME": "stub-embedding",
+        "AZURE_SEARCH_ENDPOINT": server.endpoint,
+        "AZURE_SEARCH_API_KEY": "stub",
+        "AZURE_SEARCH_INDEX": "benchmark-index",
+        # 매 실행을 콜드 상태로 측정 (임베딩 캐시/매니페스트/에러 코드 색인을 임시 폴더에)
+        "EMBEDDING_CACHE_PATH": str(work_dir / "embeddings.sqlite3"),
+        "INDEX_MANIFEST_PATH": str(work_dir / "index_manifest.json"),
+        "ERROR_CODE_INDEX_PATH": str(work_dir / "error_codes.json"),
+        "LOCAL_VECTOR_STORE": "false",
+        "USAGE_LOG_PATH": str(work_dir / "usage_log.jsonl"),
+    })
+
+
+# ----- 측정 -----
+def bench_extract(pdf_files: List[Path], workers: int) -> Dict:
+    """PDF 텍스트 추출 속도"""
+    from pdf_extract import extract_pages
+
+    pages_by_file = {}
+    started = time.perf_counter()
+    for pdf_file in pdf_files:
+        pages_by_file[pdf_file.name] = extract_pages(str(pdf_file), workers=workers)
+    elapsed = time.perf_counter() - started
+    pages = sum(len(p) for p in pages_by_file.values())
+    chars = sum(len(text) for p in pages_by_file.values() for _, text in p)
+    return {
+        "files": len(pdf_files),
+        "pages": pages,
+        "chars": chars,
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 1),
+    }, pages_by_file
+
+
+def bench_chunk(pages_by_file: Dict[str, list]) -> Dict:
+    """청크 분할 속도 (추출 결과 재사용)"""
+    from chunker import iter_chunks
+
+    chunks = 0
+    chars = 0
+    started = time.perf_counter()
+    for pages in pages_by_file.values():
+        for chunk in iter_chunks(pages):
+            chunks += 1
+            chars += len(chunk.text)
+    elapsed = time.perf_counter() - started
+    input_chars = sum(len(text) for pages in pages_by_file.values() for _, text in pages)
+    return {
+        "chunks": chunks,
+        "seconds": round(elapsed, 3),
+        "chunks_per_sec": round(chunks / elapsed, 1),
+        "chars_per_sec": round(input_chars / elapsed, 1),
+    }
+
+
+def bench_index(data_folder: Path, server: StubServer) -> Dict:
+    """전체 인덱싱 (추출 → 청크 → 임베딩 → 업로드, 대역 서버 대상)"""
+    indexer = importlib.import_module("02_upload_and_index")
+    server.requests.clear()
+    log = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        indexer.create_search_index()
+        indexer.index_documents(str(data_folder), full=True)
+    elapsed = time.perf_counter() - started
+    documents = server.requests["documents"]
+    return {
+        "documents": documents,
+        "seconds": round(elapsed, 3),
+        "docs_per_sec": round(documents / elapsed, 1),
+        "requests": dict(server.requests),
+    }
+
+
+def bench_blob(pdf_files: List[Path], connection_string: str, workers: int) -> Dict:
+    """Blob 업로드 속도 (Azurite)"""
+    from blob_sync import create_blob_service_client, sync_files
+
+    service = create_blob_service_client(connection_string=connection_string)
+    container = service.get_container_client(f"benchmark-{int(time.time())}")
+    container.create_container()
+    try:
+        total_bytes = sum(f.stat().st_size for f in pdf_files)
+        started = time.perf_counter()
+        results = sync_files(container, pdf_files, max_workers=workers, skip_unchanged=False)
+        elapsed = time.perf_counter() - started
+        # 변경 없음 확인(MD5 비교)만 하는 재동기화
+        started = time.perf_counter()
+        sync_files(container, pdf_files, max_workers=workers, skip_unchanged=True)
+        resync = time.perf_counter() - started
+    finally:
+        container.delete_container()
+    return {
+        "files": len(pdf_files),
+        "mb": round(total_bytes / 1024 / 1024, 2),
+        "failed": sum(1 for status in results.values() if status == "failed"),
+        "seconds": round(elapsed, 3),
+        "mb_per_sec": round(total_bytes / 1024 / 1024 / elapsed, 2),
+        "resync_ms": round(resync * 1000, 1),
+    }
+
+
+def bench_answer(count: int, concurrency: int) -> Dict:
+    """get_answer 지연 시간 (스트리밍 첫 토큰 / 전체, 대화 히스토리 없이)"""
+    chat = importlib.import_module("03_chat_001")
+    client = chat.create_chat_client()
+
+    def ask(i):
+        messages = [chat.create_system_message()]
+        question = BENCHMARK_QUESTIONS[i % len(BENCHMARK_QUESTIONS)]
+        _, _, timing = chat.get_answer(client, messages, question)
+        return timing
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            timings = list(executor.map(ask, range(count)))
+    elapsed = time.perf_counter() - started
+
+    succeeded = [t for t in timings if t and t["ttft"] is not None]
+    return {
+        "questions": count,
+        "failed": count - len(succeeded),
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "answers_per_sec": round(len(succeeded) / elapsed, 2),
+        "ttft": percentiles([t["ttft"] * 1000 for t in succeeded]),
+        "total": percentiles([t["elapsed"] * 1000 for t in succeeded]),
+    }
+
+
+# ----- 비교 -----
+def flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    """중첩된 결과를 "answer.ttft.p95_ms" 형태의 숫자 지표로 펼치기"""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare(previous: Dict, current: Dict, tolerance: float) -> List[str]:
+    """처리량(_per_sec, 높을수록 좋음)과 지연 시간(_ms, 낮을수록 좋음) 비교 출력
+
+    Returns:
+        list: tolerance 이상 나빠진 지표 이름
+    """
+    old = flatten(previous.get("results", {}))
+    new = flatten(current.get("results", {}))
+    regressions = []
+    print(f"\n비교 기준: {previous.get('meta', {}).get('commit')} → {current['meta'].get('commit')}")
+    print("-" * 78)
+    for name in sorted(set(old) & set(new)):
+        if not (name.endswith("_per_sec") or name.endswith("_ms")) or not old[name]:
+            continue
+        change = (new[name] - old[name]) / old[name]
+        worse = -change if name.endswith("_per_sec") else change
+        mark = "❌" if worse > tolerance else ("✓" if worse < -tolerance else " ")
+        if worse > tolerance:
+            regressions.append(name)
+        print(f"{mark} {name:<40} {old[name]:>12.1f} → {new[name]:>12.1f} ({change:+.1%})")
+    print("-" * 78)
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="오프라인 성능 벤치마크 (대역 서버 + Azurite)")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="실행할 항목 (기본: 전체)")
+    parser.add_argument("--data-folder", default=str(REPO_ROOT / "data"), help="PDF 폴더")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="PDF 추출 프로세스 수")
+    parser.add_argument("--answers", type=int, default=200, help="get_answer 호출 수")
+    parser.add_argument("--answer-concurrency", type=int, default=8, help="get_answer 동시 호출 수")
+    parser.add_argument("--azurite", nargs="?", const=AZURITE_CONNECTION_STRING,
+                        help="Azurite 연결 문자열 (값 없이 쓰면 기본 개발용 계정)")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: .cache/benchmarks/<시각>_<커밋>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="성능 저하 허용 비율 (기본 0.10)")
+    add_stub_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    selected = args.only or [name for name in BENCHMARKS if name != "blob" or args.azurite]
+    pdf_files = sorted(Path(args.data_folder).glob("*.pdf"))
+    if not pdf_files and set(selected) & {"extract", "chunk", "index", "blob"}:
+        print(f"❌ '{args.data_folder}' 폴더에 PDF 파일이 없습니다.")
+        return 1
+
+    stub_config = config_from_args(args)
+    server = StubServer(config=stub_config).start()
+    work_dir = Path(tempfile.mkdtemp(prefix="benchmark-"))
+    configure_stub_environment(server, work_dir)
+
+    meta = dict(git_commit(), **{
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "stub": config_to_dict(stub_config),
+    })
+    results = {}
+    print(f"벤치마크: {', '.join(selected)} (대역 서버 {server.endpoint}, 커밋 {meta['commit']})")
+
+    try:
+        pages_by_file = None
+        if "extract" in selected or "chunk" in selected:
+            print("📄 PDF 추출...", end=" ", flush=True)
+            results["extract"], pages_by_file = bench_extract(pdf_files, args.workers)
+            print(f"{results['extract']['pages_per_sec']} 페이지/초")
+        if "chunk" in selected:
+            print("✂️  청크 분할...", end=" ", flush=True)
+            results["chunk"] = bench_chunk(pages_by_file)
+            print(f"{results['chunk']['chunks_per_sec']} 청크/초")
+        if "index" in selected:
+            print("📚 전체 인덱싱...", end=" ", flush=True)
+            results["index"] = bench_index(Path(args.data_folder), server)
+            print(f"{results['index']['docs_per_sec']} 문서/초")
+        if "blob" in selected:
+            print("☁️  Blob 업로드 (Azurite)...", end=" ", flush=True)
+            try:
+                results["blob"] = bench_blob(pdf_files, args.azurite or AZURITE_CONNECTION_STRING,
+                                             args.workers)
+                print(f"{results['blob']['mb_per_sec']} MB/초")
+            except Exception as e:
+                results["blob"] = {"skipped": str(e)[:200]}
+                print(f"건너뜀 (Azurite 연결 실패: {e.__class__.__name__})")
+        if "answer" in selected:
+            print(f"💬 get_answer {args.answers}회...", end=" ", flush=True)
+            results["answer"] = bench_answer(args.answers, args.answer_concurrency)
+            answer = results["answer"]
+            print(f"첫 토큰 p95 {answer['ttft'].get('p95_ms')}ms / 전체 p95 {answer['total'].get('p95_ms')}ms")
+    finally:
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {"meta": meta, "results": results}
+    output = Path(args.output) if args.output else (
+        DEFAULT_RESULTS_DIR / f"{datetime.now():%Y%m%d_%H%M%S}_{meta['commit'] or 'nogit'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ 결과 저장: {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.tolerance)
+        if regressions:
+            print(f"❌ 성능 저하 {len(regressions)}개 (허용 {args.tolerance:.0%})")
+            return 1
+        print("✓ 허용 범위 내")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
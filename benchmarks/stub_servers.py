@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+로컬 Azure 대역 서버 (벤치마크용)
+Azure OpenAI(임베딩, 채팅 완성 - 스트리밍 포함)와 Azure AI Search(인덱스 생성,
+문서 업로드/삭제/검색) REST API를 흉내 내는 HTTP 서버입니다. 호출 종류별 지연 시간과
+429 오류를 주입할 수 있어 실제 리소스 없이 파이프라인과 챗봇의 성능을 측정할 수 있습니다.
+Blob Storage는 Azurite(공식 에뮬레이터)를 사용하세요.
+
+사용 예:
+    python benchmarks/stub_servers.py --port 8900 --chat-latency-ms 300 --error-rate 0.02
+    # .env 대신 환경 변수로 지정
+    AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8900 AZURE_SEARCH_ENDPOINT=http://127.0.0.1:8900 \\
+        AZURE_OPENAI_API_KEY=stub AZURE_SEARCH_API_KEY=stub python 03_chat_001.py
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+
+# 호출 종류별 기본 주입 지연 시간(ms, 평균)
+DEFAULT_LATENCY_MS = {"embeddings": 80.0, "chat": 300.0, "search": 40.0, "index": 60.0}
+
+OPENAI_PATH = re.compile(r"^/openai/deployments/([^/]+)/(embeddings|chat/completions)$")
+SEARCH_PATH = re.compile(r"^/indexes(?:\('([^']+)'\)|/([^/]+))(/docs/(search\.index|search\.post\.search))?$")
+SOURCE_FILTER = re.compile(r"source eq '((?:[^']|'')*)'")
+
+STUB_ANSWER = (
+    "대역 서버의 답변입니다. 검색된 문서 [doc1]에 따르면 해당 설정을 확인한 뒤 "
+    "다시 시도하면 됩니다. 자세한 절차는 [doc2]를 참고하세요. "
+)
+
+
+class StubConfig:
+    """주입할 지연 시간/오류 설정"""
+
+    def __init__(
+        self,
+        latency_ms: Optional[Dict[str, float]] = None,
+        jitter: float = 0.2,
+        token_latency_ms: float = 15.0,
+        answer_tokens: int = 60,
+        error_rate: float = 0.0,
+        retry_after_ms: int = 200,
+        dimensions: int = 1536,
+    ):
+        self.latency_ms = dict(DEFAULT_LATENCY_MS, **(latency_ms or {}))
+        self.jitter = jitter  # 평균 대비 표준편차 비율
+        self.token_latency_ms = token_latency_ms  # 스트리밍 토큰 간격
+        self.answer_tokens = answer_tokens
+        self.error_rate = error_rate  # 429 응답 비율
+        self.retry_after_ms = retry_after_ms
+        self.dimensions = dimensions  # 요청에 dimensions가 없을 때의 임베딩 차원
+
+
+def fake_embedding(text: str, dimensions: int) -> np.ndarray:
+    """텍스트마다 항상 같은 단위 벡터 (같은 입력 → 같은 결과)"""
+    seed = int.from_bytes(hashlib.md5(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimensions).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (연결 재사용 효과도 측정할 수 있도록)
+    server: "StubServer"
+
+    def log_message(self, format, *args):  # 요청마다 로그를 찍지 않음
+        pass
+
+    # ----- 공통 -----
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        return json.loads(body) if body else {}
+
+    def _send_json(self, status: int, payload, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _delay(self, kind: str):
+        mean = self.server.config.latency_ms.get(kind, 0.0)
+        if mean > 0:
+            time.sleep(max(0.0, random.gauss(mean, mean * self.server.config.jitter)) / 1000)
+
+    def _throttled(self, kind: str) -> bool:
+        """설정된 비율로 429 응답 (Retry-After 포함)"""
+        config = self.server.config
+        if config.error_rate <= 0 or random.random() >= config.error_rate:
+            return False
+        self.server.count(f"{kind}_429")
+        self._send_json(
+            429,
+            {"error": {"code": "429", "message": "Rate limit is exceeded (stub)."}},
+            {"retry-after-ms": str(config.retry_after_ms),
+             "retry-after": str(max(1, config.retry_after_ms // 1000))},
+        )
+        return True
+
+    def _handle(self, method: str):
+        path = urlparse(self.path).path
+        try:
+            payload = self._read_json() if method in ("POST", "PUT") else {}
+        except ValueError:
+            self._send_json(400, {"error": {"message": "invalid json"}})
+            return
+
+        match = OPENAI_PATH.match(path)
+        if match and method == "POST":
+            kind = "embeddings" if match.group(2) == "embeddings" else "chat"
+            self.server.count(kind)
+            self._delay(kind)
+            if self._throttled(kind):
+                return
+            if kind == "embeddings":
+                self._embeddings(payload)
+            else:
+                self._chat(match.group(1), payload)
+            return
+
+        match = SEARCH_PATH.match(path)
+        if match:
+            index_name = match.group(1) or match.group(2)
+            operation = match.group(4)
+            kind = "search" if operation == "search.post.search" else "index"
+            self.server.count(kind)
+            self._delay(kind)
+            if self._throttled(kind):
+                return
+            if operation is None:
+                # 인덱스 생성/조회: 요청 본문을 그대로 돌려줌
+                self._send_json(200 if method == "GET" else 201, dict(payload, name=index_name))
+            elif operation == "search.index":
+                self._index_documents(index_name, payload)
+            else:
+                self._search(index_name, payload)
+            return
+
+        self._send_json(404, {"error": {"message": f"stub: unknown path {path}"}})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    # ----- Azure OpenAI -----
+    def _embeddings(self, payload: Dict):
+        inputs = payload.get("input") or []
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimensions = payload.get("dimensions") or self.server.config.dimensions
+        use_base64 = payload.get("encoding_format") == "base64"
+        data = []
+        for i, text in enumerate(inputs):
+            vector = fake_embedding(str(text), dimensions)
+            embedding = base64.b64encode(vector.tobytes()).decode("ascii") if use_base64 else vector.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        tokens = sum(len(str(text)) // 4 + 1 for text in inputs)
+        self._send_json(200, {
+            "object": "list", "data": data, "model": payload.get("model"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        })
+
+    def _chat(self, deployment: str, payload: Dict):
+        config = self.server.config
+        words = (STUB_ANSWER * (config.answer_tokens // 10 + 1)).split(" ")[:config.answer_tokens]
+        pieces = [word + " " for word in words]
+        context = None
+        if payload.get("data_sources"):  # On Your Data: 인용 정보 포함
+            context = {"citations": [
+                {"title": f"stub-{i}.pdf", "content": "stub content", "url": "", "filepath": f"stub-{i}.pdf"}
+                for i in range(1, 3)
+            ], "intent": "stub"}
+        prompt_tokens = sum(len(m.get("content") or "") // 4 + 1 for m in payload.get("messages", []))
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(pieces),
+                 "total_tokens": prompt_tokens + len(pieces)}
+
+        if not payload.get("stream"):
+            message = {"role": "assistant", "content": "".join(pieces)}
+            if context:
+                message["context"] = context
+            self._send_json(200, {
+                "id": "stub", "object": "chat.completion", "created": int(time.time()),
+                "model": deployment,
+                "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        # 스트리밍 (SSE): 첫 델타에 context, 이후 토큰 간격마다 한 조각
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(choices, **extra):
+            chunk = {"id": "stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": deployment, "choices": choices, **extra}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        first = {"role": "assistant"}
+        if context:
+            first["context"] = context
+        send([{"index": 0, "delta": first, "finish_reason": None}])
+        for piece in pieces:
+            if config.token_latency_ms > 0:
+                time.sleep(config.token_latency_ms / 1000)
+            send([{"index": 0, "delta": {"content": piece}, "finish_reason": None}])
+        send([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (payload.get("stream_options") or {}).get("include_usage"):
+            send([], usage=usage)  # 사용량은 choices가 빈 마지막 청크로
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    # ----- Azure AI Search -----
+    def _index_documents(self, index_name: str, payload: Dict):
+        results = []
+        documents = self.server.documents(index_name)
+        with self.server.lock:
+            for action in payload.get("value", []):
+                key = action.get("id")
+                if action.get("@search.action") == "delete":
+                    documents.pop(key, None)
+                else:
+                    documents[key] = action.get("source") or documents.get(key)
+                results.append({"key": key, "status": True, "errorMessage": None, "statusCode": 200})
+        self.server.count("documents", len(results))
+        self._send_json(200, {"value": results})
+
+    def _search(self, index_name: str, payload: Dict):
+        documents = self.server.documents(index_name)
+        match = SOURCE_FILTER.search(payload.get("filter") or "")
+        with self.server.lock:
+            if match:
+                source = match.group(1).replace("''", "'")
+                keys = [key for key, value in documents.items() if value == source]
+            else:
+                keys = list(documents)[: payload.get("top") or 50]
+        self._send_json(200, {"value": [{"@search.score": 1.0, "id": key} for key in keys]})
+
+
+class StubServer(ThreadingHTTPServer):
+    """Azure OpenAI + Azure AI Search 대역 서버 (문서는 id → source만 메모리에 보관)"""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, config: Optional[StubConfig] = None):
+        super().__init__((host, port), StubHandler)
+        self.config = config or StubConfig()
+        self.lock = threading.Lock()
+        self.requests = Counter()
+        self._indexes: Dict[str, Dict[str, str]] = {}
+        self._thread = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.requests[name] += amount
+
+    def documents(self, index_name: str) -> Dict[str, str]:
+        with self.lock:
+            return self._indexes.setdefault(index_name, {})
+
+    def start(self) -> "StubServer":
+        """백그라운드 스레드에서 실행"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    """지연 시간/오류 주입 옵션 (벤치마크 실행기와 공유)"""
+    parser.add_argument("--embedding-latency-ms", type=float, default=DEFAULT_LATENCY_MS["embeddings"])
+    parser.add_argument("--chat-latency-ms", type=float, default=DEFAULT_LATENCY_MS["chat"],
+                        help="첫 토큰까지의 지연 시간")
+    parser.add_argument("--token-latency-ms", type=float, default=15.0, help="스트리밍 토큰 간격")
+    parser.add_argument("--search-latency-ms", type=float, default=DEFAULT_LATENCY_MS["search"])
+    parser.add_argument("--index-latency-ms", type=float, default=DEFAULT_LATENCY_MS["index"],
+                        help="문서 업로드/삭제 요청 지연 시간")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="429 응답 비율 (0~1)")
+    parser.add_argument("--retry-after-ms", type=int, default=200)
+    parser.add_argument("--dimensions", type=int, default=1536)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Azure OpenAI / AI Search 로컬 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_stub_arguments(parser)
+    return parser.parse_args()
+
+
+def config_from_args(args) -> StubConfig:
+    return StubConfig(
+        latency_ms={
+            "embeddings": args.embedding_latency_ms,
+            "chat": args.chat_latency_ms,
+            "search": args.search_latency_ms,
+            "index": args.index_latency_ms,
+        },
+        token_latency_ms=args.token_latency_ms,
+        error_rate=args.error_rate,
+        retry_after_ms=args.retry_after_ms,
+        dimensions=args.dimensions,
+    )
+
+
+def config_to_dict(config: StubConfig) -> Dict:
+    """결과 파일에 기록할 설정"""
+    return dict(vars(config))
+
+
+def main():
+    args = parse_args()
+    server = StubServer(args.host, args.port, config_from_args(args))
+    print(f"✓ 대역 서버 실행 중: {server.endpoint} (Ctrl+C로 종료)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"요청 수: {dict(server.requests)}")
+
+
+if __name__ == "__main__":
+    main()
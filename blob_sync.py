@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Blob Storage 병렬 업로드 (변경된 파일만)
+로컬 파일의 MD5와 Blob에 저장된 Content-MD5가 같으면 업로드를 건너뛰고,
+나머지 파일은 스레드 풀에서 동시에, 큰 파일은 블록 단위 병렬 업로드로 올립니다.
+AZURE_STORAGE_CONNECTION_STRING을 지정하면 Azurite 등 로컬 에뮬레이터에서도 동작합니다.
+"""
+
+import hashlib
+import mimetypes
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import BlobServiceClient, ContentSettings
+
+from http_transport import azure_client_options
+
+# 동시에 업로드할 파일 수 / 파일 하나를 올릴 때 동시에 보낼 블록 수
+DEFAULT_UPLOAD_WORKERS = int(os.getenv("BLOB_UPLOAD_WORKERS", "4"))
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("BLOB_UPLOAD_MAX_CONCURRENCY", "4"))
+
+# 8MB를 넘는 파일은 4MB 블록으로 나누어 병렬 업로드 (SDK 기본값은 64MB까지 단일 요청)
+BLOB_CLIENT_OPTIONS = {
+    "max_single_put_size": 8 * 1024 * 1024,
+    "max_block_size": 4 * 1024 * 1024,
+}
+
+UPLOADED = "uploaded"
+SKIPPED = "skipped"
+
+
+def create_blob_service_client(account_url: Optional[str] = None, credential=None,
+                               connection_string: Optional[str] = None) -> BlobServiceClient:
+    """Blob Service Client 생성 (연결 문자열이 있으면 우선 사용 - Azurite 등, 공유 연결 풀 사용)"""
+    connection_string = connection_string or os.getenv("AZURE_STORAGE_CONNECTION_STRING")
+    options = {**BLOB_CLIENT_OPTIONS, **azure_client_options("blob")}
+    if connection_string:
+        return BlobServiceClient.from_connection_string(connection_string, **options)
+    return BlobServiceClient(account_url=account_url, credential=credential, **options)
+
+
+def file_md5(path: str, block_size: int = 1024 * 1024) -> bytes:
+    """파일 내용의 MD5 (Blob Content-MD5와 같은 형식)"""
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def get_remote_md5(blob_client) -> Optional[bytes]:
+    """Blob에 저장된 Content-MD5 (Blob이 없거나 MD5가 없으면 None)"""
+    try:
+        properties = blob_client.get_blob_properties()
+    except ResourceNotFoundError:
+        return None
+    md5 = properties.content_settings.content_md5
+    return bytes(md5) if md5 else None
+
+
+def upload_file(container_client, file_path: str, blob_name: Optional[str] = None,
+                skip_unchanged: bool = True,
+                max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> str:
+    """파일 하나 업로드 (내용이 같으면 건너뜀)
+
+    Returns:
+        str: "uploaded" 또는 "skipped"
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"파일을 찾을 수 없습니다: {file_path}")
+
+    blob_name = blob_name or os.path.basename(file_path)
+    blob_client = container_client.get_blob_client(blob_name)
+    local_md5 = file_md5(file_path)
+
+    if skip_unchanged and get_remote_md5(blob_client) == local_md5:
+        return SKIPPED
+
+    # 블록 업로드 시 SDK가 전체 MD5를 계산하지 않으므로 직접 저장해 다음 비교에 사용
+    content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+    with open(file_path, "rb") as data:
+        blob_client.upload_blob(
+            data,
+            overwrite=True,
+            max_concurrency=max_concurrency,
+            content_settings=ContentSettings(content_type=content_type, content_md5=local_md5),
+        )
+    return UPLOADED
+
+
+def sync_files(container_client, file_paths: Iterable[Path],
+               max_workers: int = DEFAULT_UPLOAD_WORKERS,
+               max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+               skip_unchanged: bool = True,
+               on_result: Optional[Callable[[Path, str, Optional[Exception]], None]] = None,
+               ) -> Dict[Path, str]:
+    """여러 파일을 동시에 업로드 (변경된 파일만)
+
+    Args:
+        container_client: 대상 컨테이너 클라이언트
+        file_paths: 업로드할 파일 경로 목록
+        max_workers: 동시에 업로드할 파일 수
+        max_concurrency: 파일 하나의 블록 병렬 업로드 수
+        skip_unchanged: Content-MD5가 같으면 건너뛰기
+        on_result: 파일마다 (경로, 상태, 예외) 콜백
+
+    Returns:
+        dict: {경로: "uploaded" | "skipped" | "failed"}
+    """
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(
+                upload_file, container_client, str(path), None, skip_unchanged, max_concurrency
+            ): path
+            for path in file_paths
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            error = None
+            try:
+                status = future.result()
+            except Exception as e:
+                status, error = "failed", e
+            results[path] = status
+            if on_result:
+                on_result(path, status, error)
+    return results
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+토큰 기준, 문서 구조 인식 청크 분할기
+제목/문단/문장 경계(한국어 포함)에서 자르고, 청크 크기와 오버랩을 토큰 수로 맞춥니다.
+"""
+
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Tuple
+
+from token_utils import count_tokens, truncate_to_tokens
+
+DEFAULT_MAX_TOKENS = 800
+DEFAULT_OVERLAP_TOKENS = 80
+
+# 제목 줄: "제7장 7000 ~ 7999", "3.2.Connection Properties", "2.2.2. 주요 기능"
+# (한 단계 번호 "8.데이터베이스 연결 해제"는 절차 목록이므로 제외)
+HEADING_PATTERN = re.compile(
+    r"^\s*(제\s*\d+\s*장\s*\S.*|\d+(\.\d+)+\.\s*[^\d\s].*)$"
+)
+HEADING_MAX_LENGTH = 60
+
+# 페이지 머리글/바닥글: "제7장 7000  ~ 7999    89", "10   Tibero 에러 참조 안내서"
+PAGE_FURNITURE_PATTERN = re.compile(
+    r"^\s*(제\s*\d+\s*장.*\S\s{2,}\d+|[ivxlc\d]+\s{2,}Tiber\s?o\b.*|.*\S\s{2,}[ivxlc\d]+)\s*$"
+)
+
+# 문장 끝: 마침표/물음표/느낌표(한국어 "~다.", "~요." 포함) 뒤의 공백
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?。])(\s+)")
+
+
+class Chunk(NamedTuple):
+    """청크 텍스트와 원본 페이지 범위, 절 경로"""
+
+    text: str
+    page_start: int
+    page_end: int
+    section: str = ""
+
+
+class _Unit(NamedTuple):
+    """청크를 구성하는 최소 단위 (제목 또는 문장)"""
+
+    text: str
+    tokens: int
+    page: int
+    is_heading: bool
+    section: str
+
+
+def is_heading(line: str) -> bool:
+    """제목 줄인지 판단"""
+    stripped = line.strip()
+    if not stripped or len(stripped) > HEADING_MAX_LENGTH:
+        return False
+    if stripped.endswith((".", "다", ",")):
+        return False
+    return bool(HEADING_PATTERN.match(stripped))
+
+
+def is_page_furniture(line: str) -> bool:
+    """페이지 머리글/바닥글(쪽 번호 포함) 줄인지 판단"""
+    return bool(PAGE_FURNITURE_PATTERN.match(line))
+
+
+def heading_level(heading: str) -> int:
+    """제목 수준: "제N장" = 0, "3.2." = 2, "3.2.1." = 3 ..."""
+    match = re.match(r"\s*(\d+(?:\.\d+)*)\.", heading)
+    if not match:
+        return 0
+    return match.group(1).count(".") + 1
+
+
+def split_sentences(text: str) -> List[str]:
+    """문장 단위로 분할 (구분 공백은 앞 문장에 붙여 원문을 보존)"""
+    parts = SENTENCE_END_PATTERN.split(text)
+    sentences = []
+    for i in range(0, len(parts), 2):
+        sentence = parts[i] + (parts[i + 1] if i + 1 < len(parts) else "")
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def split_long_text(text: str, max_tokens: int) -> Iterator[str]:
+    """토큰 한도를 넘는 단위를 한도 이내 조각으로 분할"""
+    rest = text
+    while rest:
+        piece = truncate_to_tokens(rest, max_tokens) or rest[:1]
+        yield piece
+        rest = rest[len(piece):]
+
+
+def _iter_units(pages: Iterable[Tuple[int, str]], max_unit_tokens: int) -> Iterator[_Unit]:
+    """페이지 스트림을 제목/문장 단위로 분해 (머리글/바닥글 제거, 절 경로 추적)"""
+    headings: List[Tuple[int, str]] = []  # (수준, 제목) 스택
+
+    def current_section() -> str:
+        return " > ".join(title for _, title in headings)
+
+    def sentence_units(paragraph: str, page: int) -> Iterator[_Unit]:
+        section = current_section()
+        for sentence in split_sentences(paragraph):
+            tokens = count_tokens(sentence)
+            if tokens <= max_unit_tokens:
+                yield _Unit(sentence, tokens, page, False, section)
+                continue
+            for piece in split_long_text(sentence, max_unit_tokens):
+                yield _Unit(piece, count_tokens(piece), page, False, section)
+
+    for page, page_text in pages:
+        if not page_text:
+            continue
+        paragraph = []
+        for line in page_text.split("\n"):
+            if is_page_furniture(line):
+                continue
+            if is_heading(line):
+                if paragraph:
+                    yield from sentence_units("\n".join(paragraph) + "\n", page)
+                    paragraph = []
+                title = " ".join(line.split())
+                level = heading_level(title)
+                while headings and headings[-1][0] >= level:
+                    headings.pop()
+                headings.append((level, title))
+                yield _Unit(line.strip() + "\n", count_tokens(line), page, True, current_section())
+            elif not line.strip():
+                # 빈 줄은 문단 경계
+                if paragraph:
+                    yield from sentence_units("\n".join(paragraph) + "\n", page)
+                    paragraph = []
+            else:
+                paragraph.append(line)
+        if paragraph:
+            yield from sentence_units("\n".join(paragraph) + "\n", page)
+
+
+def iter_chunks(
+    pages: Iterable[Tuple[int, str]],
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+) -> Iterator[Chunk]:
+    """페이지 스트림을 토큰 예산 이내의 청크로 분할
+
+    - 문장/문단 경계에서만 자르고, 한도를 넘는 긴 문장만 강제로 자름
+    - 제목을 만나면 (현재 청크가 너무 작지 않은 한) 새 청크를 시작하고 오버랩을 넘기지 않음
+    - 그 외에는 직전 청크 끝의 문장들을 overlap_tokens 이내로 다음 청크 앞에 반복
+    - 페이지 머리글/바닥글은 제거하고, 각 청크에 페이지 범위와 절 경로를 기록
+
+    Args:
+        pages: (페이지 번호, 텍스트) 스트림
+        max_tokens: 청크당 최대 토큰 수
+        overlap_tokens: 청크 사이 오버랩 토큰 수
+    """
+    overlap_tokens = max(0, min(overlap_tokens, max_tokens // 2))
+    min_tokens = max_tokens // 4
+    current: List[_Unit] = []
+    current_tokens = 0
+
+    def make_chunk(units: List[_Unit]) -> Iterator[Chunk]:
+        text = "".join(u.text for u in units).strip()
+        if text:
+            # 절 경로는 청크 마지막 단위 기준 (작은 상위 절 + 하위 절이 섞이면 하위 절)
+            yield Chunk(text, units[0].page, units[-1].page, units[-1].section)
+
+    def overlap_tail(units: List[_Unit]) -> List[_Unit]:
+        tail = []
+        tokens = 0
+        for unit in reversed(units):
+            if unit.is_heading or tokens + unit.tokens > overlap_tokens:
+                break
+            tail.insert(0, unit)
+            tokens += unit.tokens
+        return tail
+
+    for unit in _iter_units(pages, max_tokens - overlap_tokens):
+        if unit.is_heading and current and current_tokens >= min_tokens:
+            # 새 절의 시작: 이전 절 내용을 오버랩으로 넘기지 않음
+            yield from make_chunk(current)
+            current, current_tokens = [], 0
+        elif current and current_tokens + unit.tokens > max_tokens:
+            yield from make_chunk(current)
+            current = overlap_tail(current)
+            current_tokens = sum(u.tokens for u in current)
+            if current_tokens + unit.tokens > max_tokens:
+                current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += unit.tokens
+
+    if current:
+        yield from make_chunk(current)
+
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+토큰 예산 기반 대화 히스토리 관리
+시스템 메시지와 최근 N턴만 그대로 보내고, 그보다 오래된 턴은 GPT로 요약해
+시스템 메시지 끝의 "이전 대화 요약"에 누적합니다. 요약은 대화 배열 안에 남으므로
+매 턴 다시 만들지 않고, 오래된 턴이 여러 개 쌓였을 때만 한 번에 접습니다.
+"""
+
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from token_utils import count_tokens
+
+# 히스토리(시스템 메시지 포함) 토큰 예산, 항상 그대로 유지할 최근 턴 수,
+# 유지 턴 수를 넘어 이만큼 쌓이면 한 번에 요약
+DEFAULT_MAX_TOKENS = int(os.getenv("HISTORY_MAX_TOKENS", "3000"))
+DEFAULT_KEEP_TURNS = int(os.getenv("HISTORY_KEEP_TURNS", "4"))
+DEFAULT_FOLD_TURNS = int(os.getenv("HISTORY_FOLD_TURNS", "4"))
+DEFAULT_SUMMARY_MAX_TOKENS = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "300"))
+
+SUMMARY_HEADER = "\n\n[이전 대화 요약]\n"
+MESSAGE_OVERHEAD_TOKENS = 4  # 메시지마다 붙는 역할/구분 토큰
+
+SUMMARY_PROMPT = (
+    "다음은 Tibero 기술 문서 상담 대화입니다. 이전 요약과 새 대화를 합쳐 "
+    "이후 질문에 답하는 데 필요한 사실(사용자 환경, 에러 코드, 시도한 조치, 결론)만 "
+    "한국어 글머리표로 간결하게 요약하세요."
+)
+
+
+def count_message_tokens(messages: List[Dict]) -> int:
+    """대화 배열 전체의 토큰 수"""
+    return sum(count_tokens(m.get("content") or "") + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def split_system_content(content: str) -> Tuple[str, str]:
+    """시스템 메시지를 (원래 지침, 이전 대화 요약)으로 분리"""
+    if SUMMARY_HEADER in content:
+        original, summary = content.split(SUMMARY_HEADER, 1)
+        return original, summary
+    return content, ""
+
+
+def split_turns(messages: List[Dict]) -> List[List[Dict]]:
+    """시스템 메시지를 뺀 대화를 사용자 메시지 기준 턴 단위로 묶기"""
+    turns = []
+    for message in messages:
+        if message["role"] == "user" or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def format_transcript(messages: List[Dict], max_chars: int = 2000) -> str:
+    """요약 요청용 대화 텍스트 (메시지마다 max_chars까지)"""
+    names = {"user": "사용자", "assistant": "어시스턴트"}
+    return "\n".join(
+        f"{names.get(m['role'], m['role'])}: {(m.get('content') or '')[:max_chars]}"
+        for m in messages
+    )
+
+
+def make_summarizer(
+    chat_client, model: str, max_tokens: int = DEFAULT_SUMMARY_MAX_TOKENS
+) -> Callable[[str, List[Dict]], str]:
+    """GPT로 (이전 요약, 접을 메시지) → 새 요약을 만드는 함수 생성"""
+
+    def summarize(previous_summary: str, messages: List[Dict]) -> str:
+        response = chat_client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {
+                    "role": "user",
+                    "content": f"[이전 요약]\n{previous_summary or '(없음)'}\n\n"
+                               f"[새 대화]\n{format_transcript(messages)}",
+                },
+            ],
+            temperature=0,
+            max_tokens=max_tokens,
+        )
+        return (response.choices[0].message.content or "").strip()
+
+    return summarize
+
+
+def fallback_summary(previous_summary: str, messages: List[Dict], max_chars: int = 500) -> str:
+    """요약 호출이 실패했을 때: 이전 요약 + 질문 목록 (뒤에서부터 max_chars까지)"""
+    lines = [previous_summary] if previous_summary else []
+    lines += [f"- 질문: {m['content'][:100]}" for m in messages if m["role"] == "user"]
+    return "\n".join(lines)[-max_chars:]
+
+
+def compact_messages(
+    messages: List[Dict],
+    summarize: Optional[Callable[[str, List[Dict]], str]] = None,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    keep_turns: int = DEFAULT_KEEP_TURNS,
+    fold_turns: int = DEFAULT_FOLD_TURNS,
+) -> int:
+    """오래된 턴을 시스템 메시지의 요약으로 접어 대화 배열을 제자리에서 줄이기
+
+    유지할 턴 수보다 fold_turns 이상 쌓였거나 토큰 예산을 넘었을 때만 접으며,
+    예산을 넘으면 유지 턴 수도 줄인다 (마지막 턴은 항상 유지).
+
+    Args:
+        messages: [시스템 메시지, 사용자/어시스턴트 메시지...] (제자리에서 수정)
+        summarize: (이전 요약, 접을 메시지) → 새 요약 (None이면 질문 목록만 남김)
+
+    Returns:
+        int: 요약으로 접은 턴 수 (0이면 변경 없음)
+    """
+    if not messages or messages[0]["role"] != "system":
+        return 0
+    system, turns = messages[0], split_turns(messages[1:])
+    over_budget = count_message_tokens(messages) > max_tokens
+    if not over_budget and len(turns) <= keep_turns + fold_turns:
+        return 0
+
+    keep = max(1, min(keep_turns, len(turns)))
+    system_tokens = count_message_tokens([system])
+    while keep > 1 and system_tokens + count_message_tokens(
+        [m for turn in turns[-keep:] for m in turn]
+    ) > max_tokens:
+        keep -= 1
+    old_turns = turns[:-keep]
+    if not old_turns:
+        return 0
+
+    original, previous_summary = split_system_content(system["content"])
+    old_messages = [m for turn in old_turns for m in turn]
+    try:
+        summary = summarize(previous_summary, old_messages) if summarize else None
+    except Exception:
+        summary = None
+    if not summary:
+        summary = fallback_summary(previous_summary, old_messages)
+
+    messages[:] = [dict(system, content=original + SUMMARY_HEADER + summary)] + [
+        m for turn in turns[-keep:] for m in turn
+    ]
+    return len(old_turns)
+
+
+def history_stats(messages: List[Dict]) -> Dict[str, int]:
+    """요청에 포함되는 히스토리 통계 (토큰 수, 턴 수, 요약 토큰 수)"""
+    summary = ""
+    if messages and messages[0]["role"] == "system":
+        summary = split_system_content(messages[0]["content"])[1]
+    return {
+        "tokens": count_message_tokens(messages),
+        "turns": len(split_turns([m for m in messages if m["role"] != "system"])),
+        "summary_tokens": count_tokens(summary),
+    }
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+임베딩 벡터 디스크 캐시 (SQLite 단일 파일)
+청크 텍스트 + 임베딩 배포 이름 + 차원 수의 해시를 키로 사용하므로,
+내용이 같은 청크는 다시 실행해도 Azure OpenAI를 호출하지 않습니다.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def make_cache_key(text: str, deployment: str, dimensions: Optional[int] = None) -> str:
+    """캐시 키 생성 (배포 이름/차원 수가 바뀌면 다른 키가 됨)"""
+    payload = f"{deployment}\0{dimensions or 0}\0{text}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _pack_vector(vector: List[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack_vector(blob: bytes) -> List[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class EmbeddingCache:
+    """크기 제한이 있는 LRU 임베딩 캐시
+
+    - 최근 사용 시각(last_access) 기준으로 오래된 항목부터 제거
+    - 전체 벡터 크기가 max_bytes를 넘으면 90% 수준까지 정리
+    - hits / misses 카운터 제공
+    """
+
+    def __init__(self, path: str, max_bytes: int = 1024 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """여러 키를 한 번에 조회 ({키: 벡터}, 없는 키는 제외)"""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            # SQLite 변수 개수 제한(999)을 넘지 않도록 나누어 조회
+            for start in range(0, len(keys), 500):
+                part = keys[start:start + 500]
+                placeholders = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    part,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = _unpack_vector(blob)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """단일 키 조회"""
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Iterable[Tuple[str, List[float]]]):
+        """여러 벡터 저장 후 필요하면 오래된 항목 정리"""
+        now = time.time()
+        rows = []
+        for key, vector in items:
+            blob = _pack_vector(vector)
+            rows.append((key, blob, len(blob), now))
+        if not rows:
+            return
+
+        with self._lock:
+            # 덮어쓰는 항목의 기존 크기를 빼서 전체 크기를 정확히 유지
+            replaced = 0
+            for start in range(0, len(rows), 500):
+                part = [row[0] for row in rows[start:start + 500]]
+                placeholders = ",".join("?" * len(part))
+                replaced += self._conn.execute(
+                    f"SELECT COALESCE(SUM(size), 0) FROM embeddings WHERE key IN ({placeholders})",
+                    part,
+                ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, size, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            self._total_bytes += sum(row[2] for row in rows) - replaced
+            if self._total_bytes > self.max_bytes:
+                self._evict(int(self.max_bytes * 0.9))
+
+    def put(self, key: str, vector: List[float]):
+        """단일 벡터 저장"""
+        self.put_many([(key, vector)])
+
+    def _evict(self, target_bytes: int):
+        """target_bytes 이하가 될 때까지 가장 오래 사용되지 않은 항목 제거"""
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM embeddings"
+        ).fetchone()[0]
+        evict_keys = []
+        rows = self._conn.execute(
+            "SELECT key, size FROM embeddings ORDER BY last_access ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= target_bytes:
+                break
+            evict_keys.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", evict_keys)
+        self._conn.commit()
+        self._total_bytes = total
+
+    def iter_vectors(self, dimensions: Optional[int] = None,
+                     limit: Optional[int] = None) -> Iterator[List[float]]:
+        """저장된 벡터 순회 (dimensions를 주면 해당 차원 벡터만, 평가/분석용)"""
+        query = "SELECT vector FROM embeddings"
+        params = []
+        if dimensions:
+            query += " WHERE size = ?"
+            params.append(dimensions * 4)
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        for (blob,) in rows:
+            yield _unpack_vector(blob)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def stats(self) -> Dict[str, float]:
+        """캐시 통계 (적중/미스 수, 적중률, 항목 수, 크기)"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_mb": self._total_bytes / (1024 * 1024),
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tibero 에러 코드 색인
+에러 참조 안내서 PDF의 "코드: 메시지 / 원인 Cause / 조치 Action" 항목을 표로 파싱해
+작은 JSON 파일로 저장하고, 챗봇이 질문 속 에러 코드나 에러 메시지로 바로 찾아
+검색/GPT 호출 없이 답하거나 정확한 항목을 근거로 고정할 수 있게 합니다.
+
+파일 형식:
+    {"version": 1,
+     "sources": {PDF 파일명: sha256},
+     "entries": [[코드, 메시지, 원인, 조치, PDF 파일명, 페이지], ...]}
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from search_filters import find_error_codes
+
+ERROR_CODE_INDEX_PATH = os.getenv("ERROR_CODE_INDEX_PATH", ".cache/error_codes.json")
+INDEX_VERSION = 1
+FIELDS = ("code", "message", "cause", "action", "source", "page")
+
+# 항목 시작 "7001: General syntax error." / 원인 줄 "... Cause" / 조치 줄 "... Action"
+ENTRY_PATTERN = re.compile(r"^(\d{4,6}):\s*(.*)$")
+CAUSE_PATTERN = re.compile(r"^(.*?)\s*Cause$")
+ACTION_PATTERN = re.compile(r"^(.*?)\s*Action$")
+# 머리말/꼬리말 "제7장 7000  ~ 7999    89", "10   Tiber o 에러 참조 안내서"
+PAGE_HEADER_PATTERN = re.compile(r"^제\s*\d+\s*장\s+\d+\s*~\s*\d+|에러\s*참조\s*안내서\s*$")
+# 메시지 안의 치환 변수 (%1$d, "UINT64_FMT(1$)")
+PLACEHOLDER_PATTERN = re.compile(r'%\d+\$\w+|"?\w+_FMT\(\d+\$\)"?')
+# 코드 조회 질문에서 지우는 에러/질문 의도 키워드
+ERROR_KEYWORD_PATTERN = re.compile(
+    r"tbr|에러|오류|error|코드|code|원인|조치|해결|방법|의미|뜻|설명|알려", re.IGNORECASE
+)
+# 코드와 키워드를 지운 뒤 남는 글자 수가 이 이하이면 코드만 묻는 질문 (조사/어미 정도만 남은 경우)
+CODE_LOOKUP_MAX_REMAINDER_CHARS = 6
+# 메시지 일치로 인정할 최소 길이 (공백/기호 제거 후)
+MIN_MESSAGE_MATCH_CHARS = 12
+
+
+def compact_text(text: str) -> str:
+    """비교용 텍스트 (PDF 추출 시 띄어쓰기가 어긋나므로 공백/기호를 모두 제거)"""
+    return re.sub(r"[^0-9a-z가-힣]", "", text.lower())
+
+
+def parse_error_pages(pages: Iterable[Tuple[int, str]], source: str = "") -> List[Dict]:
+    """(페이지 번호, 텍스트)에서 에러 항목 추출
+
+    메시지는 마침표로 끝나는 줄까지, 원인은 "Cause"로 끝나는 줄까지,
+    조치는 "Action"으로 끝나는 줄까지 이어 붙인다 (여러 줄에 걸친 경우 포함).
+    """
+    entries = []
+    entry = None
+    state = None  # "message" → "cause" → "action" → None
+    buffer = []
+
+    def finish():
+        if entry is not None and entry["message"]:
+            entries.append(entry)
+
+    for page_number, text in pages:
+        for raw_line in (text or "").splitlines():
+            line = raw_line.strip()
+            if not line or PAGE_HEADER_PATTERN.search(line):
+                continue
+
+            match = ENTRY_PATTERN.match(line)
+            if match and state in (None, "action"):
+                finish()
+                entry = {
+                    "code": match.group(1), "message": "", "cause": "", "action": "",
+                    "source": source, "page": page_number,
+                }
+                buffer = [match.group(2)]
+                state = "message"
+                if match.group(2).endswith("."):
+                    entry["message"] = " ".join(buffer)
+                    buffer, state = [], "cause"
+                continue
+            if entry is None:
+                continue
+
+            if state == "message":
+                cause = CAUSE_PATTERN.match(line)
+                if cause:  # 마침표 없이 끝난 메시지
+                    entry["message"] = " ".join(buffer)
+                    entry["cause"] = cause.group(1)
+                    buffer, state = [], "action"
+                    continue
+                buffer.append(line)
+                if line.endswith("."):
+                    entry["message"] = " ".join(buffer)
+                    buffer, state = [], "cause"
+            elif state == "cause":
+                cause = CAUSE_PATTERN.match(line)
+                buffer.append(cause.group(1) if cause else line)
+                if cause:
+                    entry["cause"] = " ".join(buffer)
+                    buffer, state = [], "action"
+            elif state == "action":
+                action = ACTION_PATTERN.match(line)
+                buffer.append(action.group(1) if action else line)
+                if action:
+                    entry["action"] = " ".join(buffer)
+                    buffer, state = [], None
+                    finish()
+                    entry = None
+
+    if state == "message" and entry is not None:
+        entry["message"] = " ".join(buffer)
+    finish()
+    return entries
+
+
+class ErrorCodeIndex:
+    """에러 코드 → 항목 조회 및 질문 속 코드/메시지 감지"""
+
+    def __init__(self, entries: Iterable[Dict] = (), sources: Optional[Dict[str, str]] = None):
+        self.sources = dict(sources or {})
+        self.entries: Dict[str, Dict] = {}
+        self._fragments: List[Tuple[str, str]] = []  # (메시지 조각, 코드) - 긴 조각 우선
+        for entry in entries:
+            self.entries.setdefault(entry["code"], entry)
+        self._build_fragments()
+
+    def _build_fragments(self):
+        fragments = []
+        for code, entry in self.entries.items():
+            parts = [compact_text(p) for p in PLACEHOLDER_PATTERN.split(entry["message"])]
+            longest = max(parts, key=len, default="")
+            if len(longest) >= MIN_MESSAGE_MATCH_CHARS:
+                fragments.append((longest, code))
+        self._fragments = sorted(fragments, key=lambda item: len(item[0]), reverse=True)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def load(cls, path: str = ERROR_CODE_INDEX_PATH) -> "ErrorCodeIndex":
+        """저장된 색인 로드 (파일이 없거나 형식이 다르면 빈 색인)"""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        if data.get("version") != INDEX_VERSION:
+            return cls()
+        return cls((dict(zip(FIELDS, row)) for row in data["entries"]), data.get("sources"))
+
+    def save(self, path: str = ERROR_CODE_INDEX_PATH):
+        """색인 저장 (임시 파일에 쓴 뒤 교체)"""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        rows = [
+            [entry[field] for field in FIELDS]
+            for entry in sorted(self.entries.values(), key=lambda e: int(e["code"]))
+        ]
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": INDEX_VERSION, "sources": self.sources, "entries": rows},
+                f, ensure_ascii=False, separators=(",", ":"),
+            )
+        os.replace(tmp_path, path)
+
+    def is_current(self, source: str, sha256: str) -> bool:
+        """해당 PDF가 같은 내용으로 이미 색인되었는지"""
+        return self.sources.get(source) == sha256
+
+    def replace_source(self, source: str, sha256: str, entries: Iterable[Dict]):
+        """PDF 하나의 항목을 새로 파싱한 항목으로 교체"""
+        self.entries = {c: e for c, e in self.entries.items() if e["source"] != source}
+        for entry in entries:
+            self.entries.setdefault(entry["code"], entry)
+        self.sources[source] = sha256
+        self._build_fragments()
+
+    def remove_source(self, source: str):
+        """삭제된 PDF의 항목 제거"""
+        self.entries = {c: e for c, e in self.entries.items() if e["source"] != source}
+        self.sources.pop(source, None)
+        self._build_fragments()
+
+    def get(self, code: str) -> Optional[Dict]:
+        return self.entries.get(code.lstrip("-"))
+
+    def find(self, question: str, limit: int = 3) -> List[Dict]:
+        """질문에 나온 에러 코드, 없으면 에러 메시지와 일치하는 항목"""
+        found = [self.entries[c] for c in find_error_codes(question) if c in self.entries]
+        if not found:
+            # "7001" 처럼 숫자만 입력한 경우
+            bare = question.strip(" ?!.").upper().replace("TBR", "").strip(" -")
+            if bare.isdigit() and bare in self.entries:
+                found = [self.entries[bare]]
+        if not found:
+            text = compact_text(question)
+            if len(text) >= MIN_MESSAGE_MATCH_CHARS:
+                found = [self.entries[code] for fragment, code in self._fragments if fragment in text]
+        return found[:limit]
+
+
+def is_code_lookup(question: str) -> bool:
+    """에러 코드 자체만 묻는 질문인지 (표만으로 답할 수 있는지)
+
+    코드와 에러/질문 의도 키워드를 지우고 공백/기호를 뺀 나머지가
+    CODE_LOOKUP_MAX_REMAINDER_CHARS자 이하이면 코드만 묻는 질문으로 본다.
+
+    코드만 묻는 질문 (남는 글자):
+        "7001", "TBR-7001 에러" → ""
+        "7001 에러 원인이 뭐야?" → "이뭐야"
+        "7001 오류 해결 방법 알려주세요" → "주세요"
+        "TBR-7001 에러 코드의 의미를 설명해 주세요" → "의를해주세요"
+    상황이 함께 적힌 질문 (검색 + GPT):
+        "JDBC 연결 중 7001 에러가 나요" → "jdbc연결중가나요"
+        "tbsql에서 insert 할 때 7001 오류" → "tbsql에서insert할때"
+    """
+    if not re.search(r"\d{4,6}", question):
+        return False
+    remainder = compact_text(ERROR_KEYWORD_PATTERN.sub("", re.sub(r"\d{4,6}", "", question)))
+    return len(remainder) <= CODE_LOOKUP_MAX_REMAINDER_CHARS
+
+
+def format_entry(entry: Dict) -> str:
+    """항목을 답변용 마크다운으로 표시"""
+    return (
+        f"**TBR-{entry['code']}: {entry['message']}**\n\n"
+        f"- **원인**: {entry['cause'] or '-'}\n"
+        f"- **조치**: {entry['action'] or '-'}"
+    )
+
+
+def format_answer(entries: List[Dict]) -> str:
+    """코드 조회 질문에 대한 답변 (에러 참조 안내서 표 그대로)"""
+    return "\n\n".join(format_entry(entry) for entry in entries) + (
+        "\n\n*에러 참조 안내서의 해당 항목입니다. 상황을 함께 적어 질문하면 자세히 설명합니다.*"
+    )
+
+
+def create_pinned_message(entries: List[Dict]) -> Dict:
+    """질문에 나온 에러 항목을 근거로 고정하는 시스템 메시지"""
+    return {
+        "role": "system",
+        "content": (
+            "사용자가 언급한 에러의 에러 참조 안내서 항목입니다. "
+            "원인과 조치는 이 내용을 우선 근거로 답변하세요.\n\n"
+            + "\n\n".join(
+                f"{e['code']}: {e['message']}\n원인: {e['cause']}\n조치: {e['action']}"
+                f"\n(출처: {e['source']} p.{e['page']})"
+                for e in entries
+            )
+        ),
+    }
+
+
+def to_citations(entries: List[Dict]) -> List[Dict]:
+    """항목을 인용 정보 형식으로 변환 (On Your Data 인용과 같은 필드)"""
+    return [
+        {
+            "title": f"{entry['source']} - {entry['code']}",
+            "content": f"{entry['code']}: {entry['message']}\n{entry['cause']}\n{entry['action']}",
+            "filepath": entry["source"],
+            "url": "",
+            "chunk_id": entry["code"],
+            "section": "",
+            "page_start": entry["page"],
+            "page_end": entry["page"],
+        }
+        for entry in entries
+    ]
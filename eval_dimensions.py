@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+임베딩 차원 수별 검색 품질/속도/인덱스 크기 비교
+임베딩 캐시에 저장된 전체 차원 벡터를 앞부분만 잘라 다시 정규화하여
+(text-embedding-3의 dimensions 파라미터와 같은 방식) 차원 수별로
+전체 차원 검색 결과 대비 recall@k, 질의당 검색 시간, 벡터 저장 크기를 보고합니다.
+
+사용 예:
+    python eval_dimensions.py
+    python eval_dimensions.py --dims 256 512 1024 1536 --top-k 10 --queries 200
+    python eval_dimensions.py --questions questions.txt   # 실제 질문으로 평가 (API 호출)
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Dict, List
+
+import numpy as np
+from dotenv import load_dotenv
+
+from embedding_cache import EmbeddingCache
+
+load_dotenv()
+
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+DEFAULT_DIMENSIONS = [256, 512, 1024, 1536]
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """행 단위 L2 정규화"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def reduce_dimensions(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """앞 dimensions개 성분만 남기고 다시 정규화"""
+    return normalize(vectors[:, :dimensions])
+
+
+def top_k(corpus: np.ndarray, queries: np.ndarray, k: int,
+          exclude: np.ndarray = None) -> np.ndarray:
+    """코사인 유사도 상위 k개 인덱스 (exclude: 질의별로 제외할 자기 자신의 인덱스)"""
+    scores = queries @ corpus.T
+    if exclude is not None:
+        scores[np.arange(len(queries)), exclude] = -np.inf
+    candidates = np.argpartition(-scores, k, axis=1)[:, :k]
+    order = np.take_along_axis(scores, candidates, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def recall_at_k(expected: np.ndarray, actual: np.ndarray) -> float:
+    """전체 차원 결과(expected) 대비 재현율"""
+    hits = sum(len(set(e) & set(a)) for e, a in zip(expected, actual))
+    return hits / expected.size
+
+
+def measure_latency(corpus: np.ndarray, queries: np.ndarray, k: int,
+                    repeat: int = 3) -> float:
+    """질의당 평균 검색 시간(ms, 전수 비교)"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for query in queries:
+            scores = corpus @ query
+            np.argpartition(-scores, k)[:k]
+        best = min(best, time.perf_counter() - started)
+    return best / len(queries) * 1000
+
+
+def storage_mb(count: int, dimensions: int) -> Dict[str, float]:
+    """벡터 저장 크기(MB) - float32 / float16 / int8 / binary"""
+    mb = 1024 * 1024
+    return {
+        "float32": count * dimensions * 4 / mb,
+        "float16": count * dimensions * 2 / mb,
+        "int8": count * dimensions / mb,
+        "binary": count * dimensions / 8 / mb,
+    }
+
+
+def load_corpus(cache_path: str, dimensions: int, limit: int) -> np.ndarray:
+    """임베딩 캐시에서 전체 차원 벡터 로드"""
+    cache = EmbeddingCache(cache_path)
+    try:
+        vectors = list(cache.iter_vectors(dimensions=dimensions, limit=limit))
+    finally:
+        cache.close()
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def embed_questions(questions: List[str]) -> np.ndarray:
+    """질문을 전체 차원으로 임베딩 (Azure OpenAI 호출)"""
+    from openai import AzureOpenAI
+
+    from http_transport import get_openai_http_client
+
+    client = AzureOpenAI(
+        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+        api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview"),
+        http_client=get_openai_http_client(),
+    )
+    response = client.embeddings.create(
+        model=os.getenv("AZURE_DEPLOYMENT_EMBEDDING_NAME"), input=questions
+    )
+    data = sorted(response.data, key=lambda d: d.index)
+    return np.asarray([item.embedding for item in data], dtype=np.float32)
+
+
+def evaluate(corpus: np.ndarray, queries: np.ndarray, dims: List[int], k: int,
+             exclude: np.ndarray = None) -> List[Dict]:
+    """차원 수별 recall@k / 검색 시간 / 저장 크기 계산"""
+    expected = top_k(normalize(corpus), normalize(queries), k, exclude)
+    results = []
+    for dimensions in dims:
+        reduced_corpus = reduce_dimensions(corpus, dimensions)
+        reduced_queries = reduce_dimensions(queries, dimensions)
+        actual = top_k(reduced_corpus, reduced_queries, k, exclude)
+        results.append({
+            "dimensions": dimensions,
+            "recall": recall_at_k(expected, actual),
+            "latency_ms": measure_latency(reduced_corpus, reduced_queries, k),
+            "storage_mb": storage_mb(len(corpus), dimensions),
+        })
+    return results
+
+
+def print_report(results: List[Dict], corpus_size: int, query_count: int, k: int):
+    """결과 표 출력"""
+    print(f"\n벡터 {corpus_size:,}개, 질의 {query_count}개, recall@{k} (전체 차원 결과 기준)")
+    print("-" * 78)
+    print(f"{'차원':>6} | {'recall':>7} | {'검색(ms)':>9} | "
+          f"{'float32(MB)':>11} | {'float16(MB)':>11} | {'int8(MB)':>9} | {'binary(MB)':>10}")
+    print("-" * 78)
+    for r in results:
+        size = r["storage_mb"]
+        print(
+            f"{r['dimensions']:>6} | {r['recall']:>7.3f} | {r['latency_ms']:>9.3f} | "
+            f"{size['float32']:>11.2f} | {size['float16']:>11.2f} | "
+            f"{size['int8']:>9.2f} | {size['binary']:>10.3f}"
+        )
+    print("-" * 78)
+    print("※ 검색 시간은 로컬 전수 비교 기준이며, 저장 크기는 원본 벡터만 계산 (HNSW 그래프 제외)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="임베딩 차원 수별 검색 품질/속도/크기 비교")
+    parser.add_argument("--dims", type=int, nargs="+", default=DEFAULT_DIMENSIONS,
+                        help="비교할 차원 수 목록 (기본: 256 512 1024 1536)")
+    parser.add_argument("--top-k", type=int, default=10, help="recall@k의 k (기본 10)")
+    parser.add_argument("--queries", type=int, default=200,
+                        help="캐시 벡터 중 질의로 쓸 개수 (기본 200)")
+    parser.add_argument("--questions", help="질문 파일 (한 줄에 하나, 지정 시 실제 질문으로 평가)")
+    parser.add_argument("--max-vectors", type=int, default=100000,
+                        help="캐시에서 읽을 최대 벡터 수 (기본 100000)")
+    parser.add_argument("--cache-path", default=EMBEDDING_CACHE_PATH, help="임베딩 캐시 경로")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    parser.add_argument("--seed", type=int, default=0, help="질의 샘플링 시드")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    full_dimensions = max(args.dims)
+
+    print(f"임베딩 캐시에서 {full_dimensions}차원 벡터 로드 중: {args.cache_path}")
+    corpus = load_corpus(args.cache_path, full_dimensions, args.max_vectors)
+    if len(corpus) <= args.top_k:
+        print(f"❌ {full_dimensions}차원 벡터가 부족합니다 ({len(corpus)}개).")
+        print("   EMBEDDING_DIMENSIONS를 비운 상태로 02_upload_and_index.py를 먼저 실행하세요.")
+        return
+
+    exclude = None
+    if args.questions:
+        with open(args.questions, encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+        print(f"질문 {len(questions)}개 임베딩 중...")
+        queries = embed_questions(questions)
+    else:
+        # 캐시 벡터 일부를 질의로 사용 (자기 자신은 결과에서 제외)
+        rng = np.random.default_rng(args.seed)
+        exclude = rng.choice(len(corpus), size=min(args.queries, len(corpus)), replace=False)
+        queries = corpus[exclude]
+
+    print("※ 앞부분 절단 후 재정규화는 text-embedding-3 계열에서만 dimensions 파라미터와 같습니다.")
+    results = evaluate(corpus, queries, sorted(args.dims), args.top_k, exclude)
+    print_report(results, len(corpus), len(queries), args.top_k)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {"corpus_size": len(corpus), "queries": len(queries), "top_k": args.top_k,
+                 "results": results},
+                f, ensure_ascii=False, indent=2,
+            )
+        print(f"\n✓ 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+검색 설정별 품질/비용/지연 시간 비교
+골든 질문 세트(eval/golden_questions.jsonl)의 질문마다 정답 문서와 근거 문구가 정해져 있으며,
+검색 설정(top_n_documents × strictness × 검색 방식) 조합마다 질문을 검색해
+recall@k, MRR, 프롬프트 토큰, 지연 시간을 보고하고
+정답을 충분히 찾으면서 프롬프트가 가장 작은 설정을 추천합니다.
+
+골든 세트 형식 (한 줄에 하나):
+    {"id": "jdbc-01", "question": "...", "source": "PDF 파일명", "evidence": "정답 청크의 문구",
+     "chunk_id": 18, "page_start": 18, "page_end": 19}
+    - 정답 판정: 같은 PDF의 검색 결과 중 근거 문구(공백/기호 무시)를 포함한 청크
+    - chunk_id/page_*: 현재 청크 설정 기준 정답 청크 (--resolve로 갱신, 참고용)
+
+검색 백엔드:
+    azure  Azure OpenAI On Your Data (챗봇과 같은 호출, strictness 적용,
+           답변 생성은 --max-tokens로 제한, 프롬프트 토큰은 usage 기준)
+    local  로컬 벡터 저장소 (strictness 없음, 프롬프트 토큰은 근거 문서로 계산,
+           지연 시간은 질문 임베딩을 제외한 검색 시간)
+
+사용 예:
+    python eval_retrieval.py --resolve                     # 청크 설정 변경 후 정답 청크 갱신/검증
+    python eval_retrieval.py --top-n 3 5 10 --strictness 2 3 4
+    python eval_retrieval.py --backend local --top-n 1 3 5 10 --query-types vector vector_simple_hybrid
+    python eval_retrieval.py --limit 10 --output sweep.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from chunker import iter_chunks
+from conversation_history import count_message_tokens
+from error_codes import compact_text
+from pdf_extract import extract_pages
+
+load_dotenv()
+
+DEFAULT_GOLDEN_PATH = "eval/golden_questions.jsonl"
+DEFAULT_TOP_N = [1, 3, 5, 8, 10]
+DEFAULT_STRICTNESS = [1, 2, 3, 4, 5]
+K_VALUES = [1, 3, 5, 10]
+SEARCH_QUERY_TYPE = os.getenv("SEARCH_QUERY_TYPE", "vector")
+LOCAL_VECTOR_STORE_PATH = os.getenv("LOCAL_VECTOR_STORE_PATH", ".cache/vector_store")
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS") or 0) or None
+# 02_upload_and_index.py와 같은 청크 설정 (정답 청크 번호 계산용)
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "800"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "80"))
+# 검색된 전체 문서(strictness로 걸러진 문서 표시 포함)를 돌려주는 API 버전부터 사용
+ALL_RETRIEVED_API_VERSION = "2024-05-01-preview"
+
+
+# ----- 골든 세트 -----
+def load_golden(path: str) -> List[Dict]:
+    """골든 질문 세트 로드"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_golden(path: str, items: List[Dict]):
+    """골든 질문 세트 저장 (한 줄에 하나)"""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for item in items:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+
+def resolve_golden(items: List[Dict], data_folder: str) -> List[Dict]:
+    """현재 청크 설정으로 각 질문의 정답 청크 번호와 페이지 범위 갱신
+
+    Returns:
+        list: 근거 문구를 찾지 못한 질문 (PDF 변경 등으로 골든 세트 수정 필요)
+    """
+    missing = []
+    by_source: Dict[str, List[Dict]] = {}
+    for item in items:
+        by_source.setdefault(item["source"], []).append(item)
+
+    for source, source_items in by_source.items():
+        pdf_path = Path(data_folder) / source
+        if not pdf_path.exists():
+            missing.extend(source_items)
+            continue
+        chunks = list(iter_chunks(extract_pages(str(pdf_path)), CHUNK_MAX_TOKENS, CHUNK_OVERLAP_TOKENS))
+        compact_chunks = [compact_text(chunk.text) for chunk in chunks]
+        for item in source_items:
+            evidence = compact_text(item["evidence"])
+            number = next((i for i, text in enumerate(compact_chunks) if evidence in text), None)
+            if number is None:
+                missing.append(item)
+                continue
+            item.update(chunk_id=number, page_start=chunks[number].page_start,
+                        page_end=chunks[number].page_end)
+    return missing
+
+
+# ----- 정답 판정 -----
+def is_relevant(document: Dict, item: Dict) -> bool:
+    """검색 결과가 질문의 정답 청크인지 (같은 PDF + 근거 문구 포함)"""
+    source = item["source"]
+    if document.get("filepath") != source and document.get("title") != Path(source).stem:
+        return False
+    return compact_text(item["evidence"]) in compact_text(document.get("content") or "")
+
+
+def first_relevant_rank(documents: List[Dict], item: Dict) -> Optional[int]:
+    """첫 정답 청크의 순위 (1부터, 없으면 None)"""
+    return next((rank for rank, doc in enumerate(documents, 1) if is_relevant(doc, item)), None)
+
+
+# ----- 검색 백엔드 -----
+def make_azure_retriever(max_tokens: int) -> Callable:
+    """On Your Data 검색 함수 생성 (03_chat_001.py와 같은 데이터 소스 설정)"""
+    import importlib
+
+    chat = importlib.import_module("03_chat_001")
+    client = chat.create_chat_client()
+    system_message = chat.create_system_message()
+    include_all = (chat.API_VERSION or "") >= ALL_RETRIEVED_API_VERSION
+
+    def retrieve(item: Dict, top_n: int, strictness: int, query_type: str) -> Tuple[List[Dict], int]:
+        rag_params = chat.create_rag_parameters()
+        parameters = rag_params["data_sources"][0]["parameters"]
+        parameters.update(top_n_documents=top_n, strictness=strictness, query_type=query_type)
+        parameters.pop("semantic_configuration", None)
+        if "semantic" in query_type:
+            parameters["semantic_configuration"] = chat.SEMANTIC_CONFIGURATION
+        if include_all:
+            parameters["include_contexts"] = ["citations", "intent", "all_retrieved_documents"]
+
+        response = client.chat.completions.create(
+            model=chat.AZURE_DEPLOYMENT_MODEL,
+            messages=[system_message, {"role": "user", "content": item["question"]}],
+            temperature=0,
+            max_tokens=max_tokens,
+            extra_body=rag_params,
+        )
+        context = getattr(response.choices[0].message, "context", None) or {}
+        if "all_retrieved_documents" in context:
+            # strictness로 걸러진 문서(filter_reason)는 GPT에 전달되지 않음
+            documents = [d for d in context["all_retrieved_documents"] if not d.get("filter_reason")]
+        else:
+            # 이전 API 버전: 답변에 인용된 문서만 알 수 있음
+            documents = context.get("citations", [])
+        return documents, response.usage.prompt_tokens
+
+    return retrieve
+
+
+def make_local_retriever(items: List[Dict], query_types: List[str]) -> Callable:
+    """로컬 벡터 저장소 검색 함수 생성 (질문 임베딩은 미리 한 번에 계산)"""
+    from local_vector_store import LocalVectorStore
+
+    store = LocalVectorStore(LOCAL_VECTOR_STORE_PATH)
+    vectors = {}
+    if any(query_type not in ("simple", "semantic") for query_type in query_types):
+        from openai import AzureOpenAI
+
+        from http_transport import get_openai_http_client
+
+        client = AzureOpenAI(
+            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+            api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview"),
+            http_client=get_openai_http_client(),
+        )
+        options = {"dimensions": EMBEDDING_DIMENSIONS} if EMBEDDING_DIMENSIONS else {}
+        response = client.embeddings.create(
+            model=os.getenv("AZURE_DEPLOYMENT_EMBEDDING_NAME"),
+            input=[item["question"] for item in items],
+            **options,
+        )
+        data = sorted(response.data, key=lambda d: d.index)
+        vectors = {item["id"]: d.embedding for item, d in zip(items, data)}
+    system_message = {"role": "system", "content": "당신은 Tibero 데이터베이스 전문가입니다."}
+
+    def retrieve(item: Dict, top_n: int, strictness: Optional[int], query_type: str) -> Tuple[List[Dict], int]:
+        hits = store.search(vectors.get(item["id"]), top_k=top_n,
+                            query_text=item["question"], query_type=query_type)
+        documents = [dict(hit, filepath=hit["source"]) for hit in hits]
+        context = {"role": "system", "content": "\n\n".join(doc["content"] for doc in documents)}
+        prompt_tokens = count_message_tokens(
+            [system_message, context, {"role": "user", "content": item["question"]}]
+        )
+        return documents, prompt_tokens
+
+    return retrieve
+
+
+# ----- 평가 -----
+def percentile(values: List[float], ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))] if ordered else 0.0
+
+
+def evaluate_config(retrieve: Callable, items: List[Dict], top_n: int, strictness: Optional[int],
+                    query_type: str, concurrency: int) -> Dict:
+    """설정 하나로 모든 질문을 검색해 recall@k / MRR / 프롬프트 토큰 / 지연 시간 계산"""
+
+    def run(item):
+        started = time.perf_counter()
+        try:
+            documents, prompt_tokens = retrieve(item, top_n, strictness, query_type)
+        except Exception as e:
+            return {"id": item["id"], "error": str(e)[:200]}
+        return {
+            "id": item["id"],
+            "rank": first_relevant_rank(documents, item),
+            "documents": len(documents),
+            "prompt_tokens": prompt_tokens,
+            "latency_ms": (time.perf_counter() - started) * 1000,
+        }
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        rows = list(executor.map(run, items))
+    ok = [row for row in rows if "error" not in row]
+    count = len(ok) or 1
+    latencies = [row["latency_ms"] for row in ok]
+    return {
+        "query_type": query_type,
+        "top_n": top_n,
+        "strictness": strictness,
+        "questions": len(rows),
+        "errors": len(rows) - len(ok),
+        "recall": sum(1 for row in ok if row["rank"]) / count,
+        "recall_at": {
+            str(k): sum(1 for row in ok if row["rank"] and row["rank"] <= k) / count
+            for k in K_VALUES if k <= top_n
+        },
+        "mrr": sum(1 / row["rank"] for row in ok if row["rank"]) / count,
+        "documents": statistics.fmean(row["documents"] for row in ok) if ok else 0.0,
+        "prompt_tokens": statistics.fmean(row["prompt_tokens"] for row in ok) if ok else 0.0,
+        "latency_p50_ms": percentile(latencies, 0.50),
+        "latency_p95_ms": percentile(latencies, 0.95),
+        "misses": [row["id"] for row in ok if not row["rank"]],
+        "error_samples": [row["error"] for row in rows if "error" in row][:3],
+    }
+
+
+def recommend(results: List[Dict], tolerance: float) -> Optional[Dict]:
+    """최고 recall에서 tolerance 이내인 설정 중 프롬프트 토큰(다음으로 지연 시간)이 가장 작은 설정"""
+    valid = [r for r in results if not r["errors"]]
+    if not valid:
+        return None
+    best_recall = max(r["recall"] for r in valid)
+    candidates = [r for r in valid if r["recall"] >= best_recall - tolerance]
+    return min(candidates, key=lambda r: (r["prompt_tokens"], r["latency_p50_ms"]))
+
+
+def describe(result: Dict) -> str:
+    strictness = "" if result["strictness"] is None else f", strictness={result['strictness']}"
+    return f"{result['query_type']}, top_n={result['top_n']}{strictness}"
+
+
+def print_report(results: List[Dict], question_count: int, backend: str):
+    """결과 표 출력"""
+    print(f"\n질문 {question_count}개, 백엔드 {backend}")
+    print("-" * 104)
+    recall_headers = " | ".join(f"{'R@' + str(k):>5}" for k in K_VALUES)
+    print(f"{'검색 방식':<22} | {'top_n':>5} | {'엄격도':>4} | {recall_headers} | {'recall':>6} | "
+          f"{'MRR':>5} | {'문서':>4} | {'프롬프트':>7} | {'p50(ms)':>8} | {'p95(ms)':>8}")
+    print("-" * 104)
+    for r in results:
+        recalls = " | ".join(
+            f"{r['recall_at'][str(k)]:>5.2f}" if str(k) in r["recall_at"] else f"{'-':>5}"
+            for k in K_VALUES
+        )
+        strictness = "-" if r["strictness"] is None else r["strictness"]
+        line = (
+            f"{r['query_type']:<22} | {r['top_n']:>5} | {strictness:>6} | {recalls} | "
+            f"{r['recall']:>6.2f} | {r['mrr']:>5.2f} | {r['documents']:>6.1f} | "
+            f"{r['prompt_tokens']:>10,.0f} | {r['latency_p50_ms']:>8.0f} | {r['latency_p95_ms']:>8.0f}"
+        )
+        if r["errors"]:
+            line += f"  ⚠️ 오류 {r['errors']}개"
+        print(line)
+    print("-" * 104)
+    if backend == "azure":
+        print("※ 지연 시간은 검색 + 답변 생성(--max-tokens 제한) 포함, recall은 GPT에 전달된 문서 기준")
+    else:
+        print("※ 지연 시간은 질문 임베딩을 제외한 로컬 검색 시간, 프롬프트 토큰은 근거 문서 기준 추정")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="검색 설정별 recall/MRR/프롬프트 토큰/지연 시간 비교")
+    parser.add_argument("--golden", default=DEFAULT_GOLDEN_PATH, help="골든 질문 세트 (JSONL)")
+    parser.add_argument("--resolve", action="store_true",
+                        help="현재 청크 설정으로 정답 청크 번호/페이지를 갱신하고 종료")
+    parser.add_argument("--data-folder", default="./data", help="PDF 폴더 (--resolve용)")
+    parser.add_argument("--backend", choices=["azure", "local"], default="azure", help="검색 백엔드")
+    parser.add_argument("--top-n", type=int, nargs="+", default=DEFAULT_TOP_N,
+                        help="비교할 top_n_documents 목록 (기본: 1 3 5 8 10)")
+    parser.add_argument("--strictness", type=int, nargs="+", default=DEFAULT_STRICTNESS,
+                        help="비교할 strictness 목록 (azure 전용, 기본: 1 2 3 4 5)")
+    parser.add_argument("--query-types", nargs="+", default=[SEARCH_QUERY_TYPE],
+                        help=f"비교할 검색 방식 목록 (기본: {SEARCH_QUERY_TYPE})")
+    parser.add_argument("--max-tokens", type=int, default=50,
+                        help="답변 생성 최대 토큰 (azure, 검색 평가에는 짧게, 기본 50)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시 검색 수 (기본 4)")
+    parser.add_argument("--limit", type=int, help="앞에서부터 평가할 질문 수")
+    parser.add_argument("--tolerance", type=float, default=0.02,
+                        help="추천 기준: 최고 recall과의 허용 차이 (기본 0.02)")
+    parser.add_argument("--output", help="결과를 저장할 JSON 파일")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    items = load_golden(args.golden)
+
+    if args.resolve:
+        print(f"골든 질문 {len(items)}개의 정답 청크 계산 중 (청크 {CHUNK_MAX_TOKENS}토큰, "
+              f"오버랩 {CHUNK_OVERLAP_TOKENS}토큰)...")
+        missing = resolve_golden(items, args.data_folder)
+        save_golden(args.golden, items)
+        print(f"✓ 저장: {args.golden}")
+        for item in missing:
+            print(f"❌ {item['id']}: '{item['evidence']}'를 {item['source']}에서 찾지 못했습니다.")
+        return
+
+    if args.limit:
+        items = items[:args.limit]
+    if args.backend == "azure":
+        retrieve = make_azure_retriever(args.max_tokens)
+        configs = list(product(args.query_types, args.top_n, args.strictness))
+    else:
+        retrieve = make_local_retriever(items, args.query_types)
+        configs = list(product(args.query_types, args.top_n, [None]))
+
+    print(f"설정 {len(configs)}개 × 질문 {len(items)}개 평가 중...")
+    results = []
+    for i, (query_type, top_n, strictness) in enumerate(configs, 1):
+        result = evaluate_config(retrieve, items, top_n, strictness, query_type, args.concurrency)
+        results.append(result)
+        print(f"  [{i}/{len(configs)}] {describe(result)}: recall {result['recall']:.2f}, "
+              f"프롬프트 {result['prompt_tokens']:,.0f} 토큰")
+
+    print_report(results, len(items), args.backend)
+    best = recommend(results, args.tolerance)
+    if best:
+        print(f"\n추천: {describe(best)} (recall {best['recall']:.2f}, MRR {best['mrr']:.2f}, "
+              f"프롬프트 {best['prompt_tokens']:,.0f} 토큰, p50 {best['latency_p50_ms']:.0f}ms)")
+        if best["misses"]:
+            print(f"  놓친 질문: {', '.join(best['misses'])}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(
+                {"backend": args.backend, "questions": len(items), "tolerance": args.tolerance,
+                 "recommended": best and describe(best), "results": results},
+                f, ensure_ascii=False, indent=2,
+            )
+        print(f"\n✓ 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+공유 HTTP 전송 계층
+채팅/임베딩(OpenAI)과 검색/Blob/관리(Azure SDK) 클라이언트가 프로세스당 하나의 연결 풀을 함께 쓰도록 합니다.
+여러 Streamlit 세션이나 작업자 스레드가 동시에 요청해도 이미 열린 연결을 재사용하므로
+요청마다 TCP/TLS 핸드셰이크를 반복하지 않습니다.
+
+- OpenAI: 공유 httpx Client (연결 수/유지 연결 수 제한, keep-alive 유지 시간, 연결/읽기 시간 제한,
+  h2 패키지가 설치되어 있으면 HTTP/2)
+- Azure SDK: 공유 requests.Session 위의 RequestsTransport (호스트별 연결 풀 크기, 연결/읽기 시간 제한,
+  재시도는 SDK 파이프라인이 처리하므로 연결 어댑터의 재시도는 끔)
+
+클라이언트를 close()하거나 with 블록으로 쓰면 공유 연결 풀까지 닫히므로,
+공유 클라이언트로 만든 OpenAI 클라이언트는 닫지 않는다 (비동기 클라이언트는 매번 새로 만들어 닫아도 됨).
+"""
+
+import importlib.util
+import os
+import threading
+from typing import Dict
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 전체 연결 수 / 유지할 연결 수 (Streamlit 세션 + 임베딩/업로드 작업자 수보다 크게)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "32"))
+# 쉬는 연결을 유지할 시간 (초) - httpx 기본 5초는 질문 사이에 연결이 끊겨 다시 핸드셰이크하게 됨
+# (Azure 부하 분산 장치의 유휴 시간 제한 4분보다 짧게)
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "90"))
+# 호스트별 연결 풀 크기 (Azure SDK) - Blob 병렬 업로드(파일 4개 x 블록 4개)도 새 연결 없이 처리
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "10"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+
+# 호출 종류별 읽기 시간 제한 (초, 응답 바이트 사이 최대 대기 - 스트리밍 채팅은 첫 토큰까지 포함)
+READ_TIMEOUTS = {
+    "chat": float(os.getenv("HTTP_CHAT_READ_TIMEOUT", "60")),
+    "embedding": float(os.getenv("HTTP_EMBEDDING_READ_TIMEOUT", "30")),
+    "search": float(os.getenv("HTTP_SEARCH_READ_TIMEOUT", "60")),
+    "blob": float(os.getenv("HTTP_BLOB_READ_TIMEOUT", "120")),
+    "management": float(os.getenv("HTTP_MANAGEMENT_READ_TIMEOUT", "60")),
+}
+
+_lock = threading.Lock()
+_openai_http_client = None
+_requests_session = None
+
+
+def http2_enabled() -> bool:
+    """HTTP/2 사용 여부 (설정이 켜져 있고 h2 패키지가 설치된 경우)"""
+    return HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+
+def openai_timeout(kind: str = "chat"):
+    """OpenAI 호출 시간 제한 (호출마다 timeout=으로 지정 가능)"""
+    from openai import Timeout
+
+    return Timeout(READ_TIMEOUTS[kind], connect=HTTP_CONNECT_TIMEOUT)
+
+
+def _openai_client_options(kind: str) -> Dict:
+    return {
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": openai_timeout(kind),
+        "http2": http2_enabled(),
+    }
+
+
+def get_openai_http_client():
+    """모든 동기 OpenAI 클라이언트가 공유하는 httpx Client (기본 시간 제한은 채팅 기준)"""
+    global _openai_http_client
+    if _openai_http_client is None:
+        with _lock:
+            if _openai_http_client is None:
+                from openai import DefaultHttpxClient
+
+                _openai_http_client = DefaultHttpxClient(**_openai_client_options("chat"))
+    return _openai_http_client
+
+
+def create_async_openai_http_client(kind: str = "chat"):
+    """비동기 OpenAI 클라이언트용 httpx AsyncClient (이벤트 루프마다 새로 만들고 클라이언트와 함께 닫음)"""
+    from openai import DefaultAsyncHttpxClient
+
+    return DefaultAsyncHttpxClient(**_openai_client_options(kind))
+
+
+def get_requests_session():
+    """모든 Azure SDK 클라이언트가 공유하는 requests.Session"""
+    global _requests_session
+    if _requests_session is None:
+        with _lock:
+            if _requests_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=HTTP_POOL_HOSTS,
+                    pool_maxsize=HTTP_POOL_MAXSIZE,
+                    max_retries=Retry(total=False, redirect=False, raise_on_status=False),
+                )
+                for prefix in ("http://", "https://"):
+                    session.mount(prefix, adapter)
+                _requests_session = session
+    return _requests_session
+
+
+def azure_transport(kind: str = "search"):
+    """공유 세션을 쓰는 Azure SDK 전송 (클라이언트마다 새로 만들어도 연결 풀은 공유)"""
+    from azure.core.pipeline.transport import RequestsTransport
+
+    return RequestsTransport(
+        session=get_requests_session(),
+        session_owner=False,  # 클라이언트를 닫아도 공유 세션은 유지
+        connection_timeout=HTTP_CONNECT_TIMEOUT,
+        read_timeout=READ_TIMEOUTS[kind],
+    )
+
+
+def azure_client_options(kind: str = "search") -> Dict:
+    """Azure SDK 클라이언트 생성자에 넘길 옵션 (transport=)"""
+    return {"transport": azure_transport(kind)}
+
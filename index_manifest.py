@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+증분 인덱싱용 파일 매니페스트
+파일별 크기, 수정 시각, 내용 해시(SHA-256)와 생성된 청크 ID를 JSON으로 저장하여
+변경되지 않은 PDF는 다시 처리하지 않도록 합니다.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+def file_sha256(path: str, block_size: int = 1024 * 1024) -> str:
+    """파일 내용의 SHA-256 해시"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def settings_fingerprint(settings: Dict) -> str:
+    """인덱싱 설정(청킹, 임베딩 모델 등)의 해시 - 설정이 바뀌면 전체 재인덱싱"""
+    payload = json.dumps(settings, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+class IndexManifest:
+    """인덱싱/업로드 상태 매니페스트
+
+    구조:
+        {
+            "index_name": ..., "settings": ...,
+            "files": {파일명: {"size", "mtime", "sha256", "chunk_ids"}},
+            "blobs": {파일명: {"size", "mtime", "sha256"}}
+        }
+    """
+
+    def __init__(self, path: str, index_name: str, settings: str):
+        self.path = path
+        self.index_name = index_name
+        self.settings = settings
+        self.files: Dict[str, Dict] = {}
+        self.blobs: Dict[str, Dict] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  매니페스트를 읽을 수 없어 새로 만듭니다: {e}")
+            return
+        # 업로드 기록은 인덱스와 무관하게 유지
+        self.blobs = data.get("blobs", {})
+        # 인덱스 이름이나 인덱싱 설정이 바뀌면 인덱싱 기록은 무효
+        if data.get("index_name") == self.index_name and data.get("settings") == self.settings:
+            self.files = data.get("files", {})
+
+    def save(self):
+        """매니페스트 저장 (임시 파일에 쓴 뒤 교체)"""
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "index_name": self.index_name,
+                    "settings": self.settings,
+                    "files": self.files,
+                    "blobs": self.blobs,
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _is_unchanged(entry: Optional[Dict], path: Path) -> bool:
+        """크기/수정 시각이 같으면 변경 없음, 다르면 해시로 최종 확인"""
+        if not entry:
+            return False
+        stat = path.stat()
+        if entry.get("size") != stat.st_size:
+            return False
+        if entry.get("mtime") == stat.st_mtime:
+            return True
+        if entry.get("sha256") == file_sha256(str(path)):
+            # 내용은 같고 수정 시각만 바뀐 경우 (복사, 체크아웃 등)
+            entry["mtime"] = stat.st_mtime
+            return True
+        return False
+
+    @staticmethod
+    def _fingerprint(path: Path) -> Dict:
+        stat = path.stat()
+        return {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "sha256": file_sha256(str(path)),
+        }
+
+    # --- 인덱싱 기록 ---
+
+    def is_indexed(self, path: Path) -> bool:
+        """마지막 인덱싱 이후 변경되지 않은 파일인지"""
+        return self._is_unchanged(self.files.get(path.name), path)
+
+    def mark_indexed(self, path: Path, chunk_ids: List[str]):
+        entry = self._fingerprint(path)
+        entry["chunk_ids"] = chunk_ids
+        self.files[path.name] = entry
+
+    def forget_indexed(self, name: str):
+        self.files.pop(name, None)
+
+    # --- 업로드 기록 ---
+
+    def is_uploaded(self, path: Path) -> bool:
+        """마지막 업로드 이후 변경되지 않은 파일인지"""
+        return self._is_unchanged(self.blobs.get(path.name), path)
+
+    def mark_uploaded(self, path: Path):
+        self.blobs[path.name] = self._fingerprint(path)
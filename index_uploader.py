@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Azure AI Search 문서 업로드 (크기 기준 배치, 동시 전송, 실패 문서만 재시도)
+요청 크기(바이트)와 문서 수로 배치를 나누어 여러 배치를 동시에 merge-or-upload 하고,
+문서별 IndexingResult를 확인해 실패한 키만 백오프 후 다시 보냅니다.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from rate_limit import (
+    AdaptiveRateLimiter,
+    backoff_delay,
+    get_retry_after,
+    get_status_code,
+    is_retryable_error,
+)
+from telemetry import current_span, span
+
+# 서비스 제한: 요청당 최대 1000개 문서, 16MB (여유를 두고 기본 8MB)
+DEFAULT_MAX_DOCS = int(os.getenv("INDEX_UPLOAD_BATCH_MAX_DOCS", "1000"))
+DEFAULT_MAX_BYTES = int(float(os.getenv("INDEX_UPLOAD_BATCH_MAX_MB", "8")) * 1024 * 1024)
+DEFAULT_CONCURRENCY = int(os.getenv("INDEX_UPLOAD_CONCURRENCY", "4"))
+DEFAULT_MAX_RETRIES = int(os.getenv("INDEX_UPLOAD_MAX_RETRIES", "8"))
+
+# 문서별 결과 중 다시 보내면 성공할 수 있는 상태 코드
+# (409: 동시 갱신 충돌, 422: 인덱스 일시 사용 불가, 503: 서비스 과부하)
+RETRYABLE_STATUS_CODES = {409, 422, 429, 500, 502, 503, 504}
+THROTTLE_STATUS_CODES = {429, 503}
+
+
+def document_size(document: Dict) -> int:
+    """문서의 JSON 직렬화 크기(바이트) 근사치"""
+    return len(json.dumps(document, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def iter_document_batches(
+    documents: Iterable[Dict],
+    max_docs: int = DEFAULT_MAX_DOCS,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    with_bytes: bool = False,
+) -> Iterator:
+    """문서 스트림을 문서 수/요청 크기 제한 이내의 배치로 묶기
+
+    with_bytes=True이면 (배치, 배치 크기) 튜플을 반환한다.
+    """
+    batch = []
+    batch_bytes = 0
+    for document in documents:
+        size = document_size(document)
+        if batch and (len(batch) >= max_docs or batch_bytes + size > max_bytes):
+            yield (batch, batch_bytes) if with_bytes else batch
+            batch = []
+            batch_bytes = 0
+        batch.append(document)
+        batch_bytes += size
+    if batch:
+        yield (batch, batch_bytes) if with_bytes else batch
+
+
+class IndexUploader:
+    """여러 배치를 동시에 업로드하고 실패한 문서만 재시도하는 업로더
+
+    429/503이 발생하면 동시 요청 수를 줄였다가 성공이 이어지면 다시 늘리며,
+    413(요청이 너무 큼)이면 배치를 반으로 나누어 다시 보낸다.
+    """
+
+    def __init__(
+        self,
+        search_client,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_docs: int = DEFAULT_MAX_DOCS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        key_field: str = "id",
+    ):
+        self.search_client = search_client
+        self.concurrency = max(1, concurrency)
+        self.max_docs = max_docs
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.key_field = key_field
+        self.limiter = AdaptiveRateLimiter(self.concurrency)
+        self.retried = 0
+
+    def _wait(self, attempt: int, delay: Optional[float], throttled: bool):
+        if delay is None:
+            delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+        if throttled:
+            self.limiter.on_throttle(delay)
+        else:
+            time.sleep(delay)
+
+    def upload_batch(self, documents: List[Dict]) -> Tuple[int, Dict[str, str]]:
+        """배치 하나를 업로드 (실패한 문서만 재시도)
+
+        Returns:
+            tuple: (성공한 문서 수, {실패한 키: 오류 메시지})
+        """
+        succeeded = 0
+        failed = {}
+        remaining = documents
+        attempt = 0
+
+        while remaining:
+            try:
+                with self.limiter:
+                    results = self.search_client.merge_or_upload_documents(documents=remaining)
+            except Exception as e:
+                status_code = get_status_code(e)
+                if status_code == 413 and len(remaining) > 1:
+                    half = len(remaining) // 2
+                    for part in (remaining[:half], remaining[half:]):
+                        part_succeeded, part_failed = self.upload_batch(part)
+                        succeeded += part_succeeded
+                        failed.update(part_failed)
+                    return succeeded, failed
+                if attempt >= self.max_retries or not is_retryable_error(e):
+                    failed.update((doc[self.key_field], str(e)) for doc in remaining)
+                    return succeeded, failed
+                self._wait(attempt, get_retry_after(e), status_code in THROTTLE_STATUS_CODES)
+                attempt += 1
+                self.retried += len(remaining)
+                current_span().add("retries")
+                continue
+
+            by_key = {doc[self.key_field]: doc for doc in remaining}
+            retry = []
+            throttled = False
+            for item in results:
+                if item.succeeded:
+                    succeeded += 1
+                elif item.status_code in RETRYABLE_STATUS_CODES and attempt < self.max_retries:
+                    retry.append(by_key[item.key])
+                    throttled = throttled or item.status_code in THROTTLE_STATUS_CODES
+                else:
+                    failed[item.key] = f"{item.status_code}: {item.error_message}"
+
+            if not retry:
+                self.limiter.on_success()
+                return succeeded, failed
+            self._wait(attempt, None, throttled)
+            attempt += 1
+            self.retried += len(retry)
+            current_span().add("retries")
+            remaining = retry
+
+        return succeeded, failed
+
+    def upload(
+        self,
+        documents: Iterable[Dict],
+        on_batch: Optional[Callable[[int, Dict[str, str]], None]] = None,
+        parent=None,
+    ) -> Dict[str, str]:
+        """문서 스트림을 배치로 묶어 동시에 업로드
+
+        진행 중인 배치 수를 동시 요청 수의 2배로 제한하므로,
+        입력이 아무리 커도 메모리에 올라가는 문서 수가 일정하게 유지된다.
+
+        Args:
+            documents: 업로드할 문서 스트림
+            on_batch: 배치가 끝날 때마다 (성공 수, {실패 키: 메시지}) 콜백
+            parent: 배치별 "upload" 스팬의 부모 (기본값: 현재 스팬)
+
+        Returns:
+            dict: {최종 실패한 키: 오류 메시지}
+        """
+        failed = {}
+        max_pending = self.concurrency * 2
+        parent = parent or current_span()
+
+        def upload_traced(batch, batch_bytes):
+            with span("upload", parent, documents=len(batch), bytes=batch_bytes) as batch_span:
+                batch_succeeded, batch_failed = self.upload_batch(batch)
+                batch_span.set(failed=len(batch_failed))
+                return batch_succeeded, batch_failed
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            pending = set()
+
+            def drain():
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.discard(future)
+                    batch_succeeded, batch_failed = future.result()
+                    failed.update(batch_failed)
+                    if on_batch:
+                        on_batch(batch_succeeded, batch_failed)
+
+            for batch, batch_bytes in iter_document_batches(
+                documents, self.max_docs, self.max_bytes, with_bytes=True
+            ):
+                pending.add(executor.submit(upload_traced, batch, batch_bytes))
+                if len(pending) >= max_pending:
+                    drain()
+            while pending:
+                drain()
+
+        return failed
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+로컬 BM25 키워드 인덱스 (역색인)
+한글은 음절 바이그램, 숫자는 그대로, 영문은 단어 + 문자 트라이그램으로 토큰화하여
+"7001", "socket" 같은 정확한 용어 질의를 찾고, 벡터 검색 결과와
+RRF(Reciprocal Rank Fusion)로 결합합니다.
+
+디스크 형식 (디렉터리):
+    terms.txt        정렬된 용어 목록 (줄 번호 = 용어 번호)
+    term_stats.npy   용어별 [postings 오프셋, 문서 빈도] (uint32)
+    postings.bin     용어별 [문서 번호 차분 varint..., 출현 빈도 varint...]
+    doc_lengths.npy  문서별 토큰 수 (uint32)
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+TERMS_FILE = "terms.txt"
+TERM_STATS_FILE = "term_stats.npy"
+POSTINGS_FILE = "postings.bin"
+DOC_LENGTHS_FILE = "doc_lengths.npy"
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+# RRF 순위 상수 (값이 클수록 하위 순위의 영향이 커짐)
+RRF_K = 60
+
+# 영문 단어, 숫자, 한글 음절 연속 구간, 그 밖의 CJK 문자 연속 구간
+TOKEN_PATTERN = re.compile(r"[a-z]+|[0-9]+|[가-힣]+|[一-鿿぀-ヿ]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """검색용 토큰 목록
+
+    - 숫자: 그대로 ("TBR-7001" → "tbr", "7001") - 에러 코드는 정확히 일치해야 함
+    - 영문: 소문자 단어 + "#"을 붙인 문자 트라이그램
+      (PDF 추출 시 "Invalidsocketfiledescriptor"처럼 띄어쓰기가 사라져도 "socket"이 일치)
+    - 한글/한자: 음절 바이그램 ("소켓을" → "소켓", "켓을") - 조사가 붙어도 어간이 일치
+    """
+    tokens = []
+    for match in TOKEN_PATTERN.finditer(text.lower()):
+        token = match.group()
+        if token.isdigit():
+            tokens.append(token)
+        elif token.isascii():
+            tokens.append(token)
+            if len(token) > 3:
+                tokens.extend("#" + token[i:i + 3] for i in range(len(token) - 2))
+        elif len(token) == 1:
+            tokens.append(token)
+        else:
+            tokens.extend(token[i:i + 2] for i in range(len(token) - 1))
+    return tokens
+
+
+def _encode_varint(value: int, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_varints(data: bytes, count: int, offset: int = 0) -> Tuple[List[int], int]:
+    values = []
+    value = shift = 0
+    while len(values) < count:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    return values, offset
+
+
+def build_keyword_index(texts: Iterable[str], path: str) -> Dict:
+    """문서 텍스트(순서 = 문서 번호)로 역색인을 만들어 저장
+
+    Returns:
+        dict: 문서 수, 용어 수, postings 크기(바이트)
+    """
+    postings = defaultdict(list)  # 용어 → [(문서 번호, 빈도)]
+    doc_lengths = []
+    for doc_id, text in enumerate(texts):
+        tokens = tokenize(text or "")
+        doc_lengths.append(len(tokens))
+        for term, freq in Counter(tokens).items():
+            postings[term].append((doc_id, freq))
+
+    directory = Path(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    terms = sorted(postings)
+    term_stats = np.zeros((len(terms), 2), dtype=np.uint32)
+    data = bytearray()
+    for term_id, term in enumerate(terms):
+        entries = postings[term]
+        term_stats[term_id] = (len(data), len(entries))
+        previous = 0
+        for doc_id, _ in entries:
+            _encode_varint(doc_id - previous, data)
+            previous = doc_id
+        for _, freq in entries:
+            _encode_varint(freq, data)
+
+    with open(directory / POSTINGS_FILE, "wb") as f:
+        f.write(data)
+    with open(directory / TERMS_FILE, "w", encoding="utf-8") as f:
+        f.write("\n".join(terms))
+    np.save(directory / TERM_STATS_FILE, term_stats)
+    np.save(directory / DOC_LENGTHS_FILE, np.asarray(doc_lengths, dtype=np.uint32))
+    return {"documents": len(doc_lengths), "terms": len(terms), "bytes": len(data)}
+
+
+class KeywordIndex:
+    """디스크 역색인 기반 BM25 검색기"""
+
+    def __init__(self, path: str):
+        directory = Path(path)
+        with open(directory / TERMS_FILE, "r", encoding="utf-8") as f:
+            terms = f.read()
+        self.vocab = {term: term_id for term_id, term in enumerate(terms.split("\n"))} if terms else {}
+        self.term_stats = np.load(directory / TERM_STATS_FILE)
+        with open(directory / POSTINGS_FILE, "rb") as f:
+            self.postings = f.read()
+        self.doc_lengths = np.load(directory / DOC_LENGTHS_FILE).astype(np.float32)
+        self.doc_count = len(self.doc_lengths)
+        self.avg_length = float(self.doc_lengths.mean()) if self.doc_count else 0.0
+
+    def __len__(self) -> int:
+        return self.doc_count
+
+    def _postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        offset, df = (int(v) for v in self.term_stats[self.vocab[term]])
+        gaps, offset = _decode_varints(self.postings, df, offset)
+        freqs, _ = _decode_varints(self.postings, df, offset)
+        return np.cumsum(gaps), np.asarray(freqs, dtype=np.float32)
+
+    def scores(self, query: str) -> np.ndarray:
+        """모든 문서의 BM25 점수"""
+        scores = np.zeros(self.doc_count, dtype=np.float32)
+        if not self.doc_count:
+            return scores
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths / max(self.avg_length, 1e-6))
+        for term, query_freq in Counter(tokenize(query)).items():
+            if term not in self.vocab:
+                continue
+            doc_ids, freqs = self._postings(term)
+            df = len(doc_ids)
+            idf = math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+            scores[doc_ids] += query_freq * idf * freqs * (BM25_K1 + 1) / (freqs + norm[doc_ids])
+        return scores
+
+    def search(self, query: str, top_k: int = 5,
+               mask: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """BM25 상위 문서 [(문서 번호, 점수)] (점수 0인 문서 제외)
+
+        Args:
+            mask: 검색 대상 문서 여부 (bool 배열, None이면 전체)
+        """
+        scores = self.scores(query)
+        if mask is not None:
+            scores[~mask] = 0.0
+        matched = int(np.count_nonzero(scores))
+        top_k = min(top_k, matched)
+        if top_k <= 0:
+            return []
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        ranked = candidates[np.argsort(-scores[candidates])]
+        return [(int(i), float(scores[i])) for i in ranked]
+
+
+def reciprocal_rank_fusion(rankings: Iterable[List[int]], k: int = RRF_K) -> List[Tuple[int, float]]:
+    """여러 순위 목록을 RRF 점수(Σ 1 / (k + 순위))로 결합 [(문서 번호, 점수)]"""
+    fused = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            fused[doc_id] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+로컬 벡터 저장소 (Azure AI Search 대신 프로세스 안에서 검색)
+청크 벡터는 메모리 맵 NumPy 파일(vectors.npy), 청크 메타데이터는 JSONL로 저장합니다.
+작은 말뭉치는 행렬 곱 전수 검색, 큰 말뭉치는 hnswlib(설치된 경우) ANN 인덱스로 검색하고,
+BM25 키워드 인덱스(keywords/)와 RRF로 결합한 하이브리드 검색도 지원합니다.
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from keyword_index import KeywordIndex, build_keyword_index, reciprocal_rank_fusion
+
+try:
+    import hnswlib
+except ImportError:  # 선택 의존성: 없으면 항상 전수 검색
+    hnswlib = None
+
+VECTORS_FILE = "vectors.npy"
+METADATA_FILE = "metadata.jsonl"
+ANN_INDEX_FILE = "hnsw.bin"
+INFO_FILE = "store.json"
+KEYWORD_INDEX_DIR = "keywords"
+
+# 검색 방식 (Azure On Your Data의 query_type 이름과 맞춤)
+#   vector: 벡터만 / simple: BM25 키워드만 / *_hybrid: 둘을 RRF로 결합
+VECTOR_QUERY_TYPES = ("vector",)
+KEYWORD_QUERY_TYPES = ("simple", "semantic")
+HYBRID_QUERY_TYPES = ("vector_simple_hybrid", "vector_semantic_hybrid")
+# 하이브리드 검색 시 각 방식에서 뽑는 후보 수 (top_k의 배수, 최소값)
+HYBRID_CANDIDATE_FACTOR = 4
+HYBRID_MIN_CANDIDATES = 50
+
+# 이 개수 이상이면 ANN 인덱스를 만들어 사용 (그 미만은 전수 검색이 더 빠르고 정확)
+DEFAULT_ANN_THRESHOLD = int(os.getenv("LOCAL_ANN_THRESHOLD", "50000"))
+DEFAULT_EF_SEARCH = int(os.getenv("LOCAL_ANN_EF_SEARCH", "128"))
+
+# 벡터와 함께 저장하는 검색 인덱스 필드
+METADATA_FIELDS = (
+    "id", "title", "content", "source", "chunk_id",
+    "page_start", "page_end", "section", "doc_type",
+)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2 정규화 (내적 = 코사인 유사도가 되도록)"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class LocalVectorStore:
+    """메모리 맵 벡터 파일 기반 top-k 검색기"""
+
+    def __init__(self, path: str, ef_search: int = DEFAULT_EF_SEARCH):
+        self.path = Path(path)
+        with open(self.path / INFO_FILE, "r", encoding="utf-8") as f:
+            self.info = json.load(f)
+        self.dimensions = self.info["dimensions"]
+        # 파일 전체를 읽지 않고 필요한 페이지만 OS가 올림
+        self.vectors = np.load(self.path / VECTORS_FILE, mmap_mode="r")
+        with open(self.path / METADATA_FILE, "r", encoding="utf-8") as f:
+            self.metadata = [json.loads(line) for line in f]
+
+        self.keywords = None
+        if (self.path / KEYWORD_INDEX_DIR).exists():
+            self.keywords = KeywordIndex(self.path / KEYWORD_INDEX_DIR)
+
+        self.ann = None
+        ann_path = self.path / ANN_INDEX_FILE
+        if hnswlib is not None and ann_path.exists():
+            self.ann = hnswlib.Index(space="ip", dim=self.dimensions)
+            self.ann.load_index(str(ann_path), max_elements=len(self.metadata))
+            self.ann.set_ef(ef_search)
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+    def _mask(self, predicate: Callable[[Dict], bool]) -> np.ndarray:
+        return np.fromiter((predicate(m) for m in self.metadata), dtype=bool, count=len(self))
+
+    def _vector_rows(self, query_vector: List[float], top_k: int,
+                     predicate: Optional[Callable[[Dict], bool]]) -> List[Tuple[int, float]]:
+        """벡터 검색 [(행 번호, 코사인 유사도)]"""
+        query = normalize(np.asarray(query_vector, dtype=np.float32))
+        if query.shape[0] != self.dimensions:
+            raise ValueError(
+                f"질의 벡터 차원({query.shape[0]})이 저장소 차원({self.dimensions})과 다릅니다."
+            )
+        top_k = min(top_k, len(self.metadata))
+
+        if self.ann is not None:
+            ann_filter = None
+            if predicate is not None:
+                ann_filter = lambda label: predicate(self.metadata[label])
+            try:
+                labels, distances = self.ann.knn_query(query, k=top_k, filter=ann_filter)
+                return [
+                    (int(label), float(1.0 - distance))
+                    for label, distance in zip(labels[0], distances[0])
+                ]
+            except RuntimeError:
+                # 필터 조건을 만족하는 청크가 top_k보다 적으면 전수 검색으로 처리
+                pass
+
+        scores = np.asarray(self.vectors @ query, dtype=np.float32)
+        if predicate is not None:
+            mask = self._mask(predicate)
+            scores[~mask] = -np.inf
+            top_k = min(top_k, int(mask.sum()))
+            if top_k == 0:
+                return []
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        ranked = candidates[np.argsort(-scores[candidates])]
+        return [(int(i), float(scores[i])) for i in ranked]
+
+    def _keyword_rows(self, query_text: str, top_k: int,
+                      predicate: Optional[Callable[[Dict], bool]]) -> List[Tuple[int, float]]:
+        """BM25 키워드 검색 [(행 번호, BM25 점수)]"""
+        if self.keywords is None:
+            raise ValueError("키워드 인덱스가 없습니다. 02_upload_and_index.py로 저장소를 다시 만드세요.")
+        mask = self._mask(predicate) if predicate is not None else None
+        return self.keywords.search(query_text, top_k, mask)
+
+    def search(self, query_vector: Optional[List[float]] = None, top_k: int = 5,
+               predicate: Optional[Callable[[Dict], bool]] = None,
+               query_text: Optional[str] = None, query_type: str = "vector") -> List[Dict]:
+        """질의와 가장 관련 있는 청크 top_k개
+
+        Args:
+            query_vector: 질의 임베딩 (저장된 벡터와 같은 차원, 키워드 검색만 할 때는 None)
+            top_k: 반환할 청크 수
+            predicate: 메타데이터를 받아 검색 대상 여부를 돌려주는 필터
+            query_text: 질의 원문 (키워드/하이브리드 검색용)
+            query_type: vector / simple / vector_simple_hybrid 등
+
+        Returns:
+            list: 메타데이터 + "score" 목록, 점수 내림차순
+                  (vector: 코사인 유사도, simple: BM25, hybrid: RRF 점수)
+        """
+        if not self.metadata:
+            return []
+        if query_type in HYBRID_QUERY_TYPES:
+            candidates = max(top_k * HYBRID_CANDIDATE_FACTOR, HYBRID_MIN_CANDIDATES)
+            vector_rows = self._vector_rows(query_vector, candidates, predicate)
+            keyword_rows = self._keyword_rows(query_text, candidates, predicate)
+            rows = reciprocal_rank_fusion(
+                [[row for row, _ in vector_rows], [row for row, _ in keyword_rows]]
+            )[:top_k]
+        elif query_type in KEYWORD_QUERY_TYPES:
+            rows = self._keyword_rows(query_text, top_k, predicate)
+        elif query_type in VECTOR_QUERY_TYPES:
+            rows = self._vector_rows(query_vector, top_k, predicate)
+        else:
+            raise ValueError(f"지원하지 않는 검색 방식입니다: {query_type}")
+        return [dict(self.metadata[row], score=score) for row, score in rows]
+
+
+class LocalVectorStoreWriter:
+    """로컬 벡터 저장소 갱신기 (인덱서용)
+
+    새 청크는 임시 파일에 이어 쓰고(메모리 사용량 일정), commit() 때
+    남길 기존 청크와 합쳐 새 저장소를 만든 뒤 통째로 교체한다.
+    다시 인덱싱하거나 삭제된 원본 파일의 기존 청크는 remove_source()로 제외한다.
+    """
+
+    def __init__(self, path: str, dimensions: int):
+        self.path = Path(path)
+        self.dimensions = dimensions
+        self.staging_path = Path(f"{self.path}.staging")
+        self.removed_sources = set()
+        self.added = 0
+
+        if self.staging_path.exists():
+            shutil.rmtree(self.staging_path)
+        self.staging_path.mkdir(parents=True)
+        self._vector_file = open(self.staging_path / "vectors.f32", "wb")
+        self._metadata_file = open(self.staging_path / METADATA_FILE, "w", encoding="utf-8")
+
+    def remove_source(self, source: str):
+        """원본 파일의 기존 청크를 다음 commit()에서 제외"""
+        self.removed_sources.add(source)
+
+    def add(self, document: Dict):
+        """검색 인덱스 문서(content_vector 포함)를 저장소에 추가"""
+        vector = normalize(np.asarray(document["content_vector"], dtype=np.float32))
+        if vector.shape[0] != self.dimensions:
+            raise ValueError(f"벡터 차원({vector.shape[0]})이 {self.dimensions}이 아닙니다.")
+        self._vector_file.write(vector.tobytes())
+        metadata = {field: document.get(field) for field in METADATA_FIELDS}
+        self._metadata_file.write(json.dumps(metadata, ensure_ascii=False) + "\n")
+        self.added += 1
+
+    def _load_existing(self):
+        """남길 기존 청크의 (벡터, 메타데이터, 행 번호) - 차원이 다르면 모두 버림"""
+        info_path = self.path / INFO_FILE
+        if not info_path.exists():
+            return None, [], []
+        with open(info_path, "r", encoding="utf-8") as f:
+            if json.load(f).get("dimensions") != self.dimensions:
+                return None, [], []
+        vectors = np.load(self.path / VECTORS_FILE, mmap_mode="r")
+        keep_metadata, keep_rows = [], []
+        with open(self.path / METADATA_FILE, "r", encoding="utf-8") as f:
+            for row, line in enumerate(f):
+                metadata = json.loads(line)
+                if metadata.get("source") not in self.removed_sources:
+                    keep_metadata.append(metadata)
+                    keep_rows.append(row)
+        return vectors, keep_metadata, keep_rows
+
+    def commit(self, ann_threshold: int = DEFAULT_ANN_THRESHOLD,
+               block_rows: int = 4096) -> Dict:
+        """기존 청크와 새 청크를 합쳐 저장소 교체
+
+        Returns:
+            dict: 전체 청크 수, 추가/유지 청크 수, ANN 인덱스 생성 여부
+        """
+        self._vector_file.close()
+        self._metadata_file.close()
+
+        old_vectors, keep_metadata, keep_rows = self._load_existing()
+        staged = np.memmap(
+            self.staging_path / "vectors.f32", dtype=np.float32, mode="r",
+            shape=(self.added, self.dimensions),
+        ) if self.added else np.empty((0, self.dimensions), dtype=np.float32)
+        total = len(keep_rows) + self.added
+
+        build_path = Path(f"{self.path}.building")
+        if build_path.exists():
+            shutil.rmtree(build_path)
+        build_path.mkdir(parents=True)
+
+        # 벡터: 유지할 기존 행 → 새 행 순서로 블록 단위 복사
+        out = np.lib.format.open_memmap(
+            build_path / VECTORS_FILE, mode="w+", dtype=np.float32,
+            shape=(total, self.dimensions),
+        )
+        for start in range(0, len(keep_rows), block_rows):
+            rows = keep_rows[start:start + block_rows]
+            out[start:start + len(rows)] = old_vectors[rows]
+        for start in range(0, self.added, block_rows):
+            end = min(start + block_rows, self.added)
+            out[len(keep_rows) + start:len(keep_rows) + end] = staged[start:end]
+        out.flush()
+
+        with open(build_path / METADATA_FILE, "w", encoding="utf-8") as f:
+            for metadata in keep_metadata:
+                f.write(json.dumps(metadata, ensure_ascii=False) + "\n")
+            with open(self.staging_path / METADATA_FILE, "r", encoding="utf-8") as staged_metadata:
+                shutil.copyfileobj(staged_metadata, f)
+
+        # BM25 역색인: 최종 메타데이터 순서(= 벡터 행 번호)로 다시 생성
+        with open(build_path / METADATA_FILE, "r", encoding="utf-8") as f:
+            keyword_stats = build_keyword_index(
+                (json.loads(line).get("content") or "" for line in f),
+                build_path / KEYWORD_INDEX_DIR,
+            )
+
+        use_ann = hnswlib is not None and total >= ann_threshold
+        if use_ann:
+            ann = hnswlib.Index(space="ip", dim=self.dimensions)
+            ann.init_index(max_elements=total, ef_construction=200, M=16)
+            for start in range(0, total, block_rows):
+                end = min(start + block_rows, total)
+                ann.add_items(np.asarray(out[start:end]), np.arange(start, end))
+            ann.save_index(str(build_path / ANN_INDEX_FILE))
+        del out, staged, old_vectors
+
+        with open(build_path / INFO_FILE, "w", encoding="utf-8") as f:
+            json.dump({"dimensions": self.dimensions, "count": total, "ann": use_ann}, f)
+
+        # 완성된 저장소로 교체 (검색 중인 프로세스는 이전 파일을 계속 사용)
+        old_path = Path(f"{self.path}.old")
+        if old_path.exists():
+            shutil.rmtree(old_path)
+        if self.path.exists():
+            os.replace(self.path, old_path)
+        os.replace(build_path, self.path)
+        shutil.rmtree(old_path, ignore_errors=True)
+        shutil.rmtree(self.staging_path, ignore_errors=True)
+
+        return {
+            "count": total,
+            "added": self.added,
+            "kept": len(keep_rows),
+            "ann": use_ann,
+            "terms": keyword_stats["terms"],
+        }
@@ -5,24 +5,76 @@ Azure OpenAI RAG Chatbot - Streamlit 웹 인터페이스
 AI를 활용한 기술문서 자동 요약 및 오류 분석
 """
 
-import os
+import time
+import uuid
 import streamlit as st
 from datetime import datetime
-from dotenv import load_dotenv
-from openai import AzureOpenAI
 
-# 환경 변수 로드
-load_dotenv()
+# 무거운 모듈(openai, numpy)과 자원은 app_startup에서 처음 사용할 때 한 번만 로드
+from app_startup import (
+    get_answer_cache,
+    get_chat_client,
+    get_config,
+    get_error_code_index,
+    get_local_store,
+    get_rag_parameters,
+    start_warmup,
+    startup_timer,
+)
+from conversation_history import (
+    compact_messages,
+    count_message_tokens,
+    history_stats,
+    make_summarizer,
+)
+from error_codes import (
+    create_pinned_message,
+    format_answer,
+    is_code_lookup,
+    to_citations,
+)
+from http_transport import openai_timeout
+from search_filters import (
+    DOC_TYPE_LABELS,
+    build_filter_predicate,
+    build_search_filter,
+    infer_doc_types,
+)
+from telemetry import span
+from usage_log import (
+    empty_usage,
+    format_tokens,
+    get_usage_log,
+    measure_usage,
+    stream_usage_options,
+    sum_usage,
+)
+
+# 설정 (.env와 환경 변수를 프로세스당 한 번 읽은 값, 다시 실행해도 그대로 사용)
+CONFIG = get_config()
 
 # Azure 설정
-AZURE_SEARCH_ENDPOINT = os.getenv("AZURE_SEARCH_ENDPOINT")
-AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
-AZURE_DEPLOYMENT_MODEL = os.getenv("AZURE_DEPLOYMENT_MODEL")
-AZURE_DEPLOYMENT_EMBEDDING_NAME = os.getenv("AZURE_DEPLOYMENT_EMBEDDING_NAME")
-AZURE_SEARCH_API_KEY = os.getenv("AZURE_SEARCH_API_KEY")
-AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
-INDEX_NAME = os.getenv("AZURE_SEARCH_INDEX")
-API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION")
+AZURE_DEPLOYMENT_MODEL = CONFIG.deployment_model
+AZURE_DEPLOYMENT_EMBEDDING_NAME = CONFIG.embedding_deployment
+INDEX_NAME = CONFIG.index_name
+API_VERSION = CONFIG.api_version
+# 임베딩 차원 수 (인덱싱 때와 같은 값이어야 함, 비워 두면 모델 기본 차원)
+EMBEDDING_DIMENSIONS = CONFIG.embedding_dimensions
+# 검색 방식: vector / simple(키워드) / semantic / vector_simple_hybrid / vector_semantic_hybrid
+# (하이브리드는 키워드와 벡터 결과를 RRF로 결합 - 에러 코드 등 정확한 용어 질의에 유리)
+SEARCH_QUERY_TYPE = CONFIG.search_query_type
+
+# 검색 백엔드: azure_search (On Your Data) 또는 local (로컬 벡터 저장소, 프로세스 내 검색)
+RETRIEVAL_BACKEND = CONFIG.retrieval_backend
+LOCAL_VECTOR_STORE_PATH = CONFIG.local_vector_store_path
+
+# 의미 기반 답변 캐시 (세션 간 공유): 비슷한 질문은 검색/GPT 호출 없이 저장된 답변 사용
+ANSWER_CACHE_ENABLED = CONFIG.answer_cache_enabled
+ANSWER_CACHE_THRESHOLD = CONFIG.answer_cache_threshold
+
+# 에러 코드 색인 (02_upload_and_index.py가 에러 참조 안내서로 생성)
+# 코드만 묻는 질문은 표로 바로 답하고, 그 밖의 질문은 해당 항목을 근거로 고정
+ERROR_CODE_LOOKUP = CONFIG.error_code_lookup
 
 
 # 페이지 설정
@@ -34,16 +86,6 @@ st.set_page_config(
 )
 
 
-@st.cache_resource
-def get_chat_client():
-    """Azure OpenAI 클라이언트 생성 (캐시)"""
-    return AzureOpenAI(
-        api_key=AZURE_OPENAI_API_KEY,
-        azure_endpoint=AZURE_OPENAI_ENDPOINT,
-        api_version=API_VERSION,
-    )
-
-
 def create_system_message():
     """시스템 메시지 생성"""
     return {
@@ -60,33 +102,94 @@ def create_system_message():
     }
 
 
-def create_rag_parameters(top_n=5, strictness=3):
-    """RAG 파라미터 생성"""
+def create_rag_parameters(top_n=5, strictness=3, search_filter=None):
+    """RAG 파라미터 (조합별로 프로세스당 한 번 생성해 재사용 - 수정하지 말 것)
+
+    Args:
+        top_n: 검색할 문서 수
+        strictness: 관련성 엄격도
+        search_filter: OData 필터 (예: "doc_type eq 'jdbc'"), None이면 전체 검색
+    """
+    return get_rag_parameters(top_n, strictness, search_filter)
+
+
+def embed_question(chat_client, question):
+    """질문 임베딩 (인덱스와 같은 배포/차원)"""
+    options = {"dimensions": EMBEDDING_DIMENSIONS} if EMBEDDING_DIMENSIONS else {}
+    response = chat_client.embeddings.create(
+        model=AZURE_DEPLOYMENT_EMBEDDING_NAME, input=[question], timeout=openai_timeout("embedding"), **options
+    )
+    return response.data[0].embedding
+
+
+def retrieve_local(chat_client, question, top_n=5, doc_types=None, query_vector=None):
+    """로컬 벡터 저장소에서 관련 청크 검색 (On Your Data 인용과 같은 형식으로 반환)
+
+    Args:
+        query_vector: 이미 계산한 질문 임베딩 (없으면 필요할 때만 생성)
+    """
+    # 키워드 검색만 할 때는 질문 임베딩을 만들지 않음
+    if query_vector is None and SEARCH_QUERY_TYPE not in ("simple", "semantic"):
+        query_vector = embed_question(chat_client, question)
+    hits = get_local_store().search(
+        query_vector,
+        top_k=top_n,
+        predicate=build_filter_predicate(doc_types=doc_types),
+        query_text=question,
+        query_type=SEARCH_QUERY_TYPE,
+    )
+    return [
+        {
+            "title": hit["title"],
+            "content": hit["content"],
+            "filepath": hit["source"],
+            "url": "",
+            "chunk_id": str(hit["chunk_id"]),
+            "section": hit.get("section") or "",
+            "page_start": hit.get("page_start"),
+            "page_end": hit.get("page_end"),
+        }
+        for hit in hits
+    ]
+
+
+def create_context_message(citations):
+    """검색된 청크를 근거 문서로 전달하는 시스템 메시지"""
+    documents = []
+    for i, citation in enumerate(citations, 1):
+        location = f"p.{citation['page_start']}-{citation['page_end']}"
+        if citation["section"]:
+            location += f", {citation['section']}"
+        documents.append(f"[doc{i}] {citation['title']} ({location})\n{citation['content']}")
     return {
-        "data_sources": [
-            {
-                "type": "azure_search",
-                "parameters": {
-                    "endpoint": AZURE_SEARCH_ENDPOINT,
-                    "index_name": INDEX_NAME,
-                    "authentication": {
-                        "type": "api_key",
-                        "key": AZURE_SEARCH_API_KEY,
-                    },
-                    "query_type": "vector",
-                    "embedding_dependency": {
-                        "type": "deployment_name",
-                        "deployment_name": AZURE_DEPLOYMENT_EMBEDDING_NAME,
-                    },
-                    "top_n_documents": top_n,
-                    "strictness": strictness,
-                },
-            }
-        ],
+        "role": "system",
+        "content": (
+            "다음 검색된 문서만 근거로 답변하고, 참고한 문서를 [doc1]처럼 표시하세요.\n\n"
+            + "\n\n".join(documents)
+        ),
     }
 
 
-def get_answer(
+def log_usage(result, session_id=None, **settings):
+    """답변 하나의 사용량을 세션 간 공유 로그에 기록 (USAGE_LOG_ENABLED=false면 생략)"""
+    usage_log = get_usage_log()
+    if usage_log is None:
+        return
+    usage_log.append({
+        "session": session_id,
+        "source": result["source"],
+        "model": AZURE_DEPLOYMENT_MODEL,
+        "backend": RETRIEVAL_BACKEND,
+        "query_type": SEARCH_QUERY_TYPE,
+        **settings,
+        **result["usage"],
+        "citations": len(result["citations"]),
+        "ttft": round(result["ttft"], 3) if result["ttft"] is not None else None,
+        "elapsed": round(result["elapsed"], 3),
+    })
+
+
+def stream_answer(
     chat_client,
     messages,
     question,
@@ -94,42 +197,170 @@ def get_answer(
     max_tokens=1000,
     top_n=5,
     strictness=3,
+    doc_types=None,
+    result=None,
+    session_id=None,
 ):
-    """질문에 대한 답변 생성"""
-    # 사용자 메시지 추가
-    user_message = {"role": "user", "content": question}
-    messages.append(user_message)
-
-    # RAG 파라미터
-    rag_params = create_rag_parameters(top_n, strictness)
-
-    try:
-        response = chat_client.chat.completions.create(
+    """질문에 대한 답변을 생성하며 도착하는 토큰을 차례로 반환 (답변 캐시 우선)
+
+    인용 정보는 On Your Data 스트림의 context 델타에서 모아 끝난 뒤 result에 담는다.
+
+    Args:
+        doc_types: 검색할 문서 종류 (None이면 전체 검색)
+        result: 생성이 끝나면 answer, citations, ttft(첫 토큰까지 초), elapsed(전체 초),
+            cached(캐시 적중 여부), source(error_code/cache/generate),
+            usage(토큰 사용량, usage_log.measure_usage)가 채워지는 dict
+        session_id: 사용량 로그에 함께 기록할 세션 ID
+
+    Yields:
+        str: 답변 조각
+    """
+    result = result if result is not None else {}
+    started = time.perf_counter()
+    with span("answer", backend=RETRIEVAL_BACKEND, query_type=SEARCH_QUERY_TYPE) as answer_span:
+
+        # 사용자 메시지 추가
+        user_message = {"role": "user", "content": question}
+        messages.append(user_message)
+
+        # 검색/생성 파라미터가 같은 답변끼리만 재사용
+        from answer_cache import make_partition_key
+
+        # 이전 대화(시스템 메시지 이후의 히스토리/요약)가 있으면 후속 질문("더 자세히" 등)이
+        # 다른 대화의 답변과 섞이지 않도록 캐시를 조회/저장하지 않음
+        has_history = len(messages) > 2
+        cache = get_answer_cache() if ANSWER_CACHE_ENABLED and not has_history else None
+        partition = make_partition_key(
+            backend=RETRIEVAL_BACKEND,
+            index=LOCAL_VECTOR_STORE_PATH if RETRIEVAL_BACKEND == "local" else INDEX_NAME,
             model=AZURE_DEPLOYMENT_MODEL,
-            messages=messages,
+            query_type=SEARCH_QUERY_TYPE,
             temperature=temperature,
             max_tokens=max_tokens,
-            extra_body=rag_params,
+            top_n=top_n,
+            strictness=strictness,
+            doc_types=sorted(doc_types or []),
         )
 
-        # 답변 추출
-        answer = response.choices[0].message.content
+        # 0. 에러 코드 색인 조회 (코드만 묻는 질문은 검색/GPT 호출 없이 표로 답변)
+        error_entries = get_error_code_index().find(question) if ERROR_CODE_LOOKUP else []
+        if error_entries and is_code_lookup(question):
+            answer = format_answer(error_entries)
+            messages.append({"role": "assistant", "content": answer})
+            elapsed = time.perf_counter() - started
+            result.update(answer=answer, citations=to_citations(error_entries),
+                          ttft=elapsed, elapsed=elapsed, cached=False,
+                          source="error_code", usage=empty_usage())
+            answer_span.set(source="error_code")
+            log_usage(result, session_id, top_n=top_n, strictness=strictness,
+                      max_tokens=max_tokens, temperature=temperature)
+            yield answer
+            return
+        # 질문에 나온 에러 항목은 검색 결과와 별도로 근거에 고정
+        pinned = [create_pinned_message(error_entries)] if error_entries else []
+
+        # 1. 답변 캐시 조회 (같은 질문 → 임베딩 없이, 비슷한 질문 → 임베딩 유사도)
+        question_vector = None
+        if cache is not None:
+            cached = cache.lookup_exact(question, partition)
+            if cached is None:
+                with span("embed", items=1):
+                    question_vector = embed_question(chat_client, question)
+                cached = cache.lookup(question_vector, partition)
+            if cached is not None:
+                messages.append({"role": "assistant", "content": cached["answer"]})
+                elapsed = time.perf_counter() - started
+                result.update(answer=cached["answer"], citations=cached["citations"],
+                              ttft=elapsed, elapsed=elapsed, cached=True,
+                              source="cache", usage=empty_usage())
+                answer_span.set(source="cache")
+                log_usage(result, session_id, top_n=top_n, strictness=strictness,
+                          max_tokens=max_tokens, temperature=temperature)
+                yield cached["answer"]
+                return
+
+        # 2. 검색 + 답변 생성 (스트리밍)
+        if RETRIEVAL_BACKEND == "local":
+            # 로컬 검색 결과를 근거 문서로 넣어 일반 채팅 완성 호출 (대화 기록에는 남기지 않음)
+            with span("retrieve", top_n=top_n) as retrieve_span:
+                citations = retrieve_local(
+                    chat_client, question, top_n, doc_types, query_vector=question_vector
+                )
+                retrieve_span.set(documents=len(citations))
+            context_messages = [create_context_message(citations)] + pinned
+            request_messages = messages[:-1] + context_messages + [user_message]
+            options = {}
+        else:
+            # RAG 파라미터 (On Your Data는 검색이 생성 요청 안에서 이루어지므로 generate 스팬에 포함)
+            search_filter = build_search_filter(doc_types=doc_types)
+            request_messages = messages[:-1] + pinned + [user_message]
+            options = {"extra_body": create_rag_parameters(top_n, strictness, search_filter)}
+            context_messages = None  # 검색 문서는 서버가 넣으므로 사용량/인용으로 추정
+            citations = []
+
+        parts = []
+        ttft = None
+        usage = None
+        with span("generate", model=AZURE_DEPLOYMENT_MODEL) as generate_span:
+            response = chat_client.chat.completions.create(
+                model=AZURE_DEPLOYMENT_MODEL,
+                messages=request_messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True,
+                **stream_usage_options(),
+                **options,
+            )
+            for chunk in response:
+                # 사용량은 마지막 청크(choices가 빈 청크)에 담겨 옴
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:  # 사용량/콘텐츠 필터 결과 등 choices가 빈 청크
+                    continue
+                delta = chunk.choices[0].delta
+
+                # 인용 정보 추출 (On Your Data - 보통 첫 델타의 context에 담겨 옴)
+                context = getattr(delta, "context", None)
+                if context and "citations" in context:
+                    citations = context["citations"]
+
+                if delta.content:
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                        generate_span.set(ttft_ms=round(generate_span.duration * 1000, 1))
+                    parts.append(delta.content)
+                    yield delta.content
+
+            # 스트림에 사용량이 없으면 토크나이저로 추정
+            token_usage = measure_usage(
+                request_messages,
+                "".join(parts),
+                history_messages=messages[1:-1],
+                context_tokens=count_message_tokens(context_messages) if context_messages else None,
+                citations=citations,
+                usage=usage,
+            )
+            generate_span.set(
+                prompt_tokens=token_usage["prompt_tokens"],
+                completion_tokens=token_usage["completion_tokens"],
+                citations=len(citations),
+            )
+
+        answer = "".join(parts)
+        # 고정한 에러 항목도 참고 문서로 표시 ([docN] 번호가 바뀌지 않도록 뒤에 추가)
+        citations = citations + to_citations(error_entries)
 
         # 어시스턴트 메시지 저장
-        assistant_message = {"role": "assistant", "content": answer}
-        messages.append(assistant_message)
-
-        # 인용 정보 추출
-        citations = []
-        if hasattr(response.choices[0].message, "context"):
-            context = response.choices[0].message.context
-            if context and "citations" in context:
-                citations = context["citations"]
+        messages.append({"role": "assistant", "content": answer})
 
-        return answer, citations, None
+        if cache is not None and answer:
+            cache.store(question, question_vector, partition, answer, citations)
 
-    except Exception as e:
-        return None, [], str(e)
+        result.update(answer=answer, citations=citations, ttft=ttft,
+                      elapsed=time.perf_counter() - started, cached=False,
+                      source="generate", usage=token_usage)
+        answer_span.set(source="generate", citations=len(citations))
+        log_usage(result, session_id, top_n=top_n, strictness=strictness,
+                  max_tokens=max_tokens, temperature=temperature)
 
 
 def initialize_session_state():
@@ -140,13 +371,14 @@ def initialize_session_state():
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
 
-    if "chat_client" not in st.session_state:
-        st.session_state.chat_client = get_chat_client()
-
     # 메시지 ID 카운터 추가
     if "message_counter" not in st.session_state:
         st.session_state.message_counter = 0
 
+    # 사용량 로그에서 세션별로 묶기 위한 ID
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex[:12]
+
 
 def reset_conversation():
     """대화 초기화"""
@@ -174,39 +406,68 @@ def remove_duplicate_citations(citations):
     return unique_citations
 
 
+def display_message_details(role, timestamp=None, citations=None, ttft=None, usage=None):
+    """메시지 아래 타임스탬프/첫 토큰 시간/토큰 사용량/참고 문서 표시 (st.chat_message 안에서 호출)"""
+    # 타임스탬프 표시 (assistant는 첫 토큰까지 걸린 시간과 토큰 사용량 함께 표시)
+    if timestamp:
+        caption = f"🕐 {timestamp}"
+        if role == "assistant" and ttft is not None:
+            caption += f" · ⚡ 첫 토큰 {ttft:.2f}초"
+        if role == "assistant" and usage and usage["prompt_tokens"]:
+            caption += f" · 🧮 {format_tokens(usage)}"
+        st.caption(caption)
+
+    # 인용 정보 표시 (assistant 메시지에만, 중복 제거, 항상 닫힌 상태)
+    # 중요: user 메시지에는 citations를 표시하지 않음!
+    if role == "assistant" and citations:
+        unique_citations = remove_duplicate_citations(citations)
+        with st.expander(
+            f"📚 참고 문서 ({len(unique_citations)}개)",
+            expanded=False,  # 항상 닫힌 상태로 표시
+        ):
+            for i, citation in enumerate(unique_citations, 1):
+                title = citation.get("title", "제목 없음")
+                url = citation.get("url", "")
+                st.markdown(f"**{i}. {title}**")
+                if url:
+                    st.markdown(f"   🔗 [{url}]({url})")
+
+
 def display_chat_message(
-    role, content, timestamp=None, citations=None, message_id=None
+    role, content, timestamp=None, citations=None, message_id=None, ttft=None, usage=None
 ):
     """채팅 메시지 표시"""
     avatar = "🧑" if role == "user" else "🤖"
 
     with st.chat_message(role, avatar=avatar):
         st.markdown(content)
-
-        # 타임스탬프 표시
-        if timestamp:
-            st.caption(f"🕐 {timestamp}")
-
-        # 인용 정보 표시 (assistant 메시지에만, 중복 제거, 항상 닫힌 상태)
-        # 중요: user 메시지에는 citations를 표시하지 않음!
-        if role == "assistant" and citations:
-            unique_citations = remove_duplicate_citations(citations)
-            with st.expander(
-                f"📚 참고 문서 ({len(unique_citations)}개)",
-                expanded=False,  # 항상 닫힌 상태로 표시
-            ):
-                for i, citation in enumerate(unique_citations, 1):
-                    title = citation.get("title", "제목 없음")
-                    url = citation.get("url", "")
-                    st.markdown(f"**{i}. {title}**")
-                    if url:
-                        st.markdown(f"   🔗 [{url}]({url})")
+        display_message_details(role, timestamp, citations, ttft, usage)
+
+
+def display_usage_totals(chat_history):
+    """이 세션의 토큰 사용량 합계 (max_tokens/top_n/히스토리 길이 조정용)"""
+    totals = sum_usage(chat.get("usage") for chat in chat_history if chat["role"] == "assistant")
+    st.subheader("🧮 토큰 사용량 (이 세션)")
+    col1, col2 = st.columns(2)
+    col1.metric("입력", f"{totals['prompt_tokens']:,}")
+    col2.metric("출력", f"{totals['completion_tokens']:,}")
+    answers = max(totals["answers"], 1)
+    caption = (
+        f"GPT 호출 {totals['answers']}회 · 답변당 검색 문서 {totals['context_tokens'] // answers:,} / "
+        f"히스토리 {totals['history_tokens'] // answers:,} / 출력 {totals['completion_tokens'] // answers:,} 토큰"
+    )
+    if totals["cost"]:
+        caption += f" · 예상 비용 ${totals['cost']:.4f}"
+    st.caption(caption)
 
 
 def main():
     """메인 함수"""
+    render_started = time.perf_counter()
     # 세션 상태 초기화
     initialize_session_state()
+    # 첫 화면은 바로 그리고, 클라이언트/색인/연결 풀은 백그라운드에서 준비 (프로세스당 한 번)
+    start_warmup()
 
     # 헤더
     st.title("🤖 안녕하세요. 무엇을 도와드릴까요?")
@@ -257,6 +518,40 @@ def main():
             help="높을수록 관련성이 높은 문서만 사용",
         )
 
+        doc_types = st.multiselect(
+            "문서 종류",
+            options=list(DOC_TYPE_LABELS),
+            format_func=lambda doc_type: DOC_TYPE_LABELS[doc_type],
+            help="선택한 문서에서만 검색합니다 (비우면 전체 검색)",
+        )
+
+        auto_filter = st.checkbox(
+            "질문으로 문서 종류 자동 선택",
+            value=True,
+            help="에러 코드가 있으면 에러 참조 안내서, JDBC 질문이면 JDBC 안내서에서만 검색",
+        )
+
+        # 답변 캐시 통계
+        if ANSWER_CACHE_ENABLED:
+            st.divider()
+            st.subheader("⚡ 답변 캐시")
+            cache_stats = get_answer_cache().stats()
+            col1, col2 = st.columns(2)
+            col1.metric("적중", f"{cache_stats['hits']}", help="유사 질문 적중 포함")
+            col2.metric("미스", f"{cache_stats['misses']}")
+            st.caption(
+                f"적중률 {cache_stats['hit_rate']:.0%} · 유사 질문 적중 {cache_stats['semantic_hits']}회 · "
+                f"저장된 답변 {cache_stats['entries']}개 (유사도 ≥ {ANSWER_CACHE_THRESHOLD})"
+            )
+            if st.button("🧹 캐시 비우기", use_container_width=True):
+                get_answer_cache().clear()
+                st.rerun()
+
+        st.divider()
+
+        # 토큰 사용량 (이번 답변까지 반영되도록 화면 끝에서 채움)
+        usage_container = st.container()
+
         st.divider()
 
         # 시스템 정보
@@ -265,7 +560,12 @@ def main():
             st.text(f"GPT Model: {AZURE_DEPLOYMENT_MODEL}")
             st.text(f"Embedding: {AZURE_DEPLOYMENT_EMBEDDING_NAME}")
             st.text(f"Search Index: {INDEX_NAME}")
+            st.text(f"Retrieval: {RETRIEVAL_BACKEND} ({SEARCH_QUERY_TYPE})")
+            if ERROR_CODE_LOOKUP:
+                st.text(f"Error Codes: {len(get_error_code_index()):,}")
             st.text(f"API Version: {API_VERSION}")
+            # 시작 시간 보고 (워밍업이 끝나면 "준비 완료" 포함)
+            st.caption("시작 시간: " + " · ".join(startup_timer.report()))
 
         st.divider()
 
@@ -281,10 +581,17 @@ def main():
 
         with col2:
             if st.button("📊 통계", use_container_width=True):
-                msg_count = len(
-                    [m for m in st.session_state.messages if m["role"] != "system"]
+                msg_count = len(st.session_state.chat_history)
+                stats = history_stats(st.session_state.messages)
+                summary = (
+                    f" · 이전 대화 요약 약 {stats['summary_tokens']:,} 토큰"
+                    if stats["summary_tokens"] else ""
+                )
+                st.info(
+                    f"총 {msg_count}개 메시지\n\n"
+                    f"요청에 포함되는 히스토리: 최근 {stats['turns']}턴, "
+                    f"약 {stats['tokens']:,} 토큰{summary}"
                 )
-                st.info(f"총 {msg_count}개 메시지")
 
         # 대화 내보내기
         if st.session_state.chat_history:
@@ -318,6 +625,8 @@ def main():
             timestamp=chat.get("timestamp"),
             citations=chat_citations,  # user는 항상 None, assistant만 citations
             message_id=chat.get("message_id", i),
+            ttft=chat.get("ttft"),
+            usage=chat.get("usage"),
         )
 
     # 사용자 입력
@@ -343,17 +652,42 @@ def main():
             }
         )
 
-        # 답변 생성
-        with st.spinner("🤔 답변 생성 중..."):
-            answer, citations, error = get_answer(
-                st.session_state.chat_client,
-                st.session_state.messages,
-                prompt,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                top_n=top_n,
-                strictness=strictness,
-            )
+        # 검색 범위 필터
+        search_doc_types = doc_types or (infer_doc_types(prompt) if auto_filter else [])
+
+        # 답변 생성 (도착하는 토큰을 바로 표시, 인용은 끝난 뒤 표시)
+        result = {}
+        error = None
+        with st.chat_message("assistant", avatar="🤖"):
+            placeholder = st.empty()
+            placeholder.markdown("🤔 답변 생성 중...")
+            answer = ""
+            try:
+                for piece in stream_answer(
+                    get_chat_client(),
+                    st.session_state.messages,
+                    prompt,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    top_n=top_n,
+                    strictness=strictness,
+                    doc_types=search_doc_types,
+                    result=result,
+                    session_id=st.session_state.session_id,
+                ):
+                    answer += piece
+                    placeholder.markdown(answer + "▌")
+                placeholder.markdown(answer)
+            except Exception as e:
+                error = str(e)
+                placeholder.empty()
+
+            if not error:
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                # assistant 메시지만 citations 포함
+                display_message_details(
+                    "assistant", timestamp, result["citations"], result["ttft"], result["usage"]
+                )
 
         # 답변 표시
         if error:
@@ -363,26 +697,35 @@ def main():
             st.session_state.message_counter += 1
             assistant_message_id = st.session_state.message_counter
 
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            # assistant 메시지만 citations 포함
-            display_chat_message(
-                "assistant", answer, timestamp, citations, assistant_message_id
-            )
-
             # 채팅 히스토리에 추가 (citations 포함!)
             st.session_state.chat_history.append(
                 {
                     "role": "assistant",
-                    "content": answer,
+                    "content": result["answer"],
                     "timestamp": timestamp,
-                    "citations": citations,  # assistant만 citations 있음!
+                    "citations": result["citations"],  # assistant만 citations 있음!
                     "message_id": assistant_message_id,
+                    "ttft": result["ttft"],  # 첫 토큰까지 걸린 시간(초)
+                    "elapsed": result["elapsed"],  # 전체 생성 시간(초)
+                    "cached": result["cached"],
+                    "source": result["source"],  # error_code / cache / generate
+                    "usage": result["usage"],  # 입력/출력/검색 문서/히스토리 토큰 수
                 }
             )
 
+            # 오래된 턴은 요약으로 접어 다음 요청의 히스토리 토큰을 일정하게 유지
+            compact_messages(
+                st.session_state.messages,
+                make_summarizer(get_chat_client(), AZURE_DEPLOYMENT_MODEL),
+            )
+
+    with usage_container:
+        display_usage_totals(st.session_state.chat_history)
+
     # 빈 공간 (스크롤을 위해)
     st.write("")
     st.write("")
+    startup_timer.record("first page render", time.perf_counter() - render_started)
 
     # 푸터
     st.divider()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF 텍스트 병렬 추출
+페이지 범위를 나누어 프로세스 풀에서 추출하고, 페이지 번호와 함께 순서대로 반환합니다.
+"""
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import PyPDF2
+
+# 기본 프로세스 수: CPU 코어 수
+DEFAULT_WORKERS = os.cpu_count() or 1
+# 작업 하나가 맡는 페이지 수 (너무 작으면 프로세스 간 통신 비용이 커짐)
+DEFAULT_PAGES_PER_TASK = 25
+# 작업 프로세스 시작 방식: 인덱서는 여러 스레드가 도는 중에 풀을 만들므로, 다른 스레드가 잡은 잠금을
+# 복사해 멈출 수 있는 fork 대신 forkserver(지원하지 않는 플랫폼은 spawn) 사용
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def get_page_count(pdf_path: str) -> int:
+    """PDF 페이지 수"""
+    return len(PyPDF2.PdfReader(pdf_path).pages)
+
+
+def extract_page_range(pdf_path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """[start, end) 범위 페이지의 텍스트 추출 (페이지 번호는 1부터)
+
+    프로세스 풀에서 호출되므로 모듈 최상위 함수로 둔다.
+    """
+    reader = PyPDF2.PdfReader(pdf_path)
+    pages = []
+    for page_index in range(start, end):
+        pages.append((page_index + 1, reader.pages[page_index].extract_text() or ""))
+    return pages
+
+
+def page_ranges(total_pages: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    """전체 페이지를 작업 단위 범위로 분할"""
+    pages_per_task = max(1, pages_per_task)
+    return [
+        (start, min(start + pages_per_task, total_pages))
+        for start in range(0, total_pages, pages_per_task)
+    ]
+
+
+def iter_pages(
+    pdf_path: str,
+    workers: int = DEFAULT_WORKERS,
+    pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    total_pages: Optional[int] = None,
+) -> Iterator[Tuple[int, str]]:
+    """PDF 페이지를 (페이지 번호, 텍스트) 순서대로 생성
+
+    Args:
+        pdf_path: PDF 파일 경로
+        workers: 프로세스 수 (1이면 현재 프로세스에서 순차 처리)
+        pages_per_task: 작업 하나가 맡는 페이지 수
+        on_progress: (완료 페이지 수, 전체 페이지 수) 콜백
+        total_pages: 호출자가 이미 센 페이지 수 (None이면 PDF를 읽어 계산)
+    """
+    if total_pages is None:
+        total_pages = get_page_count(pdf_path)
+    ranges = page_ranges(total_pages, pages_per_task)
+    done = 0
+
+    if workers <= 1 or len(ranges) <= 1:
+        for start, end in ranges:
+            for page in extract_page_range(pdf_path, start, end):
+                yield page
+            done = end
+            if on_progress:
+                on_progress(done, total_pages)
+        return
+
+    workers = min(workers, len(ranges))
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context(START_METHOD)
+    ) as executor:
+        # 진행 중인 작업을 프로세스 수의 2배로 제한하여, 소비자가 느리면
+        # 추출도 멈추도록 한다 (메모리에 쌓이는 페이지 수 제한)
+        pending = deque()
+        next_range = 0
+        while pending or next_range < len(ranges):
+            while next_range < len(ranges) and len(pending) < workers * 2:
+                start, end = ranges[next_range]
+                pending.append(executor.submit(extract_page_range, pdf_path, start, end))
+                next_range += 1
+            # 제출 순서대로 꺼내므로 페이지 순서가 유지된다
+            pages = pending.popleft().result()
+            for page in pages:
+                yield page
+            done += len(pages)
+            if on_progress:
+                on_progress(done, total_pages)
+
+
+def extract_pages(pdf_path: str, **kwargs) -> List[Tuple[int, str]]:
+    """PDF 전체 페이지를 (페이지 번호, 텍스트) 목록으로 추출"""
+    return list(iter_pages(pdf_path, **kwargs))
+
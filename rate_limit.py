@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Azure API 호출용 동시성 제한 및 재시도(backoff) 유틸리티
+429(Too Many Requests) 응답의 Retry-After 헤더를 읽어 모든 작업자가 함께 대기하고,
+스로틀링이 발생하면 동시 요청 수를 줄였다가 성공이 이어지면 다시 늘립니다.
+"""
+
+import random
+import threading
+import time
+from typing import Optional
+
+# Retry-After 계열 헤더와 단위(초 환산 배수)
+RETRY_AFTER_HEADERS = (
+    ("retry-after-ms", 0.001),
+    ("x-ms-retry-after-ms", 0.001),
+    ("retry-after", 1.0),
+)
+
+
+def get_retry_after(error) -> Optional[float]:
+    """예외에 포함된 HTTP 응답의 Retry-After 값(초) 추출 (openai / azure-core 공통)"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    for name, scale in RETRY_AFTER_HEADERS:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def get_status_code(error) -> Optional[int]:
+    """예외에 포함된 HTTP 상태 코드 추출 (openai / azure-core 공통)"""
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        response = getattr(error, "response", None)
+        status_code = getattr(response, "status_code", None)
+    return status_code
+
+
+def is_retryable_error(error) -> bool:
+    """재시도할 가치가 있는 오류인지 판단 (스로틀링, 타임아웃, 연결 오류, 5xx)"""
+    status_code = get_status_code(error)
+    if status_code is None:
+        # 상태 코드가 없으면 연결/타임아웃 계열 오류로 간주
+        return True
+    return status_code in (408, 429) or status_code >= 500
+
+
+def backoff_delay(attempt: int, base_delay: float = 1.0, max_delay: float = 60.0) -> float:
+    """지수 백오프 + full jitter 대기 시간 계산"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+class AdaptiveRateLimiter:
+    """동시 요청 수를 AIMD 방식으로 조절하는 제한기
+
+    - acquire()/release(): 현재 허용 동시 요청 수 이내에서만 요청 진행
+    - on_throttle(delay): 허용 수를 절반으로 줄이고, 모든 작업자를 delay초 동안 대기
+    - on_success(): 연속 성공이 쌓이면 허용 수를 1씩 늘림 (최대 max_concurrency)
+    """
+
+    def __init__(self, max_concurrency: int, increase_after: int = 10):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self.increase_after = increase_after
+        self.throttle_count = 0
+        self._in_flight = 0
+        self._successes = 0
+        self._resume_at = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """요청 슬롯 획득 (스로틀링 대기 시간 포함)"""
+        with self._condition:
+            while True:
+                wait = self._resume_at - time.monotonic()
+                if wait > 0:
+                    self._condition.wait(wait)
+                    continue
+                if self._in_flight < self.limit:
+                    self._in_flight += 1
+                    return
+                self._condition.wait()
+
+    def release(self):
+        """요청 슬롯 반환"""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self):
+        """성공 기록 (필요 시 동시 요청 수 증가)"""
+        with self._condition:
+            self._successes += 1
+            if self._successes >= self.increase_after and self.limit < self.max_concurrency:
+                self.limit += 1
+                self._successes = 0
+                self._condition.notify_all()
+
+    def on_throttle(self, delay: float):
+        """스로틀링 기록: 동시 요청 수 절반 감소 + 전체 대기"""
+        with self._condition:
+            self.throttle_count += 1
+            self.limit = max(1, self.limit // 2)
+            self._successes = 0
+            self._resume_at = max(self._resume_at, time.monotonic() + delay)
+            self._condition.notify_all()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+검색 인덱스 메타데이터(문서 종류, 페이지, 절) 및 OData 필터 생성
+인덱서와 두 챗봇 프런트엔드가 같은 규칙을 쓰도록 한 곳에 모아 둡니다.
+"""
+
+import re
+from typing import Callable, Dict, Iterable, Optional
+
+# 문서 종류: (doc_type 값, 화면 표시 이름, 파일명에 포함된 키워드)
+DOC_TYPES = [
+    ("error_reference", "에러 참조 안내서", ("error-reference", "error_reference", "에러")),
+    ("jdbc", "JDBC 개발자 안내서", ("jdbc",)),
+    ("glossary", "용어 안내서", ("glossary", "용어")),
+    ("migration", "전환 유틸리티 가이드", ("전환", "migration", "migrator")),
+]
+DEFAULT_DOC_TYPE = "manual"
+DOC_TYPE_LABELS = {doc_type: label for doc_type, label, _ in DOC_TYPES}
+
+# 질문에서 에러 코드 감지: "7001 에러", "TBR-7001", "-7001 error", "에러 코드 7001"
+ERROR_CODE_PATTERN = re.compile(
+    r"(?:TBR-?|-)(\d{4,6})\b"
+    r"|\b(\d{4,6})\s*(?:번\s*)?(?:에러|오류|error)"
+    r"|(?:에러|오류|error)\s*(?:코드|code)?\s*[:#]?\s*-?(\d{4,6})\b",
+    re.IGNORECASE,
+)
+
+
+def detect_doc_type(filename: str) -> str:
+    """파일명으로 문서 종류 판별"""
+    name = filename.lower()
+    for doc_type, _, keywords in DOC_TYPES:
+        if any(keyword in name for keyword in keywords):
+            return doc_type
+    return DEFAULT_DOC_TYPE
+
+
+def odata_quote(value: str) -> str:
+    """OData 필터용 문자열 리터럴 (작은따옴표 이스케이프)"""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def build_search_filter(
+    doc_types: Optional[Iterable[str]] = None,
+    sources: Optional[Iterable[str]] = None,
+    page_range: Optional[tuple] = None,
+    section: Optional[str] = None,
+) -> Optional[str]:
+    """Azure AI Search OData 필터 생성 (조건이 없으면 None)
+
+    Args:
+        doc_types: 문서 종류 목록 (예: ["jdbc"])
+        sources: 원본 파일명 목록
+        page_range: (시작, 끝) 페이지 - 범위와 겹치는 청크
+        section: 절 경로에 포함되어야 하는 단어 (예: "제7장")
+    """
+    clauses = []
+    doc_types = [d for d in (doc_types or []) if d]
+    if doc_types:
+        clauses.append(f"search.in(doc_type, {odata_quote(','.join(doc_types))}, ',')")
+    sources = [s for s in (sources or []) if s]
+    if sources:
+        clauses.append(f"search.in(source, {odata_quote('|'.join(sources))}, '|')")
+    if page_range:
+        start, end = page_range
+        clauses.append(f"page_end ge {int(start)} and page_start le {int(end)}")
+    if section:
+        phrase = '"' + section.replace('"', " ") + '"'
+        clauses.append(f"search.ismatch({odata_quote(phrase)}, 'section')")
+    if not clauses:
+        return None
+    return " and ".join(f"({clause})" for clause in clauses)
+
+
+def build_filter_predicate(
+    doc_types: Optional[Iterable[str]] = None,
+    sources: Optional[Iterable[str]] = None,
+    page_range: Optional[tuple] = None,
+    section: Optional[str] = None,
+) -> Optional[Callable[[Dict], bool]]:
+    """build_search_filter와 같은 조건의 파이썬 필터 (로컬 벡터 저장소용, 조건이 없으면 None)"""
+    doc_types = {d for d in (doc_types or []) if d}
+    sources = {s for s in (sources or []) if s}
+    if not (doc_types or sources or page_range or section):
+        return None
+
+    def predicate(metadata: Dict) -> bool:
+        if doc_types and metadata.get("doc_type") not in doc_types:
+            return False
+        if sources and metadata.get("source") not in sources:
+            return False
+        if page_range:
+            start, end = page_range
+            if (metadata.get("page_end") or 0) < start or (metadata.get("page_start") or 0) > end:
+                return False
+        if section and section.lower() not in (metadata.get("section") or "").lower():
+            return False
+        return True
+
+    return predicate
+
+
+def find_error_codes(question: str) -> list:
+    """질문에 포함된 Tibero 에러 코드 목록 (숫자 문자열, 중복 제거)"""
+    codes = []
+    for match in ERROR_CODE_PATTERN.finditer(question):
+        code = next(group for group in match.groups() if group)
+        if code not in codes:
+            codes.append(code)
+    return codes
+
+
+def infer_doc_types(question: str) -> list:
+    """질문 내용으로 검색할 문서 종류 추론 (추론할 수 없으면 빈 목록 = 전체 검색)"""
+    if find_error_codes(question):
+        return ["error_reference"]
+    if re.search(r"jdbc", question, re.IGNORECASE):
+        return ["jdbc"]
+    return []
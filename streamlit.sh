@@ -1,2 +1,20 @@
-pip install -r requirements.txt
-python -m streamlit run mvp_ktds_kyh_001.py --server.port 8000 --server.address 0.0.0.0
\ No newline at end of file
+# 시작 시각 (시작 시간 보고에서 프로세스 시작부터 준비 완료까지 계산)
+export APP_START_TIME=$(date +%s.%N)
+
+# requirements.txt나 Python 버전이 바뀌었거나 패키지가 없을 때만 설치 (재시작/스케일 아웃 시 pip 생략)
+PIP_STAMP_FILE=${PIP_STAMP_FILE:-.cache/requirements.sha256}
+REQUIREMENTS_HASH=$( (cat requirements.txt; python --version) | sha256sum | cut -d' ' -f1)
+if [ "$(cat "$PIP_STAMP_FILE" 2>/dev/null)" = "$REQUIREMENTS_HASH" ] && python -c "
+import importlib.util, sys
+modules = ('streamlit', 'openai', 'dotenv', 'numpy', 'PyPDF2', 'tiktoken', 'azure.search.documents')
+sys.exit(0 if all(importlib.util.find_spec(m) for m in modules) else 1)
+" 2>/dev/null; then
+    echo "requirements.txt 변경 없음 - pip install 생략"
+else
+    pip install --disable-pip-version-check -r requirements.txt \
+        && mkdir -p "$(dirname "$PIP_STAMP_FILE")" \
+        && echo "$REQUIREMENTS_HASH" > "$PIP_STAMP_FILE"
+fi
+
+# 서버가 뜨는 동안 클라이언트/색인/연결 풀을 미리 준비한 뒤 Streamlit 실행 (mvp_ktds_kyh_001.py)
+python app_startup.py --server.port 8000 --server.address 0.0.0.0 --server.headless true
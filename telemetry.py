@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+단계별 실행 시간 추적 및 메트릭 내보내기
+인덱싱(extract, chunk, embed, upload)과 답변(retrieve, generate) 단계를 스팬으로 기록하고,
+단계별 실행 시간 히스토그램과 속성 합계(페이지, 청크, 바이트, 토큰 수 등)를 집계해
+Prometheus 텍스트 형식(/metrics)이나 OTLP JSON 파일로 내보냅니다.
+
+- with span("embed", items=10) as s: ... 처럼 감싸면 같은 스레드/비동기 작업 안에서는
+  부모-자식 관계가 자동으로 이어지고, 작업자 스레드에서는 parent=로 부모 스팬을 지정
+- 단계가 겹쳐 실행되는 파이프라인은 Stopwatch로 단계별 실제 작업 시간을 모아 record_span으로 기록
+- OTLP 파일은 한 줄에 하나의 ExportTraceServiceRequest(JSON)이므로
+  OpenTelemetry Collector의 otlpjsonfile 수신기로 그대로 읽을 수 있음
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Iterator, List, Optional
+
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "true").lower() == "true"
+# Prometheus /metrics 포트 (0이면 끔), OTLP JSON 파일 경로 (비우면 끔)
+TELEMETRY_PROMETHEUS_PORT = int(os.getenv("TELEMETRY_PROMETHEUS_PORT", "0"))
+TELEMETRY_OTLP_FILE = os.getenv("TELEMETRY_OTLP_FILE", "")
+TELEMETRY_SERVICE_NAME = os.getenv("TELEMETRY_SERVICE_NAME", "tibero-rag")
+
+# 히스토그램 구간 (초) - 임베딩 배치 수십 ms부터 대용량 PDF 추출 수 분까지
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# 단계별 최근 실행 시간 (p50/p95/p99 요약용)
+RECENT_SAMPLES = 2048
+# 합계를 카운터로 내보낼 숫자 속성
+COUNTER_ATTRIBUTES = (
+    "pages", "chars", "bytes", "chunks", "items", "documents", "tokens",
+    "prompt_tokens", "completion_tokens", "cached", "retries", "failed", "citations",
+)
+OTLP_FLUSH_SPANS = 100
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """단계 하나의 실행 기록 (이름, 시작/끝 시각, 속성, 부모)"""
+
+    def __init__(self, telemetry: "Telemetry", name: str, parent: Optional["Span"] = None,
+                 attributes: Optional[Dict] = None):
+        self.telemetry = telemetry
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    @property
+    def duration(self) -> float:
+        """실행 시간 (초, 끝나지 않았으면 지금까지)"""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def set(self, **attributes) -> "Span":
+        self.attributes.update(attributes)
+        return self
+
+    def add(self, key: str, amount: float = 1) -> "Span":
+        """숫자 속성 누적 (재시도 횟수 등)"""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+        return self
+
+    def end(self, error: Optional[BaseException] = None, **attributes):
+        """스팬 종료 및 집계 (여러 번 호출해도 한 번만 기록)"""
+        if self.end_ns is not None:
+            return
+        self.attributes.update(attributes)
+        if error is not None:
+            self.error = f"{error.__class__.__name__}: {error}"[:300]
+        self.end_ns = time.time_ns()
+        self.telemetry.finish(self)
+
+
+class _NoopSpan(Span):
+    """추적이 꺼져 있거나 현재 스팬이 없을 때 (호출하는 쪽에서 None 확인 불필요)"""
+
+    def __init__(self):
+        self.name = ""
+        self.parent = None
+        self.trace_id = self.span_id = ""
+        self.attributes = {}
+        self.start_ns = self.end_ns = 0
+        self.error = None
+
+    def set(self, **attributes):
+        return self
+
+    def add(self, key, amount=1):
+        return self
+
+    def end(self, error=None, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Stopwatch:
+    """여러 구간의 실행 시간 합계 (with 블록 또는 timed_iter로 누적)"""
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds += time.perf_counter() - self._started
+        return False
+
+
+def timed_iter(iterable: Iterable, stopwatch: Stopwatch) -> Iterator:
+    """항목을 꺼내는 데 걸린 시간만 stopwatch에 누적 (지연 생성되는 단계의 실제 작업 시간)"""
+    iterator = iter(iterable)
+    while True:
+        with stopwatch:
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+class _StageMetrics:
+    """단계 하나의 히스토그램, 오류 수, 속성 합계"""
+
+    def __init__(self):
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.errors = 0
+        self.totals: Dict[str, float] = {}
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+
+class Telemetry:
+    """스팬 수집기 (스레드 안전) - 단계별 집계, Prometheus 텍스트, OTLP JSON 파일"""
+
+    def __init__(self, enabled: bool = TELEMETRY_ENABLED, otlp_path: str = TELEMETRY_OTLP_FILE,
+                 service_name: str = TELEMETRY_SERVICE_NAME):
+        self.enabled = enabled
+        self.otlp_path = otlp_path
+        self.service_name = service_name
+        self._stages: Dict[str, _StageMetrics] = {}
+        self._otlp_buffer: List[Span] = []
+        self._lock = threading.Lock()
+        self._server = None
+        if enabled and otlp_path:
+            atexit.register(self.flush)
+
+    # ----- 스팬 -----
+    def start_span(self, name: str, parent: Optional[Span] = None, **attributes) -> Span:
+        """스팬 시작 (현재 스팬으로 설정하지 않음 - 끝낼 때 end() 호출)"""
+        if not self.enabled:
+            return NOOP_SPAN
+        if parent is None or parent is NOOP_SPAN:
+            parent = _current_span.get()
+        return Span(self, name, parent, attributes)
+
+    @contextmanager
+    def span(self, name: str, parent: Optional[Span] = None, **attributes) -> Iterator[Span]:
+        """with 블록을 스팬으로 기록하고 블록 안에서는 현재 스팬으로 설정"""
+        span = self.start_span(name, parent, **attributes)
+        if span is NOOP_SPAN:
+            yield span
+            return
+        _current_span.set(span)
+        try:
+            yield span
+        except GeneratorExit:  # 스트리밍을 소비하는 쪽이 중간에 멈춘 경우 (오류 아님)
+            span.set(cancelled=True)
+            raise
+        except BaseException as e:
+            span.end(error=e)
+            raise
+        finally:
+            span.end()
+            # 제너레이터 안의 스팬이 늦게 끝나도 다른 스팬을 덮어쓰지 않도록 자신일 때만 복원
+            if _current_span.get() is span:
+                _current_span.set(span.parent)
+
+    def record_span(self, name: str, seconds: float, parent: Optional[Span] = None, **attributes):
+        """이미 측정한 실행 시간으로 끝난 스팬 기록 (지금 끝난 것으로 간주)"""
+        span = self.start_span(name, parent, **attributes)
+        if span is NOOP_SPAN:
+            return
+        span.start_ns = time.time_ns() - int(max(0.0, seconds) * 1e9)
+        span.end()
+
+    def current_span(self) -> Span:
+        return _current_span.get() or NOOP_SPAN
+
+    def finish(self, span: Span):
+        """끝난 스팬 집계 및 OTLP 버퍼에 추가"""
+        duration = span.duration
+        with self._lock:
+            stage = self._stages.setdefault(span.name, _StageMetrics())
+            stage.count += 1
+            stage.sum += duration
+            stage.recent.append(duration)
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    stage.buckets[i] += 1
+            if span.error:
+                stage.errors += 1
+            for key in COUNTER_ATTRIBUTES:
+                value = span.attributes.get(key)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    stage.totals[key] = stage.totals.get(key, 0) + value
+            if self.otlp_path:
+                self._otlp_buffer.append(span)
+                flush = span.parent is None or len(self._otlp_buffer) >= OTLP_FLUSH_SPANS
+            else:
+                flush = False
+        if flush:
+            self.flush()
+
+    # ----- 요약 -----
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """단계별 실행 횟수, 합계(초), 최근 실행 시간 p50/p95/p99(ms), 오류 수"""
+        with self._lock:
+            stages = {name: (stage.count, stage.sum, stage.errors, sorted(stage.recent))
+                      for name, stage in self._stages.items()}
+
+        def pick(ordered, ratio):
+            return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))] * 1000
+
+        return {
+            name: {
+                "count": count,
+                "total_s": total,
+                "p50_ms": pick(recent, 0.50),
+                "p95_ms": pick(recent, 0.95),
+                "p99_ms": pick(recent, 0.99),
+                "errors": errors,
+            }
+            for name, (count, total, errors, recent) in stages.items() if recent
+        }
+
+    def format_summary(self, stages: Optional[Iterable[str]] = None) -> List[str]:
+        """단계별 요약 출력용 문자열 (stages 순서대로, 기록이 있는 단계만)"""
+        summary = self.summary()
+        names = [name for name in (stages or sorted(summary)) if name in summary]
+        return [
+            f"{name}: {summary[name]['count']}회, 합계 {summary[name]['total_s']:.1f}초, "
+            f"p50 {summary[name]['p50_ms']:.0f}ms / p95 {summary[name]['p95_ms']:.0f}ms / "
+            f"p99 {summary[name]['p99_ms']:.0f}ms"
+            + (f", 오류 {summary[name]['errors']}회" if summary[name]["errors"] else "")
+            for name in names
+        ]
+
+    # ----- Prometheus -----
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 형식 메트릭"""
+        with self._lock:
+            stages = sorted(self._stages.items())
+            lines = [
+                "# HELP rag_stage_duration_seconds 단계별 실행 시간",
+                "# TYPE rag_stage_duration_seconds histogram",
+            ]
+            for name, stage in stages:
+                label = _label_value(name)
+                for bound, count in zip(DURATION_BUCKETS, stage.buckets):
+                    lines.append(f'rag_stage_duration_seconds_bucket{{stage="{label}",le="{bound:g}"}} {count}')
+                lines.append(f'rag_stage_duration_seconds_bucket{{stage="{label}",le="+Inf"}} {stage.count}')
+                lines.append(f'rag_stage_duration_seconds_sum{{stage="{label}"}} {stage.sum:.6f}')
+                lines.append(f'rag_stage_duration_seconds_count{{stage="{label}"}} {stage.count}')
+            lines += [
+                "# HELP rag_stage_errors_total 단계별 오류 수",
+                "# TYPE rag_stage_errors_total counter",
+            ]
+            lines += [f'rag_stage_errors_total{{stage="{_label_value(name)}"}} {stage.errors}'
+                      for name, stage in stages]
+            for key in COUNTER_ATTRIBUTES:
+                rows = [(name, stage.totals[key]) for name, stage in stages if key in stage.totals]
+                if not rows:
+                    continue
+                lines += [
+                    f"# HELP rag_stage_{key}_total 단계별 {key} 합계",
+                    f"# TYPE rag_stage_{key}_total counter",
+                ]
+                lines += [f'rag_stage_{key}_total{{stage="{_label_value(name)}"}} {value:g}'
+                          for name, value in rows]
+        return "\n".join(lines) + "\n"
+
+    def start_metrics_server(self, port: int = TELEMETRY_PROMETHEUS_PORT, host: str = "0.0.0.0"):
+        """백그라운드 스레드에서 /metrics 제공 (이미 실행 중이거나 port가 0이면 무시)"""
+        if not self.enabled or not port or self._server is not None:
+            return self._server
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = telemetry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+    # ----- OTLP -----
+    def flush(self):
+        """버퍼의 스팬을 OTLP JSON 한 줄로 파일에 추가"""
+        with self._lock:
+            spans, self._otlp_buffer = self._otlp_buffer, []
+            if not spans or not self.otlp_path:
+                return
+            request = {
+                "resourceSpans": [{
+                    "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                    "scopeSpans": [{
+                        "scope": {"name": "telemetry"},
+                        "spans": [_otlp_span(span) for span in spans],
+                    }],
+                }]
+            }
+            directory = os.path.dirname(self.otlp_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.otlp_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(request, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict) -> List[Dict]:
+    return [{"key": key, "value": _otlp_value(value)}
+            for key, value in attributes.items() if value is not None]
+
+
+def _otlp_span(span: Span) -> Dict:
+    data = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent is not None:
+        data["parentSpanId"] = span.parent.span_id
+    return data
+
+
+_telemetry: Optional[Telemetry] = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> Telemetry:
+    """프로세스 공용 수집기 (환경 변수 설정으로 처음 사용할 때 생성)"""
+    global _telemetry
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                _telemetry = Telemetry()
+    return _telemetry
+
+
+def span(name: str, parent: Optional[Span] = None, **attributes):
+    """공용 수집기의 with 스팬"""
+    return get_telemetry().span(name, parent, **attributes)
+
+
+def start_span(name: str, parent: Optional[Span] = None, **attributes) -> Span:
+    return get_telemetry().start_span(name, parent, **attributes)
+
+
+def record_span(name: str, seconds: float, parent: Optional[Span] = None, **attributes):
+    get_telemetry().record_span(name, seconds, parent, **attributes)
+
+
+def current_span() -> Span:
+    return get_telemetry().current_span()
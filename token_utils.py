@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+토큰 수 계산 유틸리티
+tiktoken(requirements.txt)으로 정확한 토큰 수를 계산하고, 설치되지 않았거나 인코딩 파일을
+받을 수 없으면 경고를 한 번 출력한 뒤 보수적인 근사치를 사용합니다.
+"""
+
+import math
+from functools import lru_cache
+
+# text-embedding-3-* / gpt-4o 계열 모두 cl100k 이상 크기의 BPE를 사용하므로
+# cl100k_base 기준으로 계산하면 실제보다 작게 세는 일이 거의 없다.
+ENCODING_NAME = "cl100k_base"
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """tiktoken 인코더 로드 (없으면 None)"""
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(ENCODING_NAME)
+    except Exception as e:
+        # 청크 크기, 임베딩 배치, 히스토리 예산이 모두 근사치로 계산되므로 알려 줌 (한 번만)
+        print(f"⚠️  tiktoken을 사용할 수 없어 토큰 수를 글자 수로 추정합니다 ({e.__class__.__name__}: {e})", flush=True)
+        return None
+
+
+def _estimate_tokens(text: str) -> int:
+    """tiktoken 없이 토큰 수 근사 (ASCII 3자당 1토큰, 한글 등은 1자당 1.5토큰)"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    other_chars = len(text) - ascii_chars
+    return math.ceil(ascii_chars / 3 + other_chars * 1.5)
+
+
+def count_tokens(text: str) -> int:
+    """텍스트의 토큰 수 계산"""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return _estimate_tokens(text)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """텍스트를 최대 토큰 수 이내로 자르기"""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens])
+
+    # 근사치 사용 시: 비율로 자른 뒤 한도 안에 들어올 때까지 조금씩 줄인다
+    tokens = _estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    end = int(len(text) * max_tokens / tokens)
+    while end > 0 and _estimate_tokens(text[:end]) > max_tokens:
+        end = int(end * 0.9)
+    return text[:end]
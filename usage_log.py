@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+답변별 토큰 사용량 및 비용 기록
+답변 하나마다 입력(prompt), 출력(completion), 검색 문서(context), 대화 히스토리 토큰 수를 계산해
+대화 기록에 붙이고, 세션 간에 공유되는 JSONL 로그에 누적합니다.
+로그는 크기 제한을 넘으면 이전 파일(.1)로 넘겨 최근 기록만 유지하며,
+`python usage_log.py --days 7`로 일별 합계를 볼 수 있습니다.
+
+스트리밍 요청은 stream_options.include_usage로 마지막 청크에 사용량을 받고,
+사용량(usage)이 없으면 토크나이저로 추정하고 estimated=True로 표시한다.
+On Your Data는 검색 문서를 서버에서 프롬프트에 넣으므로, 사용량이 없을 때는
+인용된 문서 내용으로 검색 문서 토큰을 추정한다.
+"""
+
+import argparse
+import json
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from conversation_history import count_message_tokens
+from token_utils import count_tokens
+
+USAGE_LOG_ENABLED = os.getenv("USAGE_LOG_ENABLED", "true").lower() == "true"
+USAGE_LOG_PATH = os.getenv("USAGE_LOG_PATH", ".cache/usage_log.jsonl")
+USAGE_LOG_MAX_MB = float(os.getenv("USAGE_LOG_MAX_MB", "20"))
+# 1,000 토큰당 가격 (0이면 비용을 계산하지 않음, 배포 모델의 요금표 기준으로 설정)
+PROMPT_PRICE_PER_1K = float(os.getenv("PROMPT_PRICE_PER_1K", "0"))
+COMPLETION_PRICE_PER_1K = float(os.getenv("COMPLETION_PRICE_PER_1K", "0"))
+# 스트리밍 응답의 마지막 청크(choices가 빈 청크)로 실제 사용량 받기
+# (stream_options를 지원하지 않는 이전 API 버전에서는 false로 설정)
+STREAM_INCLUDE_USAGE = os.getenv("STREAM_INCLUDE_USAGE", "true").lower() == "true"
+
+TOKEN_FIELDS = ("prompt_tokens", "completion_tokens", "context_tokens", "history_tokens")
+
+
+def citation_tokens(citations: Iterable[Dict]) -> int:
+    """인용 문서 내용의 토큰 수 (검색 문서 토큰 추정용)"""
+    return sum(count_tokens(citation.get("content") or "") for citation in citations)
+
+
+def stream_usage_options() -> Dict:
+    """스트리밍 채팅 완성 요청에 넘길 옵션 (마지막 청크에 usage 포함)"""
+    return {"stream_options": {"include_usage": True}} if STREAM_INCLUDE_USAGE else {}
+
+
+def estimate_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    """요금 설정으로 계산한 비용 (가격을 설정하지 않았으면 0)"""
+    return (prompt_tokens * PROMPT_PRICE_PER_1K + completion_tokens * COMPLETION_PRICE_PER_1K) / 1000
+
+
+def measure_usage(
+    request_messages: List[Dict],
+    answer: str,
+    history_messages: List[Dict] = (),
+    context_tokens: Optional[int] = None,
+    citations: Iterable[Dict] = (),
+    usage=None,
+) -> Dict:
+    """답변 하나의 토큰 사용량
+
+    Args:
+        request_messages: 모델에 보낸 메시지 (검색 문서를 직접 넣은 경우 포함)
+        answer: 생성된 답변
+        history_messages: request_messages 중 이전 대화 부분
+        context_tokens: 직접 넣은 검색 문서의 토큰 수 (None이면 서버 측 검색으로 보고 추정)
+        citations: 서버 측 검색의 인용 문서 (사용량이 없을 때 추정에 사용)
+        usage: 응답의 usage (prompt_tokens, completion_tokens) - 없으면 추정
+
+    Returns:
+        dict: prompt/completion/context/history 토큰 수, estimated, cost
+    """
+    request_tokens = count_message_tokens(request_messages)
+    if usage is not None:
+        prompt_tokens = usage.prompt_tokens
+        completion_tokens = usage.completion_tokens
+        if context_tokens is None:
+            # 서버가 넣은 검색 문서 = 실제 입력 토큰 - 보낸 메시지 토큰
+            context_tokens = max(0, prompt_tokens - request_tokens)
+    else:
+        if context_tokens is None:
+            context_tokens = citation_tokens(citations)
+            request_tokens += context_tokens
+        prompt_tokens = request_tokens
+        completion_tokens = count_tokens(answer)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "context_tokens": context_tokens,
+        "history_tokens": count_message_tokens(history_messages),
+        "estimated": usage is None,
+        "cost": round(estimate_cost(prompt_tokens, completion_tokens), 6),
+    }
+
+
+def empty_usage() -> Dict:
+    """GPT를 호출하지 않은 답변 (에러 코드 색인, 답변 캐시)"""
+    return {**{field: 0 for field in TOKEN_FIELDS}, "estimated": False, "cost": 0.0}
+
+
+def sum_usage(usages: Iterable[Optional[Dict]]) -> Dict:
+    """사용량 합계 (answers: GPT를 호출한 답변 수)"""
+    totals = {field: 0 for field in TOKEN_FIELDS}
+    totals.update(answers=0, cost=0.0)
+    for usage in usages:
+        if not usage or not (usage.get("prompt_tokens") or usage.get("completion_tokens")):
+            continue
+        totals["answers"] += 1
+        totals["cost"] += usage.get("cost") or 0.0
+        for field in TOKEN_FIELDS:
+            totals[field] += usage.get(field) or 0
+    return totals
+
+
+class UsageLog:
+    """답변별 사용량 JSONL 로그 (스레드 안전, 크기 제한을 넘으면 .1로 교체)"""
+
+    def __init__(self, path: str = USAGE_LOG_PATH, max_mb: float = USAGE_LOG_MAX_MB):
+        self.path = Path(path)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+
+    @property
+    def rotated_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".1")
+
+    def append(self, record: Dict):
+        """기록 추가 (timestamp가 없으면 현재 시각)"""
+        record = {"timestamp": datetime.now().isoformat(timespec="seconds"), **record}
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                if self.max_bytes and self.path.stat().st_size + len(line) > self.max_bytes:
+                    os.replace(self.path, self.rotated_path)
+            except FileNotFoundError:
+                pass
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def iter_records(self, since: Optional[datetime] = None) -> Iterator[Dict]:
+        """기록을 오래된 순서로 반환 (교체된 이전 파일 포함, 깨진 줄은 건너뜀)"""
+        since_text = since.isoformat(timespec="seconds") if since else ""
+        for path in (self.rotated_path, self.path):
+            try:
+                f = open(path, "r", encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            with f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("timestamp", "") >= since_text:
+                        yield record
+
+    def summarize(self, days: Optional[int] = None) -> Dict[str, Dict]:
+        """일별 사용량 합계 ({"YYYY-MM-DD": 합계, ..., "total": 전체 합계})"""
+        since = datetime.now() - timedelta(days=days) if days else None
+        by_day = defaultdict(list)
+        for record in self.iter_records(since):
+            by_day[record["timestamp"][:10]].append(record)
+        summary = {day: summarize_records(records) for day, records in sorted(by_day.items())}
+        summary["total"] = summarize_records([r for records in by_day.values() for r in records])
+        return summary
+
+
+def summarize_records(records: List[Dict]) -> Dict:
+    """기록 목록의 합계, 답변당 평균, 소스별 답변 수"""
+    totals = sum_usage(records)
+    answers = max(totals["answers"], 1)
+    sources = defaultdict(int)
+    for record in records:
+        sources[record.get("source", "generate")] += 1
+    totals.update(
+        questions=len(records),
+        sessions=len({record.get("session") for record in records if record.get("session")}),
+        sources=dict(sources),
+        **{f"avg_{field}": totals[field] / answers for field in TOKEN_FIELDS},
+    )
+    return totals
+
+
+_usage_log: Optional[UsageLog] = None
+
+
+def get_usage_log() -> Optional[UsageLog]:
+    """프로세스 공용 사용량 로그 (USAGE_LOG_ENABLED=false면 None)"""
+    global _usage_log
+    if _usage_log is None and USAGE_LOG_ENABLED and USAGE_LOG_PATH:
+        _usage_log = UsageLog()
+    return _usage_log
+
+
+def format_tokens(usage: Dict) -> str:
+    """사용량 한 줄 표시 ("입력 1,234 (검색 문서 800 · 히스토리 200) / 출력 321 토큰")"""
+    text = (
+        f"입력 {usage['prompt_tokens']:,} (검색 문서 {usage['context_tokens']:,} · "
+        f"히스토리 {usage['history_tokens']:,}) / 출력 {usage['completion_tokens']:,} 토큰"
+    )
+    if usage.get("estimated"):
+        text += " (추정)"
+    if usage.get("cost"):
+        text += f" · ${usage['cost']:.4f}"
+    return text
+
+
+def parse_args():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="답변별 토큰 사용량 로그 요약")
+    parser.add_argument("--days", type=int, default=7, help="최근 며칠 (0이면 전체)")
+    parser.add_argument("--path", default=USAGE_LOG_PATH, help="사용량 로그 경로")
+    parser.add_argument("--json", action="store_true", help="요약을 JSON으로 출력")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    summary = UsageLog(args.path).summarize(args.days or None)
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return
+    if not summary["total"]["questions"]:
+        print(f"⚠️  기록이 없습니다: {args.path}")
+        return
+
+    print("=" * 96)
+    print(f"{'날짜':<12}{'질문':>6}{'GPT 호출':>9}{'입력':>12}{'검색 문서':>12}{'히스토리':>11}"
+          f"{'출력':>10}{'평균 입력':>11}{'비용':>10}")
+    print("-" * 96)
+    for day, totals in summary.items():
+        if day == "total":
+            print("-" * 96)
+        print(
+            f"{day:<12}{totals['questions']:>6}{totals['answers']:>9}{totals['prompt_tokens']:>12,}"
+            f"{totals['context_tokens']:>12,}{totals['history_tokens']:>11,}"
+            f"{totals['completion_tokens']:>10,}{totals['avg_prompt_tokens']:>11,.0f}"
+            f"{'$' + format(totals['cost'], '.2f'):>10}"
+        )
+    print("=" * 96)
+    total = summary["total"]
+    if total["answers"]:
+        print(
+            f"답변당 평균: 검색 문서 {total['avg_context_tokens']:,.0f} / 히스토리 {total['avg_history_tokens']:,.0f} / "
+            f"출력 {total['avg_completion_tokens']:,.0f} 토큰 "
+            f"(입력 중 검색 문서 {total['context_tokens'] / max(total['prompt_tokens'], 1):.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()